@@ -0,0 +1,76 @@
+"""
+Frontmatter 读取基准
+
+在临时目录生成正文较长的文章，比较 frontmatter.load 与只读取头部的 read_frontmatter
+读取全部元数据的耗时，并核对两者的结果一致（不一致时以非零状态退出）。
+
+    python scripts/bench_frontmatter.py
+    python scripts/bench_frontmatter.py --posts 2000 --body-kb 200 --runs 5
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import frontmatter  # type: ignore
+from hstool.tool.frontmatter import YamlLoader, read_frontmatter
+
+HEADER = """---
+title: 文章 {i}
+author: hstool
+tags: [python, "tag-{i}"]
+category: 技术/后端
+create: 2024-01-{day:02d} 10:00
+update: 2024-02-{day:02d} 12:30
+---
+"""
+PARAGRAPH = "这是正文的一段内容，包含 **Markdown** 标记和 `code`。Lorem ipsum dolor sit amet.\n\n"
+
+
+def make_posts(root: Path, posts: int, body_kb: int) -> List[Path]:
+    body = PARAGRAPH * max(1, body_kb * 1024 // len(PARAGRAPH.encode("utf-8")))
+    files = []
+    for i in range(posts):
+        path = root / f"post{i}" / f"post{i}.md"
+        path.parent.mkdir()
+        path.write_text(HEADER.format(i=i, day=i % 28 + 1) + "\n" + body, encoding="utf-8")
+        files.append(path)
+    return files
+
+def measure(read: Callable[[Path], object], files: List[Path], runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for path in files:
+            read(path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--body-kb", type=int, default=100, help="每篇文章正文的大小（KB）")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_posts(Path(tmp), args.posts, args.body_kb)
+        mismatched = [p for p in files if read_frontmatter(p) != frontmatter.load(str(p)).metadata]
+        load = measure(lambda p: frontmatter.load(str(p)).metadata, files, args.runs)
+        header = measure(read_frontmatter, files, args.runs)
+
+    print(f"{args.posts} 篇文章，正文约 {args.body_kb}KB，YAML 解析器 {YamlLoader.__name__}，{args.runs} 次取中位数")
+    print(f"  frontmatter.load   {load * 1000:8.1f}ms  {load / args.posts * 1e6:8.1f}us/篇")
+    print(f"  read_frontmatter   {header * 1000:8.1f}ms  {header / args.posts * 1e6:8.1f}us/篇  ({load / header:.1f}x)")
+    if mismatched:
+        print(f"结果不一致: {mismatched[0]} 等 {len(mismatched)} 篇")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+parse_date 回归与性能基准
+
+生成覆盖 DATE_FORMATS 全部格式的日期字符串（包括日/月有歧义、非法日期、多余空白、
+月份名、datetime/date/time 对象等），逐个比较 parse_date 与原来逐个尝试 strptime 的实现，
+结果不一致时以非零状态退出；随后比较两者以及批量接口 parse_dates 的耗时。
+
+    python scripts/bench_parse_date.py
+    python scripts/bench_parse_date.py --values 50000 --runs 5 --seed 1
+"""
+from __future__ import annotations
+import argparse
+import random
+import statistics
+import sys
+import time as timer
+from datetime import date, datetime, time
+from typing import Any, Callable, List, Optional
+from zoneinfo import ZoneInfo
+
+from hstool.config import config
+from hstool.tool.common import DATE_FORMATS, parse_date, parse_dates
+
+
+def legacy_parse_date(date_input: Any) -> Optional[datetime]:
+    """原来的实现：每次构造 ZoneInfo，按顺序逐个尝试 strptime"""
+    if isinstance(date_input, datetime):
+        return date_input
+    if isinstance(date_input, date):
+        return datetime.combine(date_input, time.min)
+    if isinstance(date_input, time):
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_input, fmt).replace(tzinfo=ZoneInfo(config.ZONE))
+        except ValueError:
+            continue
+    return None
+
+def make_corpus(count: int, rng: random.Random) -> List[Any]:
+    extra = [
+        "2024-02-30", "2024-02-29", "2023-02-29", "2024-13-01", "2024-01-05 24:00", "2024-01-05 23:59:60",
+        "2024-1-5", "2024-01-05  10:00", "2024-01-05T10:00", " 2024-01-05", "2024-01-05 ", "2024-01- 5",
+        "01-02-2024", "12-25-2024", "25-12-2024", "13-13-2024", "1/2/2024", "02/01/2024 10:00",
+        "May 05 2024", "may 5 2024", "September 9 2024", "Sept 9 2024", "5 May 2024", "05 December 2024",
+        "", "garbage", "2024", "٢٠٢٤-٠١-٠٥", "2024-01-05 10:00:00.5", "2024-01-05+08:00",
+        datetime(2024, 1, 5, 10, 0), date(2024, 1, 5), time(10, 0),
+    ]
+    corpus: List[Any] = list(extra)
+    while len(corpus) < count:
+        fmt = rng.choice(DATE_FORMATS)
+        value = datetime(
+            rng.randint(1990, 2030), rng.randint(1, 12), rng.randint(1, 28),
+            rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59)
+        )
+        text = value.strftime(fmt)
+        roll = rng.random()
+        if roll < 0.05:
+            text = text.replace("-0", "-").replace("/0", "/")  # 不补零
+        elif roll < 0.08:
+            text = text.replace("28", "31").replace("27", "30")  # 可能非法
+        corpus.append(text)
+    rng.shuffle(corpus)
+    return corpus
+
+def measure(func: Callable[[], object], runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = timer.perf_counter()
+        func()
+        times.append(timer.perf_counter() - start)
+    return statistics.median(times)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.values, random.Random(args.seed))
+    mismatched = [
+        value for value in corpus
+        if repr(parse_date(value)) != repr(legacy_parse_date(value))
+    ]
+    if repr(parse_dates(corpus)) != repr([legacy_parse_date(value) for value in corpus]):
+        mismatched.append("parse_dates")
+    # 按格式排序后同一格式连续出现，上次成功的格式组命中率最高
+    grouped = sorted((v for v in corpus if isinstance(v, str)), key=len)
+
+    legacy = measure(lambda: [legacy_parse_date(v) for v in corpus], args.runs)
+    current = measure(lambda: [parse_date(v) for v in corpus], args.runs)
+    batch = measure(lambda: parse_dates(corpus), args.runs)
+    current_grouped = measure(lambda: [parse_date(v) for v in grouped], args.runs)
+    legacy_grouped = measure(lambda: [legacy_parse_date(v) for v in grouped], args.runs)
+
+    per = 1e6 / len(corpus)
+    print(f"{len(corpus)} 个值（{len(DATE_FORMATS)} 种格式随机混合），{args.runs} 次取中位数")
+    print(f"  原实现           {legacy * per:7.2f}us/个")
+    print(f"  parse_date       {current * per:7.2f}us/个  ({legacy / current:.1f}x)")
+    print(f"  parse_dates      {batch * per:7.2f}us/个  ({legacy / batch:.1f}x)")
+    print(f"  同格式连续出现时  原实现 {legacy_grouped * per:7.2f}us/个，parse_date {current_grouped * per:7.2f}us/个")
+    if mismatched:
+        print(f"结果不一致: {mismatched[:5]!r} 等 {len(mismatched)} 个")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
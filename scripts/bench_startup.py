@@ -0,0 +1,81 @@
+"""
+hstool 命令行启动耗时基准
+
+用 python -X importtime 统计导入 hstool.cli.cli 的累计耗时，超过预算时以非零状态退出，
+可以放在 CI 里作为检查；同时核对 cli.LAZY_COMMANDS 中的说明与各命令实际的说明一致。
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --budget-ms 80 --runs 10 --top 15
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+TARGET = "hstool.cli.cli"
+
+
+def importtime(module: str) -> Tuple[int, Dict[str, int]]:
+    """在新进程中导入 module，返回 (module 的累计耗时 us, 各模块自身耗时 us)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    total = 0
+    self_times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if not fields[0].isdigit():
+            continue  # 表头
+        name = fields[2].strip()
+        self_times[name] = int(fields[0])
+        if name == module:
+            total = int(fields[1])
+    return total, self_times
+
+def check_manifest() -> List[str]:
+    """返回清单与实际命令不一致的描述"""
+    from hstool.cli import cli as cli_module
+    problems = []
+    for name, (module_name, help_text) in cli_module.LAZY_COMMANDS.items():
+        cmd = getattr(importlib.import_module(module_name), name, None)
+        if cmd is None:
+            problems.append(f"{module_name} 中没有命令 {name}")
+        elif cmd.get_short_help_str(45) != help_text:
+            problems.append(f"{name}: 清单说明 {help_text!r} 与实际 {cmd.get_short_help_str(45)!r} 不一致")
+    return problems
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=60, help="导入耗时中位数的上限（毫秒）")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="显示自身耗时最多的模块数")
+    args = parser.parse_args()
+
+    totals = []
+    self_times: Dict[str, int] = {}
+    for _ in range(args.runs):
+        total, self_times = importtime(TARGET)
+        totals.append(total / 1000)
+    median = statistics.median(totals)
+    print(f"import {TARGET}: 中位数 {median:.1f}ms（{args.runs} 次，最小 {min(totals):.1f}ms），预算 {args.budget_ms}ms")
+    for name, us in sorted(self_times.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+    failed = False
+    for problem in check_manifest():
+        print(f"清单错误: {problem}")
+        failed = True
+    if median > args.budget_ms:
+        print("超出启动耗时预算")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
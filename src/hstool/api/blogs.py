@@ -0,0 +1,148 @@
+from __future__ import annotations
+import base64
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession as SQLAAsyncSession
+from sqlalchemy.orm import defer, selectinload
+from ..sql.async_db import AsyncSession
+from ..sql.blog import Blog, Category, Tag
+from ..sql.search import search_blogs
+from ..tool.async_blog import find_multilevel_category, get_blog_by_slug
+
+router = APIRouter(
+    prefix="/blogs",
+    tags=["博客"]
+)
+
+
+class CategoryOut(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+
+class BlogOut(BaseModel):
+    id: int
+    slug: str
+    title: str
+    create: Optional[datetime] = None
+    update: Optional[datetime] = None
+    category: Optional[CategoryOut] = None
+    tags: List[str] = []
+    content: Optional[str] = None
+
+class SearchHit(BaseModel):
+    id: int
+    slug: str
+    title: str
+    rank: float  # 越大越相关
+    title_highlight: str
+    snippet: str
+
+class BlogPage(BaseModel):
+    items: List[BlogOut]
+    next_cursor: Optional[str] = None  # 为None表示没有下一页
+
+
+def to_blog_out(blog: Blog, include_content: bool) -> BlogOut:
+    category = blog.category
+    # 模型使用 Column 声明，字段交给 pydantic 校验
+    return BlogOut.model_validate({
+        "id": blog.id,
+        "slug": blog.slug,
+        "title": blog.title,
+        "create": blog.create,
+        "update": blog.update,
+        "category": CategoryOut.model_validate(category, from_attributes=True) if category else None,
+        "tags": [tag.name for tag in blog.tags],
+        "content": blog.content if include_content else None
+    })
+
+def encode_cursor(blog: Blog) -> str:
+    """游标为最后一条记录的 (update, id)"""
+    update = blog.update.isoformat() if blog.update else ""
+    return base64.urlsafe_b64encode(f"{update}|{blog.id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    try:
+        update, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(update) if update else None), int(id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的游标")
+
+
+@router.get("/", summary="获取博客列表")
+async def list_blogs(
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(20, ge=1, le=100, description="每页数量"),
+    tag: Optional[str] = Query(None, description="按标签过滤"),
+    category: Optional[str] = Query(None, description="按分类过滤（包含子分类），多级分类用 / 分隔，如 '技术/后端'"),
+    include_content: bool = Query(False, description="是否返回正文"),
+    session: SQLAAsyncSession = Depends(AsyncSession)
+) -> BlogPage:
+    """按更新时间倒序分页获取博客（游标分页，标签和分类批量预加载）"""
+    stmt = (
+        select(Blog)
+        .options(selectinload(Blog.tags), selectinload(Blog.category))
+        .order_by(Blog.update.desc().nulls_last(), Blog.id.desc())
+        .limit(limit + 1)
+    )
+    if not include_content:
+        stmt = stmt.options(defer(Blog.content))
+    if tag:
+        stmt = stmt.where(Blog.tags.any(Tag.name == tag))
+    if category:
+        found = await find_multilevel_category(session, category.split("/"), create=False)
+        if found is None:
+            return BlogPage(items=[])
+        # 递归查出该分类及其全部子孙分类
+        tree = select(Category.id).where(Category.id == found.id).cte("category_tree", recursive=True)
+        tree = tree.union_all(select(Category.id).where(Category.parent_id == tree.c.id))
+        stmt = stmt.where(Blog.category_id.in_(select(tree.c.id)))
+    if cursor:
+        update, id = decode_cursor(cursor)
+        if update is None:
+            # 已进入 update 为空的部分（排在最后）
+            stmt = stmt.where(Blog.update.is_(None), Blog.id < id)
+        else:
+            stmt = stmt.where(or_(
+                Blog.update < update,
+                and_(Blog.update == update, Blog.id < id),
+                Blog.update.is_(None)
+            ))
+
+    blogs = list((await session.execute(stmt)).scalars())
+    next_cursor = encode_cursor(blogs[limit - 1]) if len(blogs) > limit else None
+    return BlogPage(
+        items=[to_blog_out(blog, include_content) for blog in blogs[:limit]],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/search", summary="全文搜索博客")
+async def search(
+    q: str = Query(..., min_length=1, description="搜索关键词，多个词以空格分隔"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: SQLAAsyncSession = Depends(AsyncSession)
+) -> List[SearchHit]:
+    """按相关度返回匹配的博客，标题和正文片段中的关键词用 <mark> 高亮"""
+    try:
+        rows = await session.run_sync(lambda s: search_blogs(s, q, limit=limit, offset=offset))
+    except ValueError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return [SearchHit(**row) for row in rows]
+
+
+@router.get("/{slug}", summary="获取博客详情")
+async def get_blog(
+    slug: str,
+    session: SQLAAsyncSession = Depends(AsyncSession)
+) -> BlogOut:
+    """根据slug获取单篇博客（含正文）"""
+    blog = await get_blog_by_slug(session, slug)
+    if blog is None:
+        raise HTTPException(status_code=404, detail=f"博客 '{slug}' 不存在")
+    return to_blog_out(blog, include_content=True)
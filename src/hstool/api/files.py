@@ -1,14 +1,28 @@
-from fastapi import UploadFile, File, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import BackgroundTasks, HTTPException, Query, Request, Response
+from starlette.requests import ClientDisconnect
 import os
-import shutil
+import base64
+import json
+import mimetypes
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from email.utils import formatdate
+from stat import S_ISREG
+from typing import List, Optional, Dict, Any, Tuple
+from urllib.parse import quote
 # api/files.py
-from fastapi import APIRouter, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from ..config import config
+from ..tool.archive import ARCHIVE_FORMATS, archive_filename, iter_archive, normalize_arcname
+from ..tool.blobstore import BLOB_DIR_NAME
+from ..tool.compress import COMPRESSED_DIR_NAME, compress_variants, find_variant, is_compressible, remove_variants
+from ..tool.fileindex import SORT_FIELDS, get_file_index
+from ..tool.httpcache import file_etag, is_not_modified
+from ..tool.resumable import UploadSession, expire_sessions
+from ..tool.upload import TMP_DIR_NAME, StreamingFileWriter, UploadError, iter_multipart_file
 
 # 创建该功能组的路由实例
 router = APIRouter(
@@ -16,6 +30,9 @@ router = APIRouter(
     tags=["文件管理"]  # 文档中分组显示的标签
 )
 
+# UPLOAD 下的内部目录（未完成的上传、去重内容、预压缩副本），不能通过接口读写
+INTERNAL_DIR_NAMES = frozenset({TMP_DIR_NAME, BLOB_DIR_NAME, COMPRESSED_DIR_NAME})
+
 
 def get_file_info(file_path: Path) -> Dict[str, Any]:
     """获取文件的详细信息"""
@@ -29,85 +46,369 @@ def get_file_info(file_path: Path) -> Dict[str, Any]:
         "path": str(file_path)
     }
 
-def validate_file_path(filename: str | None, work_dir: Path):
-    """验证文件路径，防止路径遍历攻击"""
+def validate_file_path(filename: str | None, work_dir: Path) -> Path:
+    """验证文件路径，防止路径遍历攻击，以及访问 .tmp、.blobs、.compressed 等内部目录"""
     if filename is None:
         raise ValueError("filename 不能为空")
     # 拼接用户目录和文件名（强制在用户目录内）
     file_path = work_dir / filename
     # 检查文件是否在用户目录内（防止 ../ 等路径遍历）
-    if not str(file_path.resolve()).startswith(str(work_dir.resolve())):
+    try:
+        rel = file_path.resolve().relative_to(work_dir.resolve())
+    except ValueError:
+        raise HTTPException(status_code=403, detail="非法文件路径")
+    if rel.parts and rel.parts[0] in INTERNAL_DIR_NAMES:
         raise HTTPException(status_code=403, detail="非法文件路径")
     return file_path
 
-@router.post("/upload", summary="上传文件")
+def schedule_compression(background_tasks: BackgroundTasks, file_path: Path, size: int) -> None:
+    """开启 DOWNLOAD_COMPRESS 时，在响应发送后为文本类文件生成预压缩副本"""
+    if config.DOWNLOAD_COMPRESS and is_compressible(file_path, size, config.DOWNLOAD_COMPRESS_MIN_SIZE):
+        background_tasks.add_task(compress_variants, config.UPLOAD, file_path)
+
+# multipart 请求中除文件内容外的分隔符和头部的最大估计字节数
+MULTIPART_OVERHEAD = 64 * 1024
+
+# 上传接口自行流式解析请求体，这里补充 OpenAPI 文档中的请求体描述
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary", "description": "要上传的本地文件"}
+                    }
+                }
+            }
+        }
+    }
+}
+
+@router.post("/upload", summary="上传文件", openapi_extra=UPLOAD_REQUEST_BODY)
 async def upload_file(
-    file: UploadFile = File(..., description="要上传的本地文件"),
+    request: Request,
+    background_tasks: BackgroundTasks,
     overwrite: bool = Query(False, description="是否覆盖已存在的文件")
 ) -> Dict[str, Any]:
-    """上传本地文件到服务器"""
+    """
+    上传本地文件到服务器
+    
+    请求体边接收边写入 UPLOAD 下的临时文件（磁盘IO在线程池中执行），
+    同时计算 SHA-256，完成后原子重命名到目标位置。
+    """
     work_dir = config.UPLOAD
-    file_path = validate_file_path(file.filename, work_dir)
+    max_size = config.UPLOAD_MAX_SIZE
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            declared = -1
+        if declared < 0:
+            raise HTTPException(status_code=400, detail="无效的 Content-Length")
+        if max_size and declared > max_size + MULTIPART_OVERHEAD:
+            raise HTTPException(status_code=413, detail=f"文件超过大小限制 {max_size} 字节")
     
-    # 检查文件是否已存在
-    if file_path.exists() and not overwrite:
+    writer: Optional[StreamingFileWriter] = None
+    file_path: Optional[Path] = None
+    filename = ""
+    try:
+        async for event, name, data in iter_multipart_file(
+            request.headers.get("content-type", ""), request.stream()
+        ):
+            if event == "start" and writer is None and file_path is None:
+                filename = name or ""
+                file_path = validate_file_path(filename, work_dir)
+                # 检查文件是否已存在（在接收文件内容之前）
+                if file_path.exists() and not overwrite:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"文件 '{filename}' 已存在，若需覆盖请设置 overwrite=True"
+                    )
+                writer = StreamingFileWriter(work_dir, max_size=max_size)
+            elif event == "data" and writer is not None:
+                await writer.write(data)
+            elif event == "end" and writer is not None and file_path is not None:
+                sha256 = await writer.commit(file_path, overwrite=overwrite)
+                writer = None
+        if file_path is None:
+            raise HTTPException(status_code=400, detail="请求中缺少文件字段 'file'")
+        if writer is not None:
+            raise HTTPException(status_code=400, detail="文件内容不完整")
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="客户端已断开连接")
+    finally:
+        if writer is not None:
+            writer.abort()
+    
+    file_info = get_file_info(file_path)
+    schedule_compression(background_tasks, file_path, file_info["size"])
+    return {
+        "message": f"文件 '{filename}' 上传成功",
+        "sha256": sha256,
+        "file_info": file_info
+    }
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(..., ge=0, description="文件总字节数")
+    sha256: Optional[str] = Field(None, description="文件的 SHA-256，也可在完成上传时提供")
+    overwrite: bool = False
+
+
+def get_upload_session(session_id: str) -> UploadSession:
+    try:
+        session = UploadSession(config.UPLOAD, session_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if not session.path.exists():
+        raise HTTPException(status_code=404, detail=f"上传会话 '{session_id}' 不存在")
+    return session
+
+@router.post("/uploads", summary="创建分块上传会话")
+def create_upload_session(body: UploadSessionCreate) -> Dict[str, Any]:
+    """创建可续传的上传会话，之后用 PATCH 按偏移量上传分块（可并行）"""
+    work_dir = config.UPLOAD
+    file_path = validate_file_path(body.filename, work_dir)
+    if file_path.exists() and not body.overwrite:
         raise HTTPException(
             status_code=400,
-            detail=f"文件 '{file.filename}' 已存在，若需覆盖请设置 overwrite=True"
+            detail=f"文件 '{body.filename}' 已存在，若需覆盖请设置 overwrite=True"
         )
-    
-    # 保存文件
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
+    if config.UPLOAD_MAX_SIZE and body.size > config.UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"文件超过大小限制 {config.UPLOAD_MAX_SIZE} 字节")
+    expire_sessions(work_dir)  # 顺便清理过期的会话
+    session = UploadSession.create(work_dir, body.filename, body.size, body.sha256, body.overwrite)
+    return session.status()
+
+@router.get("/uploads/{session_id}", summary="查询分块上传进度")
+def get_upload_status(session_id: str) -> Dict[str, Any]:
+    """返回已连续接收的偏移量 offset 以及所有已接收的区间 ranges"""
+    try:
+        return get_upload_session(session_id).status()
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@router.patch("/uploads/{session_id}", summary="上传分块")
+async def upload_chunk(
+    session_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="分块在文件中的起始字节偏移量")
+) -> Dict[str, Any]:
+    """请求体为分块的原始字节，写入文件的 offset 处"""
+    session = get_upload_session(session_id)
+    try:
+        written = await session.write_chunk(offset, request.stream())
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="客户端已断开连接，请重传该分块")
+    return {"written": written, "offset": session.offset()}
+
+@router.post("/uploads/{session_id}/complete", summary="完成分块上传")
+async def complete_upload(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    sha256: Optional[str] = Query(None, description="文件的 SHA-256，未提供时使用创建会话时的值")
+) -> Dict[str, Any]:
+    """校验所有分块已接收且哈希一致后，原子移动到目标位置"""
+    session = get_upload_session(session_id)
+    try:
+        filename = session.meta["filename"]
+        file_path = validate_file_path(filename, config.UPLOAD)
+        digest = await run_in_threadpool(session.finalize, file_path, sha256)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    file_info = get_file_info(file_path)
+    schedule_compression(background_tasks, file_path, file_info["size"])
     return {
-        "message": f"文件 '{file.filename}' 上传成功",
-        "file_info": get_file_info(file_path)
+        "message": f"文件 '{filename}' 上传成功",
+        "sha256": digest,
+        "file_info": file_info
     }
 
+@router.delete("/uploads/{session_id}", summary="取消分块上传")
+def abort_upload(session_id: str) -> Dict[str, Any]:
+    get_upload_session(session_id).delete()
+    return {"message": f"上传会话 '{session_id}' 已取消"}
+
+
+def encode_file_cursor(key: Tuple[float, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_file_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        value, rel = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(value), str(rel)
+    except (ValueError, TypeError):  # 非 base64/JSON，或不是 [数字, 路径] 的形式
+        raise HTTPException(status_code=400, detail="无效的游标")
 
 @router.get("/", summary="获取文件列表")
 def get_file_list(
+    response: Response,
     suffix: Optional[str] = Query(None, description="按文件后缀过滤，如 'txt'、'pdf'"),
-    sort_by: str = Query("created_at", description="排序字段：created_at / modified_at / size")
+    prefix: Optional[str] = Query(None, description="按文件名前缀过滤（递归时为相对路径前缀）"),
+    sort_by: str = Query("created_at", description="排序字段：created_at / modified_at / size"),
+    recursive: bool = Query(False, description="是否包含子目录中的文件"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="每页数量，不指定则返回全部"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值")
 ) -> List[Dict[str, Any]]:
-    """获取服务器上的所有文件列表（支持过滤和排序）"""
-    # 获取所有文件
-    work_dir = config.UPLOAD
-    files = [f for f in work_dir.iterdir() if f.is_file()]
+    """
+    获取服务器上的文件列表（支持过滤、排序和游标分页）
     
-    # 按后缀过滤
-    if suffix:
-        files = [f for f in files if f.suffix.lower() == f".{suffix.lower()}"]
-    
-    # 排序
-    if sort_by == "created_at":
-        files.sort(key=lambda x: x.stat().st_ctime, reverse=True)  # 最新创建的在前
-    elif sort_by == "modified_at":
-        files.sort(key=lambda x: x.stat().st_mtime, reverse=True)  # 最新修改的在前
-    elif sort_by == "size":
-        files.sort(key=lambda x: x.stat().st_size, reverse=True)  # 从大到小
-    else:
+    文件元数据来自按目录 mtime 增量刷新的索引，不会每次请求都 stat 所有文件。
+    有下一页时通过响应头 X-Next-Cursor 返回游标。
+    """
+    if sort_by not in SORT_FIELDS:
         raise HTTPException(status_code=400, detail="无效的排序字段")
+    work_dir = config.UPLOAD
+    index = get_file_index(work_dir)
+    items, next_key = index.list(
+        sort_by=sort_by,
+        after=decode_file_cursor(cursor) if cursor else None,
+        limit=limit,
+        prefix=prefix,
+        suffix=suffix,
+        recursive=recursive
+    )
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_file_cursor(next_key)
     
     # 返回文件信息列表
-    return [get_file_info(f) for f in files]
+    return [
+        {
+            "name": rel,
+            "size": meta.size,  # 文件大小（字节）
+            "created_at": datetime.fromtimestamp(meta.ctime).isoformat(),  # 创建时间
+            "modified_at": datetime.fromtimestamp(meta.mtime).isoformat(),  # 修改时间
+            "path": str(work_dir / rel)
+        }
+        for rel, meta in items
+    ]
+
+
+@router.get("/archive/{archive_format}", summary="打包下载多个文件")
+def download_archive(
+    archive_format: str,
+    names: List[str] = Query([], alias="name", description="要打包的文件名，可重复指定"),
+    prefix: Optional[str] = Query(None, description="打包文件名（递归时为相对路径）以此开头的所有文件"),
+    recursive: bool = Query(False, description="prefix 匹配时是否包含子目录中的文件"),
+    compress: bool = Query(False, description="zip 格式是否压缩（默认仅存储）"),
+    filename: str = Query("", description="下载的归档文件名（不含扩展名）")
+):
+    """
+    将多个文件打包为 zip / tar / tar.gz 流式返回
+
+    归档边读文件边生成，不在磁盘或内存中构建完整归档，内存占用与文件总大小无关。
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"不支持的归档格式，可选：{', '.join(ARCHIVE_FORMATS)}")
+    if not names and prefix is None:
+        raise HTTPException(status_code=400, detail="需要指定 name 或 prefix")
+    work_dir = config.UPLOAD
+
+    entries: Dict[str, Path] = {}
+    for name in names:
+        file_path = validate_file_path(name, work_dir)
+        if not file_path.is_file():
+            raise HTTPException(status_code=404, detail=f"文件 '{name}' 不存在")
+        try:
+            entries[normalize_arcname(Path(name).as_posix())] = file_path
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"非法文件路径 '{name}'")
+    if prefix is not None:
+        items, _ = get_file_index(work_dir).list(prefix=prefix, recursive=recursive)
+        for rel, _meta in items:
+            entries[normalize_arcname(rel)] = validate_file_path(rel, work_dir)
+    if not entries:
+        raise HTTPException(status_code=404, detail="没有匹配的文件")
+
+    archive_name = archive_filename(filename, archive_format)
+    return StreamingResponse(
+        iter_archive(
+            [(entries[rel], rel) for rel in sorted(entries)], archive_format, compress=compress,
+            root=work_dir, internal=INTERNAL_DIR_NAMES
+        ),
+        media_type=ARCHIVE_FORMATS[archive_format],
+        headers={"content-disposition": f"attachment; filename*=utf-8''{quote(archive_name)}"}
+    )
 
 
 @router.get("/{filename}", summary="下载文件")
-def download_file(filename: str):
-    """下载指定文件"""
+async def download_file(
+    filename: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    inline: bool = Query(False, description="在浏览器中直接打开而不是下载")
+):
+    """
+    下载指定文件
+    - 支持 Range / If-Range 断点续传和多段请求（由 FileResponse 处理）
+    - 支持 If-None-Match / If-Modified-Since 条件请求，未修改时返回 304
+    - Content-Type 按扩展名推断
+    - 开启 DOWNLOAD_COMPRESS 时按 Accept-Encoding 返回预压缩副本，
+      副本不存在时本次返回原文件并在后台生成
+    """
     work_dir = config.UPLOAD
     file_path = validate_file_path(filename, work_dir)
-    
-    if not file_path.exists() or not file_path.is_file():
+
+    try:
+        stat = await run_in_threadpool(os.stat, file_path)
+    except FileNotFoundError:
+        stat = None
+    if stat is None or not S_ISREG(stat.st_mode):
         raise HTTPException(status_code=404, detail=f"文件 '{filename}' 不存在")
-    
-    # 返回文件响应（自动处理下载）
+
+    if config.DOWNLOAD_STRONG_ETAG:
+        etag = await run_in_threadpool(file_etag, file_path, stat, True)
+    else:
+        etag = file_etag(file_path, stat)
+    headers = {
+        "last-modified": formatdate(stat.st_mtime, usegmt=True),
+        "cache-control": config.DOWNLOAD_CACHE_CONTROL,
+    }
+
+    encoding: Optional[str] = None
+    variant: Optional[Path] = None
+    if config.DOWNLOAD_COMPRESS and is_compressible(file_path, stat.st_size, config.DOWNLOAD_COMPRESS_MIN_SIZE):
+        encoding, variant, missing = await run_in_threadpool(
+            find_variant, work_dir, file_path, stat, request.headers.get("accept-encoding")
+        )
+        if missing:
+            background_tasks.add_task(compress_variants, work_dir, file_path)
+        headers["vary"] = "Accept-Encoding"
+    if encoding is not None:
+        # 不同编码是不同的表示，ETag 需要区分
+        etag = f'{etag[:-1]}-{encoding}"'
+        headers["content-encoding"] = encoding
+    headers["etag"] = etag
+
+    if is_not_modified(request.headers, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    disposition = "inline" if inline else "attachment"
+    if variant is not None:
+        # Content-Type 按原文件名推断，长度等由副本决定
+        return FileResponse(
+            path=variant,
+            filename=filename,
+            media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            headers=headers,
+            content_disposition_type=disposition
+        )
+    # 传入 stat_result 避免重复 stat；media_type=None 时按文件名推断
     return FileResponse(
         path=file_path,
         filename=filename,
-        media_type="application/octet-stream"  # 通用二进制类型
+        stat_result=stat,
+        headers=headers,
+        content_disposition_type=disposition
     )
 
 
@@ -121,5 +422,6 @@ def delete_file(filename: str):
         raise HTTPException(status_code=404, detail=f"文件 '{filename}' 不存在")
     
     os.remove(file_path)
+    remove_variants(work_dir, file_path)
     return {"message": f"文件 '{filename}' 已成功删除"}
 
@@ -21,7 +21,7 @@ for file in os.listdir(os.path.dirname(__file__)):
         except Exception as e:
             print(f"加载模块 {module_path} 失败：{e}")
 
-logger.info(f"已注册的路由: {[route.path for route in app.routes]}")  # type: ignore # 打印所有注册的路由
+logger.info(f"已注册的路由: {[getattr(route, 'path', route) for route in app.routes]}")  # type: ignore # 打印所有注册的路由
 # 主页面路由（可选）
 @app.get("/")
 async def root():
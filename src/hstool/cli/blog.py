@@ -5,11 +5,15 @@ import shutil
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List
 from inspect import cleandoc
 from ..tool.common import is_vscode_installed, command
 from ..config import config
 
+if TYPE_CHECKING:
+    from ..tool.frontmatter import EditOp
+    from ..tool.postindex import PostQuery
+
 
 @click.group()
 def blog():
@@ -43,7 +47,10 @@ def new(slug: str, title: str):
 
 @blog.command()
 @click.argument("path", required=False, default=None)
-def init(path: str):
+@click.option("--batch-size", default=500, show_default=True, help="每批写入并提交的文章数")
+@click.option("--jobs", "-j", default=1, show_default=True, help="并行解析的进程数")
+@click.option("--queue-size", type=int, default=None, help="解析结果队列深度（默认 jobs*4）")
+def init(path: str, batch_size: int, jobs: int, queue_size: int | None):
     """
     导入本地目录的博客到数据库
     
@@ -60,7 +67,211 @@ def init(path: str):
     if not path:
         path = config.BLOGPATH
     from ..tool.blog import init_blog
-    init_blog(path)
+    stats = init_blog(path, batch_size=batch_size, jobs=jobs, queue_size=queue_size)
+    for file, error in stats["errors"]:
+        click.secho(f"解析失败 {file}: {error}", fg="red")
+    click.echo(
+        f"新增 {stats['added']} 篇，更新 {stats['updated']} 篇，"
+        f"跳过 {stats['skipped']} 篇，失败 {len(stats['errors'])} 篇"
+    )
+
+@blog.command()
+@click.argument("path", required=False, default=None)
+@click.option("--full", is_flag=True, help="忽略上次同步的提交，与 git 跟踪的全部文件对账")
+def sync(path: str, full: bool):
+    """按 git 提交增量同步博客目录（包括删除和重命名）"""
+    if not path:
+        path = config.BLOGPATH
+    from ..tool.gitsync import git_sync_blog
+    try:
+        result = git_sync_blog(path, full=full)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    stats = result["stats"]
+    for file, error in stats["errors"]:
+        click.secho(f"解析失败 {file}: {error}", fg="red")
+    since = result["since"][:8] if result["since"] else "完整对账"
+    click.echo(
+        f"{since} -> {result['head'][:8]}：{result['changed_files']} 个文件变化，"
+        f"新增 {stats['added']} 篇，更新 {stats['updated']} 篇，删除 {stats['deleted']} 篇，"
+        f"跳过 {stats['skipped']} 篇，失败 {len(stats['errors'])} 篇"
+    )
+
+@blog.command()
+@click.argument("path", required=False, default=None)
+@click.option("--debounce", default=0.5, show_default=True, help="变化停止多少秒后才同步")
+@click.option("--polling", is_flag=True, help="强制使用轮询（如网络文件系统上 inotify 无效时）")
+@click.option("--interval", default=1.0, show_default=True, help="轮询间隔秒数")
+def watch(path: str, debounce: float, polling: bool, interval: float):
+    """监视博客目录，文件变化时增量同步到数据库（Ctrl-C 退出）"""
+    if not path:
+        path = config.BLOGPATH
+    from ..tool.blog import init_blog, sync_blog_changes
+    from ..tool.watch import watch_changes
+    stats = init_blog(path)
+    click.echo(f"初始同步：新增 {stats['added']} 篇，更新 {stats['updated']} 篇，开始监视 {path}")
+    try:
+        for changes in watch_changes(path, debounce=debounce, polling=polling, interval=interval):
+            if "rescan" in changes.values():
+                stats = init_blog(path)
+            else:
+                stats = sync_blog_changes(path, changes)
+            for file, error in stats["errors"]:
+                click.secho(f"解析失败 {file}: {error}", fg="red")
+            if stats["added"] or stats["updated"] or stats["deleted"]:
+                click.echo(
+                    f"[{datetime.now():%H:%M:%S}] 新增 {stats['added']} 篇，更新 {stats['updated']} 篇，"
+                    f"删除 {stats['deleted']} 篇"
+                )
+    except KeyboardInterrupt:
+        pass
+
+@blog.command()
+@click.option("--from-files", "from_files", default=None, help="从博客目录读取文章，不指定则读取数据库")
+@click.option("--url", default=None, help="Strapi 地址  [默认: STRAPI_URL]")
+@click.option("--collection", default=None, help="集合的复数 API ID  [默认: STRAPI_COLLECTION]")
+@click.option("--concurrency", "-c", type=int, default=None, help="并发请求数  [默认: STRAPI_CONCURRENCY]")
+@click.option("--force", is_flag=True, help="忽略推送记录，推送全部文章")
+@click.option("--dry-run", is_flag=True, help="只统计需要推送的文章")
+def push(from_files: str | None, url: str | None, collection: str | None, concurrency: int | None, force: bool, dry_run: bool):
+    """推送文章到 Strapi（只推送内容有变化的文章）"""
+    from ..sql.db import Session
+    from ..tool.strapi import StrapiClient, iter_db_posts, iter_file_posts, push_posts
+    concurrency = concurrency or config.STRAPI_CONCURRENCY
+    client = StrapiClient(
+        url or config.STRAPI_URL,
+        collection or config.STRAPI_COLLECTION,
+        token=config.STRAPI_TOKEN,
+        concurrency=concurrency,
+        retries=config.STRAPI_RETRIES,
+        timeout=config.STRAPI_TIMEOUT
+    )
+    session = next(Session())
+    # 读取文章与写推送记录使用不同会话，分批提交不影响正在进行的查询
+    read_session = next(Session())
+    try:
+        posts = iter_file_posts(from_files) if from_files else iter_db_posts(read_session)
+        stats = push_posts(session, client, posts, concurrency=concurrency, force=force, dry_run=dry_run)
+    finally:
+        read_session.close()
+        session.close()
+        client.close()
+    for slug, error in stats["errors"]:
+        click.secho(f"推送失败 {slug}: {error}", fg="red")
+    action = "需要" if dry_run else ""
+    click.echo(
+        f"{action}新建 {stats['created']} 篇，{action}更新 {stats['updated']} 篇，"
+        f"未变化 {stats['skipped']} 篇，失败 {len(stats['errors'])} 篇"
+    )
+
+def run_index_query(query: "PostQuery", path: str | None, refresh: bool, jobs: int, count: bool):
+    from ..tool.postindex import open_index, query_posts, refresh_index
+    root = path or config.BLOGPATH
+    conn = open_index()
+    try:
+        if refresh:
+            stats = refresh_index(conn, root, jobs=jobs)
+            for file, error in stats["errors"]:
+                click.secho(f"解析失败 {file}: {error}", fg="red", err=True)
+        rows = query_posts(conn, root, query)
+    finally:
+        conn.close()
+    if count:
+        click.echo(len(rows))
+        return
+    date_field = query.get("by", "update")
+    for row in rows:
+        date = (row[date_field] or "")[:16].ljust(16)
+        tags = f"  [{', '.join(row['tags'])}]" if row["tags"] else ""
+        click.echo(f"{date}  {click.style(row['slug'], fg='green')}  {row['title'] or ''}{tags}")
+
+
+def index_options(f):
+    f = click.option("--count", is_flag=True, help="只输出匹配的文章数")(f)
+    f = click.option("--jobs", "-j", default=1, show_default=True, help="刷新索引时并行解析的进程数")(f)
+    f = click.option("--no-refresh", "no_refresh", is_flag=True, help="直接查询索引，不检查文件变化")(f)
+    f = click.option("--path", default=None, help="博客目录  [默认: BLOGPATH]")(f)
+    return f
+
+
+@blog.command()
+@click.option("--tag", "-t", "tags", multiple=True, help="带有该标签（可重复，需同时满足）")
+@click.option("--category", "-c", default=None, help="分类（包括子分类），多级以 / 分隔")
+@click.option("--since", default=None, help="起始日期（含），也可以是 30d/2w/1m/1y")
+@click.option("--until", default=None, help="结束日期（只有日期时包含当天）")
+@click.option("--by", type=click.Choice(["create", "update"]), default="update", show_default=True, help="日期范围和排序使用的字段")
+@click.option("--title", default=None, help="标题包含的文字")
+@click.option("--sort", type=click.Choice(["create", "update", "title", "slug"]), default=None, help="排序字段  [默认: --by]")
+@click.option("--reverse", "-r", is_flag=True, help="升序排列")
+@click.option("--limit", "-n", type=int, default=None, help="最多显示的文章数")
+@index_options
+def ls(tags, category, since, until, by, title, sort, reverse, limit, path, no_refresh, jobs, count):
+    """列出博客目录的文章（使用本地索引，按文件变化增量刷新）"""
+    from ..tool.postindex import PostQuery, parse_query_date
+    query = PostQuery(tags=list(tags), by=by, reverse=reverse)
+    try:
+        if since:
+            query["since"] = parse_query_date(since)
+        if until:
+            query["until"] = parse_query_date(until, end=True)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    if category:
+        query["category"] = category
+    if title:
+        query["title"] = title
+    if sort:
+        query["sort"] = sort
+    if limit:
+        query["limit"] = limit
+    run_index_query(query, path, not no_refresh, jobs, count)
+
+@blog.command()
+@click.argument("terms", nargs=-1)
+@index_options
+def query(terms, path, no_refresh, jobs, count):
+    """
+    按条件查询博客目录的文章
+
+    \b
+    条件为 key:value，可组合，不带 key 的词匹配标题:
+        tag:python（可重复）  category:技术/后端  title:fastapi
+        since:2024-01-01  until:30d  by:create  sort:-title  limit:10
+    例如:
+        hstool blog query tag:python since:1m
+    """
+    from ..tool.postindex import parse_query_terms
+    try:
+        parsed = parse_query_terms(terms)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="TERMS")
+    run_index_query(parsed, path, not no_refresh, jobs, count)
+
+@blog.command()
+@click.argument("query")
+@click.option("--limit", "-n", default=20, show_default=True, help="返回的结果数")
+def search(query: str, limit: int):
+    """全文搜索数据库中的博客"""
+    from html import unescape
+    from ..sql.db import Session
+    from ..sql.search import search_blogs
+    session = next(Session())
+    for row in search_blogs(session, query, limit=limit):
+        click.secho(f"{row['slug']}  {row['title']}", fg="green")
+        # 片段是转义后的 HTML，终端中显示原文
+        snippet = unescape(row["snippet"].replace("<mark>", "\033[1;31m").replace("</mark>", "\033[0m"))
+        click.echo(f"    {' '.join(snippet.split())}")
+    session.close()
+
+@blog.command()
+def reindex():
+    """重建博客全文索引"""
+    from ..sql.db import engine
+    from ..sql.search import rebuild_search_index
+    with engine.begin() as conn:
+        if not rebuild_search_index(conn):
+            raise click.ClickException(f"数据库 {conn.dialect.name} 暂不支持全文索引")
+    click.echo("全文索引已重建")
 
 @blog.command()
 @click.argument("path", required=False, default=None)
@@ -86,10 +297,62 @@ def front():
     """Modify frontmatter information"""
 
 
+def parse_assignment(value: str, option: str) -> tuple[str, str]:
+    key, sep, rest = value.partition("=")
+    if not sep or not key:
+        raise click.BadParameter(f"格式应为 KEY=VALUE: {value}", param_hint=option)
+    return key.strip(), rest
+
+def run_front_edit(ops: List["EditOp"], pattern: str, tags: tuple, jobs: int, dry_run: bool, verbose: bool = True):
+    from ..tool.frontmatter import bulk_edit_frontmatter
+    files = sorted(Path(config.BLOGPATH).glob(pattern))
+    changed = errors = 0
+    for result in bulk_edit_frontmatter(files, ops, tags=list(tags) or None, dry_run=dry_run, jobs=jobs):
+        if result["error"]:
+            errors += 1
+            click.secho(f"失败 {result['path']}: {result['error']}", fg="red")
+        elif result["changes"]:
+            changed += 1
+            if verbose:
+                click.secho(result["path"], fg="green")
+                for change in result["changes"]:
+                    click.echo(f"    {change}")
+    action = "将修改" if dry_run else "已修改"
+    click.echo(f"共 {len(files)} 个文件，{action} {changed} 个，未变化 {len(files) - changed - errors} 个，失败 {errors} 个")
+
+
+@front.command()
+@click.option("--rename", "renames", multiple=True, metavar="OLD=NEW", help="重命名字段（可重复）")
+@click.option("--set", "sets", multiple=True, metavar="KEY=VALUE", help="设置字段，VALUE 按 YAML 解析（可重复）")
+@click.option("--delete", "deletes", multiple=True, metavar="KEY", help="删除字段（可重复）")
+@click.option("--glob", "pattern", default="*/*.md", show_default=True, help="相对于 BLOGPATH 的文件匹配模式")
+@click.option("--tag", "tags", multiple=True, help="只修改带有该标签的文章（可重复，满足其一即可）")
+@click.option("--jobs", "-j", default=os.cpu_count() or 1, show_default=True, help="并行处理的进程数")
+@click.option("--dry-run", is_flag=True, help="只显示将要修改的内容，不写文件")
+@click.option("--quiet", "-q", is_flag=True, help="不显示每个文件的修改")
+def edit(renames, sets, deletes, pattern: str, tags, jobs: int, dry_run: bool, quiet: bool):
+    """
+    批量修改 Frontmatter
+
+    \b
+    按 --rename、--set、--delete 的顺序执行，只重写内容有变化的文件，例如:
+        hstool blog front edit --rename date=create --set draft=false --tag python --dry-run
+    """
+    import yaml
+    ops: List["EditOp"] = [("rename", *parse_assignment(v, "--rename")) for v in renames]
+    for value in sets:
+        key, raw = parse_assignment(value, "--set")
+        ops.append(("set", key, yaml.safe_load(raw) if raw else ""))
+    ops += [("delete", key, None) for key in deletes]
+    if not ops:
+        raise click.UsageError("至少需要一个 --rename、--set 或 --delete")
+    run_front_edit(ops, pattern, tags, jobs, dry_run, verbose=not quiet)
+
 @front.command()
 @click.argument("name")
 @click.argument("value")
-def rename(name: str, value: str):
-    from ..tool.frontmatter import rename_frontmatter
-    for file in Path(config.BLOGPATH).glob("*/*.md"):
-        rename_frontmatter(file, **{name: value})
\ No newline at end of file
+@click.option("--jobs", "-j", default=os.cpu_count() or 1, show_default=True, help="并行处理的进程数")
+@click.option("--dry-run", is_flag=True, help="只显示将要修改的内容，不写文件")
+def rename(name: str, value: str, jobs: int, dry_run: bool):
+    """Rename a frontmatter key in all posts."""
+    run_front_edit([("rename", name, value)], "*/*.md", (), jobs, dry_run)
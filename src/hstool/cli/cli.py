@@ -3,9 +3,94 @@ from pathlib import Path
 import os
 import click
 import importlib
-from ..tool.common import command
+from typing import Dict, List, Optional, Tuple
 
-@click.group()
+# 子命令清单：命令名 -> (模块, 简短说明)
+# 列出命令、--help 和补全只读取这里，模块在命令真正被调用时才导入。
+# 新增 hstool/cli/ 下的模块时请在此登记，未登记的模块仍会被发现，但显示帮助时需要导入。
+LAZY_COMMANDS: Dict[str, Tuple[str, str]] = {
+    "blog": ("hstool.cli.blog", "blog tool"),
+    "config": ("hstool.cli.config", "config tool"),
+    "files": ("hstool.cli.files", "uploaded files tool"),
+}
+
+
+def discover_commands() -> Dict[str, Tuple[str, str]]:
+    """清单加上 hstool/cli/ 下未登记的模块（只看文件名，不导入）"""
+    commands = dict(LAZY_COMMANDS)
+    for file in Path(__file__).parent.glob('*.py'):
+        name = file.name[:-3]
+        if name in ('__init__', 'cli') or name in commands:
+            continue
+        commands[name] = (f'hstool.cli.{name}', '')
+    return commands
+
+
+class LazyGroup(click.Group):
+    """子命令按需导入的命令组，模块名与命令对象同名"""
+
+    def __init__(self, *args, lazy_subcommands: Optional[Dict[str, Tuple[str, str]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.commands or cmd_name not in self.lazy_subcommands:
+            return super().get_command(ctx, cmd_name)
+        module_name = self.lazy_subcommands[cmd_name][0]
+        try:
+            module = importlib.import_module(module_name)
+            cmd_obj = getattr(module, cmd_name)
+        except ImportError as e:
+            click.secho(f"警告：导入模块 {module_name} 失败: {e}", fg='yellow')
+            return None
+        except Exception as e:
+            click.secho(f"处理模块 {module_name} 时出错: {e}", fg='red')
+            return None
+        self.add_command(cmd_obj, cmd_name)
+        return cmd_obj
+
+    def _short_help(self, ctx: click.Context, name: str, limit: int = 45) -> Optional[str]:
+        """已加载的命令取自命令对象，未加载的取自清单（清单没有说明时才导入）"""
+        if name not in self.commands:
+            help_text = self.lazy_subcommands.get(name, ("", ""))[1]
+            if help_text:
+                return help_text
+        cmd = self.get_command(ctx, name)
+        if cmd is None or cmd.hidden:
+            return None
+        return cmd.get_short_help_str(limit)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            help_text = self._short_help(ctx, name, limit)
+            if help_text is not None:
+                rows.append((name, help_text))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+    def shell_complete(self, ctx: click.Context, incomplete: str):
+        from click.shell_completion import CompletionItem
+        results = []
+        for name in self.list_commands(ctx):
+            if name.startswith(incomplete):
+                help_text = self._short_help(ctx, name)
+                if help_text is not None:
+                    results.append(CompletionItem(name, help=help_text))
+        # 跳过 Group.shell_complete，只补全本命令的选项
+        results.extend(click.Command.shell_complete(self, ctx, incomplete))
+        return results
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=discover_commands())
 def cli():
     """Command-line toolset for hstool.\n
     To get tap completion:
@@ -16,17 +101,54 @@ def cli():
 
 
 @cli.command()
-@click.option("--host", "-h", default="127.0.0.1")
-@click.option("--port", "-p", default=8000)
-@click.option("--reload", is_flag=True)
-def api(host: str, port: int, reload: bool):
+@click.option("--host", "-h", default=None, help="监听地址  [默认: API_HOST]")
+@click.option("--port", "-p", type=int, default=None, help="监听端口  [默认: API_PORT]")
+@click.option("--reload", is_flag=True, help="代码修改后自动重启（开发用，不能与多进程同时使用）")
+@click.option("--workers", "-w", type=int, default=None, help="工作进程数，0 表示 CPU 核数  [默认: API_WORKERS]")
+@click.option("--loop", type=click.Choice(["auto", "asyncio", "uvloop"]), default=None, help="事件循环  [默认: API_LOOP]")
+@click.option("--http", type=click.Choice(["auto", "h11", "httptools"]), default=None, help="HTTP 解析器  [默认: API_HTTP]")
+@click.option("--keep-alive", type=int, default=None, help="keep-alive 空闲超时秒数  [默认: API_KEEP_ALIVE]")
+@click.option("--backlog", type=int, default=None, help="连接队列长度  [默认: API_BACKLOG]")
+@click.option("--limit-concurrency", type=int, default=None, help="每个进程的并发上限，超出返回 503，0 表示不限制  [默认: API_LIMIT_CONCURRENCY]")
+@click.option("--timeout-graceful-shutdown", type=int, default=None, help="关闭时等待进行中请求的秒数  [默认: API_TIMEOUT_GRACEFUL_SHUTDOWN]")
+@click.option("--access-log/--no-access-log", default=None, help="是否输出访问日志  [默认: API_ACCESS_LOG]")
+def api(
+    host: Optional[str],
+    port: Optional[int],
+    reload: bool,
+    workers: Optional[int],
+    loop: Optional[str],
+    http: Optional[str],
+    keep_alive: Optional[int],
+    backlog: Optional[int],
+    limit_concurrency: Optional[int],
+    timeout_graceful_shutdown: Optional[int],
+    access_log: Optional[bool]
+):
     """启动api服务"""
     import uvicorn
+    from ..config import config
+    workers = config.API_WORKERS if workers is None else workers
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if reload and workers > 1:
+        raise click.UsageError("--reload 不能与多个工作进程同时使用")
+    limit_concurrency = config.API_LIMIT_CONCURRENCY if limit_concurrency is None else limit_concurrency
     uvicorn.run(
         app='hstool.api.main:app',
-        host=host ,
-        port=port,
-        reload=reload
+        host=host or config.API_HOST,
+        port=config.API_PORT if port is None else port,
+        reload=reload,
+        workers=workers,
+        loop=loop or config.API_LOOP,
+        http=http or config.API_HTTP,
+        timeout_keep_alive=config.API_KEEP_ALIVE if keep_alive is None else keep_alive,
+        backlog=config.API_BACKLOG if backlog is None else backlog,
+        limit_concurrency=limit_concurrency or None,
+        timeout_graceful_shutdown=(
+            config.API_TIMEOUT_GRACEFUL_SHUTDOWN if timeout_graceful_shutdown is None else timeout_graceful_shutdown
+        ),
+        access_log=config.API_ACCESS_LOG if access_log is None else access_log,
     )
     
     
@@ -36,6 +158,17 @@ def init_sql():
     from ..sql.db import engine, Base
     Base.metadata.create_all(engine)
 
+@cli.command()
+def migrate_sql():
+    """迁移已有数据库：合并重复的标签/分类并补齐索引"""
+    from ..sql.db import engine
+    from ..sql.migrate import migrate_blog_schema
+    report = migrate_blog_schema(engine)
+    click.echo(f"新建表: {', '.join(report['created_tables']) or '无'}")
+    click.echo(f"合并重复标签 {report['merged_tags']} 个，重复分类 {report['merged_categories']} 个")
+    click.echo(f"新建索引: {', '.join(report['created_indexes']) or '无'}")
+    click.echo(f"全文索引: {'已重建' if report['search_index'] else '当前数据库不支持'}")
+
 @cli.command()
 @click.option(
     "--shell",
@@ -44,6 +177,7 @@ def init_sql():
 )
 def init_completion(shell: str):
     """配置自动补全"""
+    from ..tool.common import command
     if not shell:
         # 自动检测终端类型（简单实现）
         shell = os.path.basename(os.environ.get("SHELL", ""))
@@ -67,26 +201,5 @@ def init_completion(shell: str):
                 f.write(cmd+"\n")
         print(f"自动补全已配置，重启终端生效，或者运行：\n {cmd}")
 
-def auto_load_commands():
-    """自动遍历当前目录下的所有模块，导入子命令并注册到主cli"""
-    current_dir = Path(__file__).parent
-    for file in current_dir.glob('*.py'):
-        name = file.name[:-3]
-        if name == '__init__' or name == "cli":
-            continue
-        module_name = f'hstool.cli.{name}'
-        
-        try:
-            module = importlib.import_module(module_name)
-            cmd_obj = getattr(module, name)
-            cli.add_command(cmd_obj)
-        
-        except ImportError as e:
-            click.secho(f"警告：导入模块 {module_name} 失败: {e}", fg='yellow')
-        except Exception as e:
-            click.secho(f"处理模块 {module_name} 时出错: {e}", fg='red')
-
-auto_load_commands()
-
 if __name__ == "__main__":
     cli()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import click
+from ..config import config
+
+
+def human_size(size: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+@click.group()
+def files():
+    """uploaded files tool"""
+
+
+@files.command()
+def stats():
+    """统计按内容去重存储节省的空间"""
+    from ..tool.blobstore import blob_stats
+    s = blob_stats(config.UPLOAD)
+    click.echo(f"内容数: {s['blobs']}，文件名引用数: {s['references']}")
+    click.echo(f"实际占用: {human_size(s['stored_bytes'])}，去重前: {human_size(s['logical_bytes'])}")
+    click.echo(f"节省: {human_size(s['saved_bytes'])}")
+    click.echo(f"无引用内容: {s['orphans']} 个，{human_size(s['orphan_bytes'])}")
+
+
+@files.command()
+@click.option("--grace", default=3600, show_default=True, help="只清理超过该秒数未修改的内容")
+@click.option("--dry-run", is_flag=True, help="只统计不删除")
+def gc(grace: int, dry_run: bool):
+    """清理没有任何文件名引用的内容，以及源文件已删除的压缩副本"""
+    from ..tool.blobstore import gc_blobs
+    from ..tool.compress import gc_variants
+    removed, freed = gc_blobs(config.UPLOAD, grace=grace, dry_run=dry_run)
+    action = "可清理" if dry_run else "已清理"
+    click.echo(f"{action} {removed} 个内容，释放 {human_size(freed)}")
+    if not dry_run:
+        click.echo(f"已清理 {gc_variants(config.UPLOAD)} 个压缩副本")
+
+
+@files.command()
+def dedup():
+    """将 UPLOAD 下已有的文件（包括子目录）转存到去重存储"""
+    from ..tool.blobstore import dedup_existing
+    click.echo(f"已处理 {dedup_existing(config.UPLOAD)} 个文件")
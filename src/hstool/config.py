@@ -37,7 +37,49 @@ class Config(BaseModel):
     UPLOAD: Path = Path(".")
     AUTHOR: str = "Unknown"
     BLOGPATH: str = "posts"
+    BLOG_INDEX: str = ".hstool/posts.db"  # hstool blog ls/query 使用的本地文章索引
     ZONE: str = "Asia/Shanghai"
+    UPLOAD_MAX_SIZE: int = 4 * 1024 ** 3  # 单个上传文件的最大字节数，0 表示不限制
+    UPLOAD_SESSION_TTL: int = 24 * 3600  # 分块上传会话无活动多少秒后过期
+    UPLOAD_DEDUP: bool = False  # 是否按内容去重存储上传的文件
+    DOWNLOAD_CACHE_CONTROL: str = "no-cache"  # 下载响应的 Cache-Control，no-cache 表示每次用 ETag 重新验证
+    DOWNLOAD_STRONG_ETAG: bool = False  # 是否用内容哈希作为 ETag（未知哈希的文件首次下载需计算）
+    DOWNLOAD_COMPRESS: bool = False  # 是否为文本类文件生成 gzip/zstd 预压缩副本并按 Accept-Encoding 返回
+    DOWNLOAD_COMPRESS_MIN_SIZE: int = 1024  # 小于该字节数的文件不压缩
+
+    # hstool api 服务配置（命令行参数优先）
+    API_HOST: str = "127.0.0.1"
+    API_PORT: int = 8000
+    API_WORKERS: int = 1  # 工作进程数，0 表示 CPU 核数
+    API_LOOP: str = "auto"  # 事件循环：auto / asyncio / uvloop，auto 在安装了 uvloop 时使用它
+    API_HTTP: str = "auto"  # HTTP 解析器：auto / h11 / httptools
+    API_KEEP_ALIVE: int = 5  # 空闲 keep-alive 连接保持的秒数
+    API_BACKLOG: int = 2048  # 等待 accept 的连接队列长度
+    API_LIMIT_CONCURRENCY: int = 0  # 每个进程同时处理的连接/请求上限，超出返回 503，0 表示不限制
+    API_TIMEOUT_GRACEFUL_SHUTDOWN: int = 30  # 关闭时等待进行中请求的秒数
+    API_ACCESS_LOG: bool = True  # 是否输出每个请求的访问日志
+
+    # Strapi 推送配置
+    STRAPI_URL: str = "http://localhost:1337"
+    STRAPI_TOKEN: str = ""  # API Token，为空时不发送 Authorization
+    STRAPI_COLLECTION: str = "blogs"  # 集合的复数 API ID，即 /api/<collection>
+    STRAPI_CONCURRENCY: int = 8  # 同时进行的请求数
+    STRAPI_RETRIES: int = 5  # 连接失败、429 和 5xx 的重试次数（指数退避）
+    STRAPI_TIMEOUT: int = 30  # 单个请求的超时秒数
+
+    # 数据库引擎配置
+    SQL_ECHO: bool = False  # 是否打印执行的SQL语句
+    SQL_POOL_SIZE: int = 5
+    SQL_MAX_OVERFLOW: int = 10
+    SQL_POOL_PRE_PING: bool = True  # 取用连接前先检测是否可用
+    SQL_CACHE_SIZE: int = 500  # 编译后语句的缓存数量
+    # SQLite 连接时设置的 PRAGMA
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000  # 负数表示 KiB，即 64MB
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+    # SQLite 全文索引分词器，trigram 支持中文子串搜索（需 SQLite >= 3.34）
+    SQLITE_FTS_TOKENIZE: str = "trigram"
 
     def __init__(self,** data: Any):
         # 先加载配置文件（在pydantic初始化前执行）
@@ -67,6 +109,10 @@ class Config(BaseModel):
         field_type = self.__class__.model_fields[field_name].annotation
         if field_type is Path:
             return Path(value)
+        if field_type is bool:
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        if field_type is int:
+            return int(value)
         return value  # 其他类型暂时直接返回（可扩展）
 
     def getenv(self, key: str, default: str = "") -> str:
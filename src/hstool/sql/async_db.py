@@ -0,0 +1,52 @@
+from typing import Any, AsyncIterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession as SQLAAsyncSession
+from ..config import Config, config
+from .db import engine_options, sqlite_pragmas
+
+# 同步驱动 -> 异步驱动（需安装：pip install hstool[async]）
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def async_url(url: str) -> str:
+    """将配置中的同步数据库URL转换为对应的异步驱动URL"""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"数据库 {backend} 暂不支持异步访问")
+    return u.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def create_db_async_engine(cfg: Config = config) -> AsyncEngine:
+    """按配置创建异步引擎，参数与同步引擎一致"""
+    new_engine = create_async_engine(async_url(cfg.SQL), **engine_options(cfg))
+    if new_engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas(cfg)
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for key, value in pragmas.items():
+                cursor.execute(f"PRAGMA {key}={value}")
+            cursor.close()
+    return new_engine
+
+def get_async_engine() -> AsyncEngine:
+    """获取全局异步引擎，首次调用时才创建"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_db_async_engine(config)
+    return _async_engine
+
+async def AsyncSession() -> AsyncIterator[SQLAAsyncSession]:
+    """FastAPI 依赖：提供异步会话，请求结束后自动关闭"""
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -1,16 +1,21 @@
 from __future__ import annotations
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Connection
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Index, Table, Connection
 from sqlalchemy.orm import relationship
 from sqlalchemy.event import listens_for
 from datetime import datetime
 from typing import Dict, Any
 from .db import Base
+from .search import create_search_index
     
 class Tag(Base):
     __tablename__ = 'tag'
     id = Column(Integer, primary_key=True, autoincrement=True) 
     name = Column(String(50), nullable=False) 
 
+    __table_args__ = (
+        Index("uq_tag_name", "name", unique=True),
+    )
+
 class Category(Base):
     __tablename__ = 'category'
     id = Column(Integer, primary_key=True, autoincrement=True) 
@@ -22,6 +27,17 @@ class Category(Base):
     children = relationship("Category", back_populates="parent", remote_side=[id])
     parent = relationship("Category", back_populates="children")
 
+    __table_args__ = (
+        # 同一父分类下名称唯一
+        Index("uq_category_parent_name", "parent_id", "name", unique=True),
+        # 唯一索引中 NULL 互不相等，顶级分类单独用部分索引约束
+        Index(
+            "uq_category_root_name", "name", unique=True,
+            sqlite_where=parent_id.is_(None),
+            postgresql_where=parent_id.is_(None)
+        ),
+    )
+
 # 监听 Category 表的创建事件，自动插入默认分类
 @listens_for(Category.__table__, 'after_create')
 def insert_default_category(
@@ -43,6 +59,22 @@ class Blog(Base):
     category_id = Column(Integer, ForeignKey('category.id', ondelete='RESTRICT'), default=1)
     content = Column(Text, nullable=False) 
 
+    __table_args__ = (
+        Index("ix_blog_create", "create"),
+        Index("ix_blog_update", "update"),
+        Index("ix_blog_category_id", "category_id"),
+    )
+
+# 监听 Blog 表的创建事件，自动创建全文索引
+@listens_for(Blog.__table__, 'after_create')
+def create_blog_search_index(
+    target: Table, 
+    connection: Connection, 
+    **kwargs: Dict[str, Any]
+) -> None:
+    """监听Blog表的创建事件，创建全文索引及同步触发器"""
+    create_search_index(connection)
+
 tag_blog = Table(
     'tag_blog', 
     Base.metadata,
@@ -68,3 +100,39 @@ Blog.tags = relationship(
         secondary=tag_blog,
         back_populates='blogs'
     )
+
+
+class SyncManifest(Base):
+    """博客源文件的同步清单，用于增量导入"""
+    __tablename__ = 'sync_manifest'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String(255), unique=True, nullable=False)  # 源文件绝对路径
+    slug = Column(String(50), nullable=False)
+    mtime = Column(Float, nullable=False)  # 文件修改时间（st_mtime）
+    size = Column(Integer, nullable=False)  # 文件大小（字节）
+    hash = Column(String(64), nullable=False)  # 文件内容的 SHA-256
+
+
+class SyncState(Base):
+    """同步状态的键值记录，如各博客目录最后同步的 git 提交"""
+    __tablename__ = 'sync_state'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String(255), unique=True, nullable=False)
+    value = Column(String(255), nullable=False)
+
+
+class PushManifest(Base):
+    """推送到远端（如 Strapi）的记录，内容哈希未变的文章不再推送"""
+    __tablename__ = 'push_manifest'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    target = Column(String(255), nullable=False)  # 远端地址及集合
+    slug = Column(String(50), nullable=False)
+    hash = Column(String(64), nullable=False)  # 推送内容的 SHA-256
+    remote_id = Column(String(64))  # 远端记录的 documentId / id
+
+    __table_args__ = (
+        Index("uq_push_manifest_target_slug", "target", "slug", unique=True),
+    )
@@ -1,19 +1,75 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from ..config import config
+from typing import Any, Dict, Optional
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import declarative_base, sessionmaker
+from ..config import Config, config
 
-Base = declarative_base()
+# declarative_base() 返回的是动态创建的类，标注为 Any 才能作为模型的基类通过类型检查
+Base: Any = declarative_base()
 
 from .blog import *
 
-engine = create_engine(config.SQL, echo=True)
+_engine: Optional[Engine] = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def is_memory_sqlite(url: str) -> bool:
+    """是否为内存 SQLite（使用单连接池，不支持连接池大小配置）"""
+    u = make_url(url)
+    return u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:")
+
+def engine_options(cfg: Config) -> Dict[str, Any]:
+    """根据配置生成 create_engine 的参数"""
+    options: Dict[str, Any] = {
+        "echo": cfg.SQL_ECHO,
+        "pool_pre_ping": cfg.SQL_POOL_PRE_PING,
+        "query_cache_size": cfg.SQL_CACHE_SIZE,
+    }
+    if not is_memory_sqlite(cfg.SQL):
+        options["pool_size"] = cfg.SQL_POOL_SIZE
+        options["max_overflow"] = cfg.SQL_MAX_OVERFLOW
+    return options
+
+def sqlite_pragmas(cfg: Config) -> Dict[str, Any]:
+    """SQLite 每个新连接需要设置的 PRAGMA"""
+    return {
+        "journal_mode": cfg.SQLITE_JOURNAL_MODE,
+        "synchronous": cfg.SQLITE_SYNCHRONOUS,
+        "cache_size": cfg.SQLITE_CACHE_SIZE,
+        "mmap_size": cfg.SQLITE_MMAP_SIZE,
+    }
+
+def create_db_engine(cfg: Config = config) -> Engine:
+    """按配置创建引擎，SQLite 连接时自动设置 PRAGMA"""
+    new_engine = create_engine(cfg.SQL, **engine_options(cfg))
+    if new_engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas(cfg)
+
+        @event.listens_for(new_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for key, value in pragmas.items():
+                cursor.execute(f"PRAGMA {key}={value}")
+            cursor.close()
+    return new_engine
+
+def get_engine() -> Engine:
+    """获取全局引擎，首次调用时才创建（导入本模块不会连接数据库）"""
+    global _engine
+    if _engine is None:
+        _engine = create_db_engine(config)
+    return _engine
+
+def __getattr__(name: str) -> Any:
+    # 兼容 `from hstool.sql.db import engine` 的旧用法
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def Session():
-    db = SessionLocal()  # 创建新会话
+    db = SessionLocal(bind=get_engine())  # 创建新会话
     try:
         yield db  # 提供会话给业务逻辑
     finally:
-        db.close()  # 无论是否报错，都关闭会话
\ No newline at end of file
+        db.close()  # 无论是否报错，都关闭会话
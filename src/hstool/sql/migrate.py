@@ -0,0 +1,116 @@
+from __future__ import annotations
+from typing import List, TypedDict
+from sqlalchemy import Connection, Engine, and_, delete, func, inspect, select, update
+from .db import Base
+from .blog import Blog, Category, Tag, tag_blog
+from .search import rebuild_search_index
+
+
+class MigrateReport(TypedDict):
+    merged_tags: int
+    merged_categories: int
+    created_tables: List[str]
+    created_indexes: List[str]
+    search_index: bool  # 是否已创建并重建全文索引
+
+
+def merge_duplicate_tags(conn: Connection) -> int:
+    """合并同名标签：保留ID最小者，文章关联迁移到保留的标签上"""
+    tag = Tag.__table__
+    groups = conn.execute(
+        select(tag.c.name, func.min(tag.c.id))
+        .group_by(tag.c.name)
+        .having(func.count() > 1)
+    ).all()
+    merged = 0
+    for name, keep_id in groups:
+        dup_ids = conn.execute(
+            select(tag.c.id).where(tag.c.name == name, tag.c.id != keep_id)
+        ).scalars().all()
+        for dup_id in dup_ids:
+            # 已关联保留标签的文章不再迁移，避免主键冲突
+            linked = select(tag_blog.c.blog_id).where(tag_blog.c.tag_id == keep_id)
+            conn.execute(
+                update(tag_blog)
+                .where(tag_blog.c.tag_id == dup_id, tag_blog.c.blog_id.not_in(linked))
+                .values(tag_id=keep_id)
+            )
+            conn.execute(delete(tag_blog).where(tag_blog.c.tag_id == dup_id))
+            conn.execute(delete(tag).where(tag.c.id == dup_id))
+            merged += 1
+    return merged
+
+
+def merge_duplicate_categories(conn: Connection) -> int:
+    """
+    合并同一父分类下的同名分类：保留ID最小者，文章和子分类迁移到保留的分类上
+
+    合并父分类后其子分类之间可能出现新的重名，因此循环直到没有重复为止。
+    """
+    category = Category.__table__
+    blog = Blog.__table__
+    merged = 0
+    while True:
+        groups = conn.execute(
+            select(category.c.parent_id, category.c.name, func.min(category.c.id))
+            .group_by(category.c.parent_id, category.c.name)
+            .having(func.count() > 1)
+        ).all()
+        if not groups:
+            return merged
+        for parent_id, name, keep_id in groups:
+            same_parent = (
+                category.c.parent_id.is_(None) if parent_id is None
+                else category.c.parent_id == parent_id
+            )
+            dup_ids = conn.execute(
+                select(category.c.id).where(
+                    and_(same_parent, category.c.name == name, category.c.id != keep_id)
+                )
+            ).scalars().all()
+            for dup_id in dup_ids:
+                conn.execute(update(blog).where(blog.c.category_id == dup_id).values(category_id=keep_id))
+                conn.execute(update(category).where(category.c.parent_id == dup_id).values(parent_id=keep_id))
+                conn.execute(delete(category).where(category.c.id == dup_id))
+                merged += 1
+
+
+def migrate_blog_schema(engine: Engine) -> MigrateReport:
+    """
+    将 init-sql 创建的旧数据库迁移到当前表结构：
+    1. 创建缺失的表
+    2. 合并重复的标签和分类（否则无法建立唯一索引）
+    3. 创建缺失的索引和唯一约束
+    4. 创建全文索引并按现有数据重建
+
+    所有步骤在同一事务中执行，可重复运行。
+    """
+    report: MigrateReport = {
+        "merged_tags": 0,
+        "merged_categories": 0,
+        "created_tables": [],
+        "created_indexes": [],
+        "search_index": False,
+    }
+    with engine.begin() as conn:
+        existing_tables = set(inspect(conn).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                table.create(conn)
+                report["created_tables"].append(table.name)
+
+        report["merged_tags"] = merge_duplicate_tags(conn)
+        report["merged_categories"] = merge_duplicate_categories(conn)
+
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if table.name in report["created_tables"]:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    report["created_indexes"].append(str(index.name))
+
+        report["search_index"] = rebuild_search_index(conn)
+    return report
@@ -0,0 +1,232 @@
+from __future__ import annotations
+import html
+import re
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import Connection, text
+from sqlalchemy.orm.session import Session as SQLASession
+
+HIGHLIGHT = ("<mark>", "</mark>")
+MATCH_MARKERS = ("\x02", "\x03")  # 数据库标记匹配位置用的控制字符，转义正文后再替换为 HIGHLIGHT
+TRIGRAM_MIN_LENGTH = 3  # trigram 分词器无法匹配短于 3 个字符的词（如大多数两字中文词）
+SNIPPET_CONTEXT = 32  # 短词回退查询时片段中匹配位置前后保留的字符数
+
+
+def _sqlite_ddl(tokenize: str) -> List[str]:
+    # 外部内容表：索引数据由触发器随 blog 表同步，不重复存储正文
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS blog_fts USING fts5(
+            title, content, content='blog', content_rowid='id', tokenize='{tokenize}'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS blog_fts_ai AFTER INSERT ON blog BEGIN
+            INSERT INTO blog_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS blog_fts_ad AFTER DELETE ON blog BEGIN
+            INSERT INTO blog_fts(blog_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS blog_fts_au AFTER UPDATE OF title, content ON blog BEGIN
+            INSERT INTO blog_fts(blog_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO blog_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+    ]
+
+# 生成列随行更新自动重新计算，标题权重高于正文
+POSTGRESQL_DDL = [
+    """ALTER TABLE blog ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_blog_search_vector ON blog USING GIN (search_vector)",
+]
+
+
+def create_search_index(conn: Connection) -> bool:
+    """
+    创建博客全文索引（可重复执行）：
+    - SQLite: FTS5 外部内容表 + 同步触发器
+    - PostgreSQL: tsvector 生成列 + GIN 索引
+
+    Returns:
+        当前数据库是否支持全文索引
+    """
+    from ..config import config
+    name = conn.dialect.name
+    if name == "sqlite":
+        statements = _sqlite_ddl(config.SQLITE_FTS_TOKENIZE)
+    elif name == "postgresql":
+        statements = POSTGRESQL_DDL
+    else:
+        return False
+    for statement in statements:
+        conn.execute(text(statement))
+    return True
+
+def rebuild_search_index(conn: Connection) -> bool:
+    """根据 blog 表的当前内容重建全文索引"""
+    if not create_search_index(conn):
+        return False
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("INSERT INTO blog_fts(blog_fts) VALUES ('rebuild')"))
+    else:
+        conn.execute(text("REINDEX INDEX ix_blog_search_vector"))
+    return True
+
+def fts5_query(q: str) -> str:
+    """将用户输入转换为 FTS5 查询：每个词作为短语匹配，多个词之间为 AND"""
+    terms = [term.replace('"', '""') for term in q.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+def split_short_terms(q: str, tokenize: str) -> Tuple[List[str], List[str]]:
+    """
+    返回 (交给 FTS5 的词, 需要逐行扫描的短词)
+
+    只有 trigram 分词器才有短词问题，其他分词器所有词都交给 FTS5
+    """
+    terms = q.split()
+    if tokenize.split()[0] != "trigram":
+        return terms, []
+    return (
+        [term for term in terms if len(term) >= TRIGRAM_MIN_LENGTH],
+        [term for term in terms if len(term) < TRIGRAM_MIN_LENGTH],
+    )
+
+def highlight_terms(text: str, terms: List[str]) -> str:
+    """
+    转义 HTML 后用 HIGHLIGHT 标记匹配位置，结果可以直接作为 HTML 输出
+
+    - MATCH_MARKERS 包围的片段（数据库标记的匹配）整体高亮，其中不再重复标记
+    - 其余位置不区分大小写地标记 terms
+    """
+    start, end = HIGHLIGHT
+    left, right = MATCH_MARKERS
+    alternatives = [f"{left}([^{left}{right}]*){right}"]
+    terms = [term for term in terms if left not in term and right not in term]
+    if terms:
+        alternatives.append("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)))
+    pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+    parts: List[str] = []
+    pos = 0
+    for m in pattern.finditer(text):
+        matched = m.group(1) if m.group(1) is not None else m.group(0)
+        parts.append(html.escape(text[pos:m.start()], quote=False))
+        if matched:
+            parts.append(f"{start}{html.escape(matched, quote=False)}{end}")
+        pos = m.end()
+    parts.append(html.escape(text[pos:], quote=False))
+    # 正文中本身出现的孤立控制字符不输出
+    return "".join(parts).replace(left, "").replace(right, "")
+
+def _contains_all(names: List[str]) -> str:
+    return " AND ".join(
+        f"(instr(lower(b.title), lower(:{name})) > 0 OR instr(lower(b.content), lower(:{name})) > 0)"
+        for name in names
+    )
+
+def _search_sqlite(
+    session: SQLASession | Connection,
+    q: str,
+    params: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    from ..config import config
+    fts_terms, short_terms = split_short_terms(q, config.SQLITE_FTS_TOKENIZE)
+    names = [f"t{i}" for i in range(len(short_terms))]
+    params.update(zip(names, short_terms))
+    if fts_terms:
+        # 短词在 FTS5 匹配的结果上逐行过滤
+        where = "blog_fts MATCH :q" + (f" AND {_contains_all(names)}" if names else "")
+        sql = f"""
+            SELECT b.id, b.slug, b.title,
+                -bm25(blog_fts, 10.0, 1.0) AS rank,
+                highlight(blog_fts, 0, :start, :end) AS title_highlight,
+                snippet(blog_fts, 1, :start, :end, '…', 32) AS snippet
+            FROM blog_fts JOIN blog b ON b.id = blog_fts.rowid
+            WHERE {where}
+            ORDER BY bm25(blog_fts, 10.0, 1.0)
+            LIMIT :limit OFFSET :offset
+        """
+        params["q"] = fts5_query(" ".join(fts_terms))
+        rows = [dict(row._mapping) for row in session.execute(text(sql), params)]
+        # FTS5 的标记和短词在同一遍中转换为 HIGHLIGHT，已标记的片段不会被重复标记
+        for hit in rows:
+            hit["title_highlight"] = highlight_terms(hit["title_highlight"], short_terms)
+            hit["snippet"] = highlight_terms(hit["snippet"], short_terms)
+        return rows
+
+    # 全部是短词：逐行扫描，标题中出现的词权重为 10，正文为 1；片段取第一个词首次出现的位置
+    rank = " + ".join(
+        f"(instr(lower(b.title), lower(:{name})) > 0) * 10 + (instr(lower(b.content), lower(:{name})) > 0)"
+        for name in names
+    )
+    sql = f"""
+        SELECT id, slug, title, rank, pos, substr(content, max(pos - :context, 1), 2 * :context + length(:t0)) AS excerpt,
+            length(content) AS content_length
+        FROM (
+            SELECT b.id, b.slug, b.title, b.content, {rank} AS rank,
+                instr(lower(b.content), lower(:t0)) AS pos
+            FROM blog b
+            WHERE {_contains_all(names)}
+        )
+        ORDER BY rank DESC, id
+        LIMIT :limit OFFSET :offset
+    """
+    params["context"] = SNIPPET_CONTEXT
+    results = []
+    for row in session.execute(text(sql), params):
+        excerpt = row.excerpt if row.pos else ""
+        if row.pos and row.pos - SNIPPET_CONTEXT > 1:
+            excerpt = "…" + excerpt
+        if row.pos and row.pos + SNIPPET_CONTEXT + len(short_terms[0]) <= row.content_length:
+            excerpt += "…"
+        results.append({
+            "id": row.id,
+            "slug": row.slug,
+            "title": row.title,
+            "rank": float(row.rank),
+            "title_highlight": highlight_terms(row.title, short_terms),
+            "snippet": highlight_terms(excerpt, short_terms),
+        })
+    return results
+
+def search_blogs(
+    session: SQLASession | Connection,
+    q: str,
+    limit: int = 20,
+    offset: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    全文搜索博客，按相关度排序
+
+    SQLite 使用 trigram 分词器时，短于 3 个字符的词（如“后端”、“go”）无法通过索引匹配，
+    这些词改为对标题和正文逐行查找。
+
+    Returns:
+        每条结果包含 id、slug、title、rank（越大越相关）、
+        title_highlight（高亮后的标题）和 snippet（高亮后的正文片段），
+        后两者已转义 HTML，只包含 HIGHLIGHT 标签
+    """
+    if not q.strip():
+        return []
+    start, end = MATCH_MARKERS
+    params: Dict[str, Any] = {"limit": limit, "offset": offset, "start": start, "end": end}
+    name = session.get_bind().dialect.name if isinstance(session, SQLASession) else session.dialect.name
+    if name == "sqlite":
+        return _search_sqlite(session, q, params)
+    if name != "postgresql":
+        raise ValueError(f"数据库 {name} 暂不支持全文搜索")
+    sql = """
+        SELECT b.id, b.slug, b.title,
+            ts_rank(b.search_vector, query) AS rank,
+            ts_headline('simple', b.title, query,
+                'StartSel=' || :start || ', StopSel=' || :end || ', HighlightAll=true') AS title_highlight,
+            ts_headline('simple', b.content, query,
+                'StartSel=' || :start || ', StopSel=' || :end || ', MaxFragments=1, MaxWords=32') AS snippet
+        FROM blog b, websearch_to_tsquery('simple', :q) AS query
+        WHERE b.search_vector @@ query
+        ORDER BY rank DESC
+        LIMIT :limit OFFSET :offset
+    """
+    params["q"] = q
+    rows = [dict(row._mapping) for row in session.execute(text(sql), params)]
+    for hit in rows:
+        hit["title_highlight"] = highlight_terms(hit["title_highlight"], [])
+        hit["snippet"] = highlight_terms(hit["snippet"], [])
+    return rows
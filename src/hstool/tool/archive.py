@@ -0,0 +1,167 @@
+from __future__ import annotations
+import posixpath
+import tarfile
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+ARCHIVE_FORMATS = {
+    "zip": "application/zip",
+    "tar": "application/x-tar",
+    "tar.gz": "application/gzip",
+}
+
+ArchiveEntry = Tuple[Path, str]  # (文件路径, 归档内的名称)
+
+
+def normalize_arcname(name: str) -> str:
+    """
+    归档内名称统一为不含 .. 的相对 POSIX 路径
+
+    反斜杠按分隔符处理，避免在 Windows 上解压时 ..\\ 穿越到解压目录之外。
+    """
+    arcname = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if arcname in ("", ".", "..") or arcname.startswith("../"):
+        raise ValueError(f"非法的归档内名称: {name!r}")
+    return arcname
+
+def check_entries(
+    entries: Iterable[ArchiveEntry],
+    root: Path,
+    internal: Collection[str] = ()
+) -> Iterator[ArchiveEntry]:
+    """
+    逐个确认文件解析后（含符号链接）仍在 root 内且不在内部目录中，并规范化归档内名称
+
+    打包时才检查，请求校验之后被替换的符号链接同样会被拒绝。
+    """
+    root = root.resolve()
+    for path, arcname in entries:
+        try:
+            rel = path.resolve().relative_to(root)
+        except ValueError:
+            raise ValueError(f"文件不在 {root} 内: {path}")
+        if rel.parts and rel.parts[0] in internal:
+            raise ValueError(f"不能打包内部目录中的文件: {path}")
+        yield path, normalize_arcname(arcname)
+
+
+class _Sink:
+    """只能追加的输出缓冲，每写完一块由生成器取走，内存占用与文件总大小无关"""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries: Iterable[ArchiveEntry], compress: bool = False) -> Iterator[bytes]:
+    """
+    边读文件边产出 ZIP 数据
+
+    输出流不可 seek，zipfile 会在每个文件数据后写入 data descriptor；
+    文件大小取自 stat，超过 4GB 时自动使用 ZIP64。
+    """
+    sink = _Sink()
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(sink, "w", compression=compression, allowZip64=True) as zf:
+        for path, arcname in entries:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression
+            with open(path, "rb") as src, zf.open(info, "w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dest:
+                while chunk := src.read(CHUNK_SIZE):
+                    dest.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+    if data := sink.drain():
+        yield data
+
+def _iter_tar_blocks(entries: Iterable[ArchiveEntry]) -> Iterator[bytes]:
+    """
+    逐块产出 tar 数据（PAX 格式，支持长文件名和大文件）
+
+    头部中的大小取自 stat，读取期间文件变短时补零、变长时截断，保证归档结构正确。
+    """
+    written = 0
+    for path, arcname in entries:
+        stat = path.stat()
+        info = tarfile.TarInfo(arcname)
+        info.size = stat.st_size
+        info.mtime = int(stat.st_mtime)
+        info.mode = 0o644
+        header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        yield header
+        written += len(header)
+        remaining = info.size
+        with open(path, "rb") as src:
+            while remaining > 0:
+                chunk = src.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    chunk = bytes(min(CHUNK_SIZE, remaining))
+                remaining -= len(chunk)
+                written += len(chunk)
+                yield chunk
+        padding = -info.size % tarfile.BLOCKSIZE
+        if padding:
+            yield bytes(padding)
+            written += padding
+    # 归档结束标记：两个空块，再补齐到记录大小（与 tarfile 的输出一致）
+    end = 2 * tarfile.BLOCKSIZE
+    end += -(written + end) % tarfile.RECORDSIZE
+    yield bytes(end)
+
+def iter_tar(entries: Iterable[ArchiveEntry], gzip: bool = False) -> Iterator[bytes]:
+    if not gzip:
+        yield from _iter_tar_blocks(entries)
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 输出 gzip 格式
+    for block in _iter_tar_blocks(entries):
+        if data := compressor.compress(block):
+            yield data
+    yield compressor.flush()
+
+def iter_archive(
+    entries: Iterable[ArchiveEntry],
+    archive_format: str,
+    compress: bool = False,
+    root: Optional[Path] = None,
+    internal: Collection[str] = ()
+) -> Iterator[bytes]:
+    """
+    按格式（zip / tar / tar.gz）流式生成归档
+
+    指定 root 时只允许打包 root 内、internal 之外的文件（见 check_entries）；
+    归档内名称总是规范化为相对路径。
+    """
+    if root is not None:
+        entries = check_entries(entries, root, internal)
+    else:
+        entries = ((path, normalize_arcname(arcname)) for path, arcname in entries)
+    if archive_format == "zip":
+        return iter_zip(entries, compress=compress)
+    if archive_format in ("tar", "tar.gz"):
+        return iter_tar(entries, gzip=archive_format == "tar.gz")
+    raise ValueError(f"不支持的归档格式: {archive_format}")
+
+def archive_filename(name: str, archive_format: str) -> str:
+    return f"{name or time.strftime('files-%Y%m%d%H%M%S')}.{archive_format}"
@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession as SQLAAsyncSession
+from sqlalchemy.orm import selectinload
+from ..sql.blog import Blog, Category
+from .category import CategoryCache
+
+
+async def get_blog_by_slug(session: SQLAAsyncSession, slug: str) -> Optional[Blog]:
+    """根据slug查找博客，标签和分类一并加载（异步会话中不能延迟加载）"""
+    result = await session.execute(
+        select(Blog)
+        .where(Blog.slug == slug)
+        .options(selectinload(Blog.tags), selectinload(Blog.category))
+    )
+    return result.scalar_one_or_none()
+
+async def find_multilevel_category(
+    session: SQLAAsyncSession,
+    category_levels: List[str],
+    create: bool = True
+) -> Optional[Category]:
+    """
+    find_multilevel_category 的异步版本
+    
+    分类树缓存绑定在底层同步会话上，与同步版本共用同一套解析逻辑。
+    """
+    category_id = await session.run_sync(
+        lambda s: CategoryCache.for_session(s).resolve(s, category_levels, create=create)
+    )
+    if category_id is None:
+        return None
+    return await session.get(Category, category_id)
+
+async def merge_blog_by_slug(session: SQLAAsyncSession, blog_data: Dict[str, Any]) -> Blog:
+    """
+    merge_blog_by_slug 的异步版本：
+    - 若slug已存在，更新博客内容
+    - 若slug不存在，创建新博客
+    """
+    if "slug" not in blog_data:
+        raise ValueError("blog_data 必须包含 'slug' 字段")
+    
+    result = await session.execute(select(Blog).where(Blog.slug == blog_data["slug"]))
+    existing_blog = result.scalar_one_or_none()
+    
+    if existing_blog:
+        for key, value in blog_data.items():
+            if hasattr(existing_blog, key):
+                setattr(existing_blog, key, value)
+        await session.commit()
+        return existing_blog
+    else:
+        new_blog = Blog(** blog_data)
+        session.add(new_blog)
+        await session.commit()
+        await session.refresh(new_blog)
+        return new_blog
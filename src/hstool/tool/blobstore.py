@@ -0,0 +1,198 @@
+"""
+按内容寻址的去重存储：
+
+内容保存在 UPLOAD/.blobs/<前2位>/<sha256>，UPLOAD 下的文件名是指向它的硬链接。
+文件系统的链接数就是引用计数（st_nlink - 1），删除文件名即减少一次引用，
+因此列表、下载、删除等接口无需任何改动。没有引用的内容由 gc_blobs 清理。
+
+注意：同一内容的所有文件名共享数据，只能整体替换（上传接口均为原子替换），
+不要原地修改 UPLOAD 下的文件。
+"""
+from __future__ import annotations
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from stat import S_ISREG
+from typing import Iterator, TypedDict
+from .common import file_sha256
+from .compress import COMPRESSED_DIR_NAME
+from .httpcache import digest_cache, remember_digest
+from .upload import TMP_DIR_NAME, atomic_move, upload_tmp_dir
+
+BLOB_DIR_NAME = ".blobs"
+
+
+class BlobStats(TypedDict):
+    blobs: int  # 内容不同的文件数
+    references: int  # 指向这些内容的文件名数
+    stored_bytes: int  # 实际占用的字节数
+    logical_bytes: int  # 不去重时需要占用的字节数
+    saved_bytes: int
+    orphans: int  # 没有任何文件名引用的内容
+    orphan_bytes: int
+
+
+def blob_path(work_dir: Path, digest: str) -> Path:
+    return work_dir / BLOB_DIR_NAME / digest[:2] / digest
+
+def iter_blobs(work_dir: Path) -> Iterator[Path]:
+    root = work_dir / BLOB_DIR_NAME
+    if not root.exists():
+        return
+    for prefix in root.iterdir():
+        if prefix.is_dir():
+            yield from (blob for blob in prefix.iterdir() if blob.is_file())
+
+def is_valid_blob(blob: Path, digest: str) -> bool:
+    """校验已有内容的大小和哈希与文件名一致（哈希按 inode 缓存，未变化的内容只计算一次）"""
+    try:
+        stat = os.lstat(blob)
+    except FileNotFoundError:
+        return False
+    if not S_ISREG(stat.st_mode):
+        return False
+    return digest_cache.digest(blob, stat) == digest
+
+def store_blob(work_dir: Path, src: Path, digest: str) -> Path:
+    """
+    将文件 src 以硬链接存入内容存储（src 保留，由调用方删除）
+
+    内容已存在时先校验，与 digest 不一致（被篡改或损坏）时用 src 原子替换，
+    不会把新文件名链接到内容不符的数据上。
+    """
+    blob = blob_path(work_dir, digest)
+    if is_valid_blob(blob, digest):
+        return blob
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, blob)
+    except FileExistsError:
+        if is_valid_blob(blob, digest):
+            return blob  # 相同内容的并发上传已先存入
+        fd, tmp_name = tempfile.mkstemp(dir=upload_tmp_dir(work_dir), suffix=".blob")
+        os.close(fd)
+        tmp = Path(tmp_name)
+        tmp.unlink()
+        try:
+            os.link(src, tmp)
+            os.replace(tmp, blob)
+        finally:
+            tmp.unlink(missing_ok=True)
+    remember_digest(blob, digest)
+    return blob
+
+def link_blob(work_dir: Path, blob: Path, target: Path, overwrite: bool = False) -> None:
+    """
+    让文件名 target 指向 blob
+    - overwrite=False 时 target 已存在则抛出 FileExistsError
+    - overwrite=True 时先在临时目录建立链接再原子替换
+    - 文件系统不支持硬链接时退化为复制
+    """
+    tmp_dir = upload_tmp_dir(work_dir)
+    if not overwrite:
+        try:
+            os.link(blob, target)
+            return
+        except FileExistsError:
+            raise
+        except OSError:
+            pass
+    fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix=".link")
+    os.close(fd)
+    tmp = Path(tmp_name)
+    tmp.unlink()
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        shutil.copyfile(blob, tmp)
+    try:
+        atomic_move(tmp, target, overwrite)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def place_file(work_dir: Path, src: Path, target: Path, digest: str, overwrite: bool = False) -> None:
+    """
+    将写好的临时文件放到目标位置：开启 UPLOAD_DEDUP 时存入内容存储并建立链接，
+    否则直接原子移动
+    """
+    from ..config import config
+    if not config.UPLOAD_DEDUP:
+        atomic_move(src, target, overwrite)
+        remember_digest(target, digest)
+        return
+    try:
+        for _ in range(2):
+            blob = store_blob(work_dir, src, digest)
+            try:
+                link_blob(work_dir, blob, target, overwrite)
+                remember_digest(target, digest)
+                return
+            except FileNotFoundError:
+                continue  # 已有的内容恰好被 gc_blobs 清理，重新存入
+        raise FileNotFoundError(blob)
+    finally:
+        src.unlink(missing_ok=True)
+
+def dedup_existing(work_dir: Path) -> int:
+    """
+    将 UPLOAD 下（包括子目录）尚未去重的普通文件转存到内容存储，返回处理的文件数
+
+    跳过 UPLOAD 下的内部目录（未完成的上传、内容存储本身、预压缩副本）和符号链接。
+    """
+    internal = {TMP_DIR_NAME, BLOB_DIR_NAME, COMPRESSED_DIR_NAME}
+    count = 0
+    for dirpath, dirnames, filenames in os.walk(work_dir):
+        if Path(dirpath) == work_dir:
+            dirnames[:] = [name for name in dirnames if name not in internal]
+        for name in filenames:
+            path = Path(dirpath, name)
+            stat = os.lstat(path)
+            if not S_ISREG(stat.st_mode) or stat.st_nlink > 1:
+                continue
+            blob = store_blob(work_dir, path, file_sha256(path))
+            if not os.path.samefile(blob, path):
+                link_blob(work_dir, blob, path, overwrite=True)
+            count += 1
+    return count
+
+def blob_stats(work_dir: Path) -> BlobStats:
+    stats: BlobStats = {
+        "blobs": 0, "references": 0, "stored_bytes": 0, "logical_bytes": 0,
+        "saved_bytes": 0, "orphans": 0, "orphan_bytes": 0,
+    }
+    for blob in iter_blobs(work_dir):
+        stat = blob.stat()
+        references = stat.st_nlink - 1
+        stats["blobs"] += 1
+        stats["stored_bytes"] += stat.st_size
+        if references == 0:
+            stats["orphans"] += 1
+            stats["orphan_bytes"] += stat.st_size
+        stats["references"] += references
+        stats["logical_bytes"] += stat.st_size * references
+    stats["saved_bytes"] = max(stats["logical_bytes"] - (stats["stored_bytes"] - stats["orphan_bytes"]), 0)
+    return stats
+
+def gc_blobs(work_dir: Path, grace: float = 3600, dry_run: bool = False) -> tuple[int, int]:
+    """
+    删除没有引用的内容
+
+    Args:
+        grace: 只删除超过该秒数未修改的内容，避免误删正在建立链接的新上传
+        dry_run: 只统计不删除
+
+    Returns:
+        (删除的数量, 释放的字节数)
+    """
+    deadline = time.time() - grace
+    removed = freed = 0
+    for blob in iter_blobs(work_dir):
+        stat = blob.stat()
+        if stat.st_nlink == 1 and stat.st_mtime < deadline:
+            if not dry_run:
+                blob.unlink()
+            removed += 1
+            freed += stat.st_size
+    return removed, freed
@@ -3,11 +3,15 @@ import os
 import frontmatter  # type: ignore # 解析Markdown元数据（需安装：pip install python-frontmatter）
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any, TypedDict, NotRequired, cast
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Set, Tuple, TypedDict, NotRequired, cast
+from sqlalchemy import or_, select
 from sqlalchemy.orm.session import Session as SQLASession
-from ..sql.blog import Blog, Tag, Category
+from ..sql.blog import Blog, Tag, Category, SyncManifest
 from ..sql.db import Session
 from .common import parse_date
+from .category import CategoryCache
+from .importer import BulkImporter
+from .pipeline import ParseResult, ParseTask, parse_posts
 
 class PostFront(TypedDict):
     title: str
@@ -32,41 +36,234 @@ def parse_markdown_file(file_path: str | Path, slug: str| None=None) -> Dict[str
         "content": post.content
     }
 
+def import_blog_file(session: SQLASession, file_path: str | Path, slug: str | None=None) -> Blog:
+    """解析单个Markdown文件并写入数据库（不提交）"""
+    parsed_data = parse_markdown_file(file_path, slug)
+    need = {"slug", "title", "create", "update", "content"}
+    need_date = {k: v for k, v in parsed_data.items() if k in need}
+    new_blog = merge_blog_by_slug(session, need_date)
+    
+    tags: List[Tag] = []
+    tag_names = parsed_data.get("tags") or []
+    for tag_name in tag_names:
+        # 先查询标签是否已存在（避免重复创建）
+        existing_tag = session.query(Tag).filter(Tag.name == tag_name).first()
+        if existing_tag:
+            # 标签已存在，直接关联
+            tags.append(existing_tag)
+        else:
+            # 标签不存在，创建新Tag实例并关联
+            new_tag = Tag(name=tag_name)
+            session.add(new_tag)  # 标记Tag为待插入
+            tags.append(new_tag)
+    # 整体替换标签，避免重复导入时重复关联
+    new_blog.tags = tags
+    
+    category = parsed_data.get("category", None)  
+    if category:
+        current_category = find_multilevel_category(session, category, create=True)
+        new_blog.category = current_category
+    return new_blog
+
 def import_blog(path: str | Path, slug: str | None=None):
     files = os.listdir(path)
     session = next(Session())
     for file in files:
         if file.endswith(".md"):
-            parsed_data = parse_markdown_file(os.path.join(path, file), slug)
-            need = {"slug", "title", "create", "update", "content"}
-            need_date = {k: v for k, v in parsed_data.items() if k in need}
-            new_blog = merge_blog_by_slug(session, need_date)
-            
-            tag_names = parsed_data.get("tags", [])  
-            for tag_name in tag_names:
-                # 先查询标签是否已存在（避免重复创建）
-                existing_tag = session.query(Tag).filter(Tag.name == tag_name).first()
-                if existing_tag:
-                    # 标签已存在，直接关联
-                    new_blog.tags.append(existing_tag)
-                else:
-                    # 标签不存在，创建新Tag实例并关联
-                    new_tag = Tag(name=tag_name)
-                    session.add(new_tag)  # 标记Tag为待插入
-                    new_blog.tags.append(new_tag)  # 关联到Blog
-            
-            category = parsed_data.get("category", None)  
-            if category:
-                current_category = find_multilevel_category(session, category, create=True)
-                new_blog.category = current_category
+            import_blog_file(session, os.path.join(path, file), slug)
             session.commit()
             
 
-            
-def init_blog(path: str| Path):
-    blogs = os.listdir(path)
-    for blog in blogs:
-        import_blog(os.path.join(path, blog), slug=blog)
+class SyncStats(TypedDict):
+    added: int
+    updated: int
+    skipped: int
+    deleted: int
+    errors: List[Tuple[str, str]]  # (文件路径, 错误信息)
+
+def scan_blog_files(
+    path: str | Path,
+    manifest: Dict[str, SyncManifest],
+    stats: SyncStats
+) -> Iterator[ParseTask]:
+    """遍历博客目录，只产出 mtime 或 size 与清单不一致的文件"""
+    for blog in os.listdir(path):
+        blog_dir = os.path.join(path, blog)
+        if not os.path.isdir(blog_dir):
+            continue
+        for file in os.listdir(blog_dir):
+            if not file.endswith(".md"):
+                continue
+            file_path = Path(blog_dir, file).resolve()
+            key = file_path.as_posix()
+            stat = file_path.stat()
+            entry = manifest.get(key)
+            if entry and entry.mtime == stat.st_mtime and entry.size == stat.st_size:
+                stats["skipped"] += 1
+                continue
+            yield {
+                "path": key,
+                "slug": blog,
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "hash": cast(Optional[str], entry.hash) if entry else None
+            }
+
+def init_blog(
+    path: str| Path,
+    batch_size: int = 500,
+    jobs: int = 1,
+    queue_size: int | None = None
+) -> SyncStats:
+    """
+    增量导入博客目录：
+    - 先比较文件的 mtime 和 size，未变化则直接跳过
+    - stat 有变化时再计算内容哈希，哈希一致则只刷新清单
+    - 仅内容确实变化的文章才写入数据库，按 batch_size 分批提交
+    
+    哈希和解析由 jobs 个进程并行完成，结果经有界队列（queue_size）
+    交给当前进程唯一的数据库写入端。单个文件解析失败不会中断导入，
+    错误记录在返回值的 errors 中，且不更新清单，下次导入会重试。
+    
+    Returns:
+        新增、更新、跳过的文章数量及解析错误
+    """
+    stats: SyncStats = {"added": 0, "updated": 0, "skipped": 0, "deleted": 0, "errors": []}
+    session = next(Session())
+    importer = BulkImporter(session, batch_size)
+    manifest = {m.path: m for m in session.query(SyncManifest)}
+    tasks = scan_blog_files(path, manifest, stats)
+    apply_parse_results(session, importer, manifest, parse_posts(tasks, jobs=jobs, queue_size=queue_size), stats)
+    importer.flush()
+    session.close()
+    return stats
+
+def apply_parse_results(
+    session: SQLASession,
+    importer: BulkImporter,
+    manifest: Dict[str, SyncManifest],
+    results: Iterable[ParseResult],
+    stats: SyncStats
+) -> None:
+    """将解析结果交给 importer 写入并更新清单（清单随所在批次一起提交）"""
+    for result in results:
+        key = result["path"]
+        if result["error"]:
+            stats["errors"].append((key, result["error"]))
+            continue
+        # 模型使用 Column 声明，类型检查器无法识别实例属性的类型，这里按 Any 处理
+        entry: Any = manifest.get(key)
+        post = result["post"]
+        if entry and post is None:
+            # 内容未变（如 touch），只刷新清单中的 stat 信息
+            entry.mtime, entry.size = result["mtime"], result["size"]
+            stats["skipped"] += 1
+            continue
+        assert post is not None
+        
+        if entry is None:
+            entry = SyncManifest(path=key)
+            session.add(entry)
+            manifest[key] = entry
+        entry.slug = post["slug"]
+        entry.mtime, entry.size, entry.hash = result["mtime"], result["size"], result["digest"]
+        if importer.add(post):
+            stats["added"] += 1
+        else:
+            stats["updated"] += 1
+
+def blog_file_slug(root: Path, file_path: Path) -> Optional[str]:
+    """<root>/<slug>/<name>.md 返回 slug，不符合目录结构时返回None"""
+    try:
+        rel = file_path.relative_to(root)
+    except ValueError:
+        return None
+    if len(rel.parts) != 2 or rel.suffix != ".md" or rel.name.startswith("."):
+        return None
+    return rel.parts[0]
+
+def sync_blog_changes(
+    path: str | Path,
+    changes: Dict[str, str],
+    batch_size: int = 500
+) -> SyncStats:
+    """
+    只同步发生变化的博客文件，不扫描整个目录
+
+    Args:
+        path: 博客根目录
+        changes: 绝对路径 -> 变化类型
+            - "modified": 文件新增或修改（文件已不存在时按删除处理）
+            - "deleted": 文件被删除或移出
+            - "deleted_dir": 文章目录被删除或移出，删除其下所有文件
+    
+    删除的文件从清单中移除，对应 slug 没有其他源文件时从数据库删除该文章；
+    重命名由一次删除和一次新增表示。所有变化在同一个事务中提交（不超过 batch_size 篇时）。
+    """
+    stats: SyncStats = {"added": 0, "updated": 0, "skipped": 0, "deleted": 0, "errors": []}
+    session = next(Session())
+    importer = BulkImporter(session, batch_size)
+    apply_blog_changes(session, importer, path, changes, stats)
+    importer.flush()
+    session.close()
+    return stats
+
+def apply_blog_changes(
+    session: SQLASession,
+    importer: BulkImporter,
+    path: str | Path,
+    changes: Dict[str, str],
+    stats: SyncStats
+) -> None:
+    """sync_blog_changes 的实现，写入交给 importer，由调用方 flush 提交"""
+    root = Path(path).resolve()
+    deleted_dirs = [Path(p).resolve().as_posix() + "/" for p, kind in changes.items() if kind == "deleted_dir"]
+    files = {Path(p).resolve().as_posix(): kind for p, kind in changes.items() if kind != "deleted_dir"}
+    conditions = [SyncManifest.path.in_(list(files))] if files else []
+    conditions += [SyncManifest.path.startswith(prefix, autoescape=True) for prefix in deleted_dirs]
+    manifest: Dict[str, SyncManifest] = {}
+    if conditions:
+        manifest = {cast(str, m.path): m for m in session.query(SyncManifest).filter(or_(*conditions))}
+
+    tasks: List[ParseTask] = []
+    removed: List[str] = [key for key in manifest if any(key.startswith(prefix) for prefix in deleted_dirs)]
+    for key, kind in files.items():
+        file_path = Path(key)
+        slug = blog_file_slug(root, file_path)
+        if slug is None:
+            continue
+        if kind == "modified":
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                removed.append(key)
+                continue
+            entry = manifest.get(key)
+            if entry and entry.mtime == stat.st_mtime and entry.size == stat.st_size:
+                stats["skipped"] += 1
+                continue
+            tasks.append({
+                "path": key, "slug": slug, "mtime": stat.st_mtime,
+                "size": stat.st_size, "hash": cast(Optional[str], entry.hash) if entry else None
+            })
+        else:
+            removed.append(key)
+
+    removed_slugs: Set[str] = set()
+    for key in removed:
+        entry = manifest.pop(key, None)
+        if entry is not None:
+            removed_slugs.add(cast(str, entry.slug))
+            session.delete(entry)
+    if removed_slugs:
+        session.flush()
+        # 同一 slug 仍有其他源文件时保留文章
+        remaining: Set[str] = set(
+            session.scalars(select(SyncManifest.slug).where(SyncManifest.slug.in_(removed_slugs)))
+        )
+        stats["deleted"] += importer.remove(sorted(removed_slugs - remaining))
+
+    apply_parse_results(session, importer, manifest, parse_posts(tasks), stats)
 
 def find_multilevel_category(
     session: SQLASession,
@@ -79,48 +276,17 @@ def find_multilevel_category(
     Args:
         session: 数据库会话
         category_levels: 多级分类列表（如 ["技术", "后端", "Python"]）
+        create: 是否创建缺失的分类（只插入不提交，由调用方提交）
+    
+    分类路径通过会话级的分类树缓存在内存中解析，不再逐级查询。
     
     Returns:
         找到的最末级分类实例，未找到则返回None
     """
-    if not category_levels:  # 空列表直接返回
+    category_id = CategoryCache.for_session(session).resolve(session, category_levels, create=create)
+    if category_id is None:
         return None
-    if isinstance(category_levels, str):  # 字符串类型转换为列表
-        category_levels = [category_levels]
-        
-    # 1. 从顶级分类开始查找（parent_id 为 None）
-    current_category = session.query(Category).filter(
-        Category.name == category_levels[0],
-        Category.parent_id.is_(None)  # 顶级分类的 parent_id 为 None
-    ).first()
-    
-    if not current_category:
-        if create:
-            current_category = Category(name=category_levels[0])  # 创建顶级分类
-            session.add(current_category)
-            session.commit()
-            session.refresh(current_category)
-        else:
-            return None 
-    
-    # 2. 从次级分类开始查找
-    for level_name in category_levels[1:]:  # 从第二个元素开始遍历
-        id = current_category.id
-        current_category = session.query(Category).filter(
-            Category.name == level_name,
-            Category.parent_id == id  # 父分类ID为当前分类的ID
-        ).first()
-        
-        if not current_category:
-            if create:
-                current_category = Category(name=level_name, parent_id=id)  # 创建顶级分类
-                session.add(current_category)
-                session.commit()
-                session.refresh(current_category)
-            else:
-                return None 
-
-    return current_category
+    return session.get(Category, category_id)
 
 def merge_blog_by_slug(session: SQLASession, blog_data: Dict[str, Any]) -> Blog:
     """
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import Result, insert, select
+from sqlalchemy.event import contains, listen
+from sqlalchemy.orm.session import Session as SQLASession
+from ..sql.blog import Category
+
+CACHE_KEY = "category_cache"
+CategoryPath = Tuple[str, ...]
+
+
+def normalize_path(category_levels: Sequence[str] | str | None) -> CategoryPath:
+    """将 frontmatter 中的分类（字符串或列表）统一为路径元组"""
+    if not category_levels:
+        return ()
+    if isinstance(category_levels, str):
+        return (category_levels,)
+    return tuple(str(name) for name in category_levels)
+
+
+class CategoryNode:
+    __slots__ = ("id", "children")
+
+    def __init__(self, id: Optional[int]):
+        self.id = id
+        self.children: Dict[str, CategoryNode] = {}
+
+
+class CategoryCache:
+    """
+    分类树缓存：分类名路径 -> 分类ID 的前缀树
+
+    - 每个会话从 category 表加载一次，之后在内存中解析多级分类
+    - 路径未命中时先重新加载整张表（可能已被其他进程创建），仍缺失的节点按层批量插入
+    - 会话回滚时缓存随之失效，下次使用时重新加载，保证与数据库一致
+    """
+
+    def __init__(self) -> None:
+        self.root = CategoryNode(None)
+
+    @classmethod
+    def for_session(cls, session: SQLASession) -> CategoryCache:
+        """获取会话绑定的分类缓存，不存在则加载"""
+        cache = session.info.get(CACHE_KEY)
+        if cache is None:
+            cache = cls()
+            cache.load(session)
+            session.info[CACHE_KEY] = cache
+            # 监听器常驻会话（once=True 的监听器触发后无法再次注册，第二次回滚时缓存不会失效）
+            if not contains(session, "after_rollback", _drop_cache):
+                listen(session, "after_rollback", _drop_cache)
+        return cache
+
+    def load(self, session: SQLASession) -> None:
+        """从数据库加载全部分类，重建前缀树"""
+        result: Result[int, str, Optional[int]] = session.execute(
+            select(Category.id, Category.name, Category.parent_id)
+        )
+        rows = result.all()
+        nodes = {id: CategoryNode(id) for id, _, _ in rows}
+        self.root = CategoryNode(None)
+        for id, name, parent_id in rows:
+            parent = self.root if parent_id is None else nodes.get(parent_id)
+            if parent is not None:
+                # 同一父分类下的重名分类取ID最小者，与按插入顺序查询第一条一致
+                existing = parent.children.get(name)
+                if existing is None or existing.id > id:  # type: ignore[operator]
+                    parent.children[name] = nodes[id]
+
+    def lookup(self, path: CategoryPath) -> Optional[int]:
+        """在内存中解析分类路径，未找到返回None"""
+        node = self.root
+        for name in path:
+            child = node.children.get(name)
+            if child is None:
+                return None
+            node = child
+        return node.id
+
+    def resolve(
+        self,
+        session: SQLASession,
+        category_levels: Sequence[str] | str | None,
+        create: bool = True
+    ) -> Optional[int]:
+        """解析单个分类路径，返回末级分类ID"""
+        path = normalize_path(category_levels)
+        return self.resolve_many(session, [path], create=create).get(path)
+
+    def resolve_many(
+        self,
+        session: SQLASession,
+        paths: Iterable[Sequence[str] | str | None],
+        create: bool = True
+    ) -> Dict[CategoryPath, Optional[int]]:
+        """
+        批量解析分类路径
+
+        Args:
+            session: 数据库会话
+            paths: 多级分类列表（如 [["技术", "后端", "Python"], "生活"]）
+            create: 是否创建缺失的分类（只插入不提交，由调用方提交）
+
+        Returns:
+            分类路径元组 -> 末级分类ID（空路径或未找到为None）
+        """
+        wanted = {normalize_path(path) for path in paths}
+        wanted.discard(())
+        missing = [path for path in wanted if self.lookup(path) is None]
+        if missing:
+            self.load(session)
+            missing = [path for path in missing if self.lookup(path) is None]
+        if missing and create:
+            self._create(session, missing)
+        return {path: self.lookup(path) for path in wanted}
+
+    def _create(self, session: SQLASession, paths: List[CategoryPath]) -> None:
+        """按层级批量插入缺失的分类节点"""
+        depth = max(len(path) for path in paths)
+        for level in range(depth):
+            pending: Dict[Tuple[int | None, str], CategoryNode] = {}
+            for path in paths:
+                if len(path) <= level:
+                    continue
+                node = self.root
+                for name in path[:level]:
+                    node = node.children[name]
+                name = path[level]
+                if name not in node.children:
+                    pending[(node.id, name)] = node
+            if not pending:
+                continue
+            result: Result[int, str, Optional[int]] = session.execute(
+                insert(Category).returning(Category.id, Category.name, Category.parent_id),
+                [{"name": name, "parent_id": parent_id} for parent_id, name in pending]
+            )
+            for id, name, parent_id in result:
+                pending[(parent_id, name)].children[name] = CategoryNode(id)
+
+
+def _drop_cache(session: SQLASession, *args: object) -> None:
+    session.info.pop(CACHE_KEY, None)
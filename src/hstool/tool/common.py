@@ -1,8 +1,12 @@
+import hashlib
+import re
 import subprocess
 import click 
 from datetime import datetime, date, time
 from zoneinfo import ZoneInfo
-from typing import Union, Optional, Callable, Any, Dict
+from functools import lru_cache
+from pathlib import Path
+from typing import Union, Optional, Callable, Any, Dict, Iterable, List, Tuple
 from ..config import config
 
 
@@ -34,6 +38,14 @@ def command(cmd: str | list[str], start_new_session: bool=True) -> subprocess.Co
         start_new_session=start_new_session
     )
 
+def file_sha256(file_path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件内容的 SHA-256（十六进制）"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def add_options_from_dict(params_dict: Dict[str, Any]):
     """根据字典动态生成Click选项装饰器"""
     def decorator(func: Callable[..., None]):
@@ -48,13 +60,78 @@ def add_options_from_dict(params_dict: Dict[str, Any]):
         return func
     return decorator
 
+# 常见日期格式列表（按优先级排列，可根据需求扩展）
+DATE_FORMATS = [
+    # 日期+时间格式
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",
+    "%d-%m-%Y %H:%M:%S", "%d-%m-%Y %H:%M",
+    "%m-%d-%Y %H:%M:%S", "%m-%d-%Y %H:%M",
+    "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M",
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M",
+    # 仅日期格式
+    "%Y-%m-%d", "%d-%m-%Y", "%m-%d-%Y",
+    "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y",
+    # 带文字的格式
+    "%b %d %Y", "%B %d %Y", "%d %b %Y", "%d %B %Y"
+]
+
+FORMAT_SHAPES = {"%Y": r"\d{4}", "%b": r".+?", "%B": r".+?"}  # 其余字段为 1-2 位数字（%d 允许前导空格）
+
+def _format_shape(fmt: str) -> str:
+    """格式能匹配的字符串的粗略正则：strptime 能解析的字符串一定能匹配它，反之不一定"""
+    parts = re.split(r"(%[a-zA-Z]|\s+)", fmt)
+    shape = ""
+    for part in parts:
+        if part.startswith("%"):
+            shape += FORMAT_SHAPES.get(part, r" ?\d{1,2}")
+        elif part.isspace():
+            shape += r"\s+"  # 与 strptime 一致，格式中的空白匹配任意个空白
+        else:
+            shape += re.escape(part)
+    return shape
+
+def _format_groups(formats: List[str]) -> List[Tuple[re.Pattern[str], List[str]]]:
+    """
+    按结构分组（%d/%m 视为同一种数字字段，%b/%B 视为同一种月份名），组内保持原有顺序：
+    不同组能匹配的字符串互不相交，同组内才可能出现 01-02-2024 这种多个格式都能匹配的情况。
+    每组附带一个粗略正则，不匹配的组无需调用 strptime
+    """
+    groups: Dict[str, List[str]] = {}
+    for fmt in formats:
+        groups.setdefault(_format_shape(fmt), []).append(fmt)
+    return [(re.compile(shape, re.IGNORECASE), group) for shape, group in groups.items()]
+
+DATE_FORMAT_GROUPS = _format_groups(DATE_FORMATS)
+# 与 DATE_FORMATS 前几项完全一致的 ISO 形式，可以直接用 fromisoformat 解析
+ISO_DATE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?: [0-9]{2}:[0-9]{2}(?::[0-9]{2})?)?")
+_last_group = DATE_FORMAT_GROUPS[0]  # 上次解析成功的格式组
+
+@lru_cache(maxsize=None)
+def zone_info(key: str) -> ZoneInfo:
+    return ZoneInfo(key)
+
+def _strptime_group(value: str, group: Tuple[re.Pattern[str], List[str]], tz: ZoneInfo) -> Optional[datetime]:
+    shape, formats = group
+    if not shape.fullmatch(value):
+        return None
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=tz)
+        except ValueError:
+            continue
+    return None
+
 def parse_date(date_input: Union[str, datetime, date, time]) -> Optional[datetime]:
     """
     增强型日期解析函数：
     - 若输入是datetime对象，直接返回
     - 若输入是date对象，转换为datetime（时间部分为00:00:00）
     - 若输入是time对象，返回None（无法单独转换为datetime）
-    - 若输入是字符串，尝试多种格式自动解析
+    - 若输入是字符串，按 DATE_FORMATS 的顺序尝试解析，结果带 config.ZONE 时区
+
+    字符串依次尝试：ISO 形式直接用 fromisoformat；上次成功的格式组；其余格式组，
+    结构明显不符的组跳过。各格式组能匹配的字符串互不相交，组内保持原有顺序，
+    因此结果与逐个尝试 DATE_FORMATS 完全相同。
     
     Args:
         date_input: 待处理的输入（字符串、datetime、date或time对象）
@@ -62,6 +139,7 @@ def parse_date(date_input: Union[str, datetime, date, time]) -> Optional[datetim
     Returns:
         解析成功返回datetime对象，失败返回None
     """
+    global _last_group
     # 1. 处理已有的datetime对象
     if isinstance(date_input, datetime):
         return date_input
@@ -74,28 +152,39 @@ def parse_date(date_input: Union[str, datetime, date, time]) -> Optional[datetim
     if isinstance(date_input, time):
         return None
     
-    # 4. 处理字符串类型（自动尝试多种格式）
-    # 常见日期格式列表（可根据需求扩展）
-    date_formats = [
-        # 日期+时间格式
-        "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",
-        "%d-%m-%Y %H:%M:%S", "%d-%m-%Y %H:%M",
-        "%m-%d-%Y %H:%M:%S", "%m-%d-%Y %H:%M",
-        "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M",
-        "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M",
-        # 仅日期格式
-        "%Y-%m-%d", "%d-%m-%Y", "%m-%d-%Y",
-        "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y",
-        # 带文字的格式
-        "%b %d %Y", "%B %d %Y", "%d %b %Y", "%d %B %Y"
-    ]
-    
-    # 尝试每种格式解析
-    for fmt in date_formats:
+    # 4. 处理字符串类型
+    if not isinstance(date_input, str):
+        datetime.strptime(date_input, DATE_FORMATS[0])  # 与逐个尝试 strptime 时一样抛出 TypeError
+    tz = zone_info(config.ZONE)
+    if ISO_DATE.fullmatch(date_input):
         try:
-            return datetime.strptime(date_input, fmt).replace(tzinfo=ZoneInfo(config.ZONE))
+            return datetime.fromisoformat(date_input).replace(tzinfo=tz)
         except ValueError:
+            pass  # 如 2024-02-30，交给 strptime 得出相同的结论
+    last = _last_group
+    result = _strptime_group(date_input, last, tz)
+    if result is not None:
+        return result
+    for group in DATE_FORMAT_GROUPS:
+        if group is last:
             continue
+        result = _strptime_group(date_input, group, tz)
+        if result is not None:
+            _last_group = group
+            return result
     
     # 所有情况都不匹配
     return None
+
+def parse_dates(values: Iterable[Union[str, datetime, date, time]]) -> List[Optional[datetime]]:
+    """批量解析日期，结果与逐个调用 parse_date 相同，重复的字符串只解析一次"""
+    cache: Dict[str, Optional[datetime]] = {}
+    results: List[Optional[datetime]] = []
+    for value in values:
+        if isinstance(value, str):
+            if value not in cache:
+                cache[value] = parse_date(value)
+            results.append(cache[value])
+        else:
+            results.append(parse_date(value))
+    return results
@@ -0,0 +1,254 @@
+"""
+下载文件的预压缩副本：
+
+副本保存在 UPLOAD/.compressed/<相对路径>/<mtime_ns>-<size>-<签名>.<gz|zst>，
+文件名包含源文件的版本，源文件被修改或替换后旧副本自动失效，生成新副本时清理。
+签名是用 .compressed/.key 中的随机密钥对版本计算的 HMAC，外部无法猜出副本的文件名
+（版本本身就是公开的弱 ETag），只会使用本模块写入的普通文件。
+压缩在上传完成后或首次请求后的后台任务中进行，请求本身只选择已有的副本。
+zstd 需要安装 zstandard，未安装时只生成 gzip。
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import hmac
+import mimetypes
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from stat import S_ISREG
+from typing import Dict, List, Optional, Set, Tuple
+from .upload import upload_tmp_dir
+
+COMPRESSED_DIR_NAME = ".compressed"
+KEY_FILE_NAME = ".key"
+NO_GAIN_SUFFIX = ".none"  # 某种编码压缩后没有变小时写入的标记（按编码分别记录），避免重复尝试
+
+# 服务端偏好顺序
+ENCODINGS: Dict[str, str] = {"zstd": "zst", "gzip": "gz"}
+
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/xml", "application/javascript", "application/x-javascript",
+    "application/x-yaml", "application/yaml", "application/toml", "application/x-sh",
+    "application/x-ndjson", "application/wasm", "image/svg+xml", "image/bmp", "image/x-ms-bmp",
+}
+COMPRESSIBLE_SUFFIXES = {".md", ".markdown", ".log", ".txt", ".csv", ".yaml", ".yml", ".toml", ".ini"}
+
+_pending: Set[Path] = set()
+_pending_lock = threading.Lock()
+_keys: Dict[Path, bytes] = {}
+
+
+def is_compressible(path: Path, size: int, min_size: int = 1024) -> bool:
+    """按扩展名判断是否值得压缩（文本类、SVG 等）"""
+    if size < min_size:
+        return False
+    if path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+        return True
+    mime, encoding = mimetypes.guess_type(path.name)
+    if encoding is not None or mime is None:
+        return False
+    return mime.startswith("text/") or mime in COMPRESSIBLE_TYPES
+
+def available_encodings() -> List[str]:
+    try:
+        import zstandard  # type: ignore[import-not-found]  # noqa: F401
+    except ImportError:
+        return ["gzip"]
+    return list(ENCODINGS)
+
+def sidecar_dir(work_dir: Path, file_path: Path) -> Path:
+    rel = file_path.resolve().relative_to(work_dir.resolve())
+    return work_dir / COMPRESSED_DIR_NAME / rel
+
+def sidecar_key(work_dir: Path) -> bytes:
+    """副本文件名签名用的密钥，首次使用时生成（多个进程同时生成时以先写入的为准）"""
+    root = work_dir.resolve()
+    key = _keys.get(root)
+    if key is not None:
+        return key
+    path = root / COMPRESSED_DIR_NAME / KEY_FILE_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        key = path.read_bytes()
+    else:
+        key = secrets.token_bytes(32)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+    if len(key) < 32:
+        raise RuntimeError(f"压缩副本密钥 {path} 无效，删除后会重新生成")
+    return _keys.setdefault(root, key)
+
+def sidecar_path(work_dir: Path, file_path: Path, stat: os.stat_result, encoding: str) -> Path:
+    version = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    signature = hmac.new(sidecar_key(work_dir), version.encode(), hashlib.sha256).hexdigest()[:32]
+    return sidecar_dir(work_dir, file_path) / f"{version}-{signature}.{ENCODINGS.get(encoding, encoding)}"
+
+def no_gain_marker(sidecar: Path) -> Path:
+    return sidecar.with_name(sidecar.name + NO_GAIN_SUFFIX)
+
+def is_regular_file(path: Path) -> bool:
+    """存在且是普通文件（不跟随符号链接）"""
+    try:
+        return S_ISREG(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """解析 Accept-Encoding，返回 编码 -> q 值"""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def choose_encoding(header: Optional[str], encodings: List[str]) -> Optional[str]:
+    """按客户端的 q 值（相同时按服务端偏好）从 encodings 中选择编码，没有可用编码时返回 None"""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best: Optional[str] = None
+    best_q = 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def find_variant(
+    work_dir: Path,
+    file_path: Path,
+    stat: os.stat_result,
+    accept_encoding: Optional[str]
+) -> Tuple[Optional[str], Optional[Path], bool]:
+    """
+    查找与请求匹配的已有压缩副本
+
+    Returns:
+        (编码, 副本路径, 是否需要生成副本)；没有可用副本时编码和路径为 None
+    """
+    existing = []
+    missing = False
+    for encoding in available_encodings():
+        path = sidecar_path(work_dir, file_path, stat, encoding)
+        if is_regular_file(path):
+            existing.append(encoding)
+        elif not no_gain_marker(path).exists():
+            missing = True
+    chosen = choose_encoding(accept_encoding, existing)
+    if chosen is None:
+        return None, None, missing
+    return chosen, sidecar_path(work_dir, file_path, stat, chosen), missing
+
+def _compress_to(src: Path, dst: Path, encoding: str, tmp_dir: Path) -> int:
+    fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix=f".{ENCODINGS[encoding]}")
+    tmp = Path(tmp_name)
+    try:
+        with open(src, "rb") as fin, os.fdopen(fd, "wb") as fout:
+            if encoding == "gzip":
+                with gzip.GzipFile(filename="", mode="wb", fileobj=fout, compresslevel=9, mtime=0) as gz:
+                    shutil.copyfileobj(fin, gz, 1024 * 1024)
+            else:
+                import zstandard  # type: ignore[import-not-found]
+                zstandard.ZstdCompressor(level=19).copy_stream(fin, fout)
+        os.chmod(tmp, 0o644)
+        size = tmp.stat().st_size
+        os.replace(tmp, dst)
+        return size
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def compress_variants(work_dir: Path, file_path: Path, min_ratio: float = 0.9) -> List[str]:
+    """
+    为文件生成所有可用编码的压缩副本（阻塞操作，在后台任务中调用），并删除旧版本的副本
+
+    Args:
+        min_ratio: 压缩后大小超过原文件的该比例时不保留副本
+
+    Returns:
+        生成的编码列表
+    """
+    key = file_path.resolve()
+    with _pending_lock:
+        if key in _pending:
+            return []  # 已有任务在处理
+        _pending.add(key)
+    try:
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            return []
+        directory = sidecar_dir(work_dir, file_path)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_dir = upload_tmp_dir(work_dir)
+        created: List[str] = []
+        keep: Set[str] = set()
+        for encoding in available_encodings():
+            target = sidecar_path(work_dir, file_path, stat, encoding)
+            marker = no_gain_marker(target)
+            if is_regular_file(target):
+                keep.add(target.name)
+                continue
+            if marker.exists():
+                keep.add(marker.name)
+                continue
+            size = _compress_to(file_path, target, encoding, tmp_dir)
+            if size > stat.st_size * min_ratio:
+                target.unlink()
+                marker.touch()
+                keep.add(marker.name)
+                continue
+            keep.add(target.name)
+            created.append(encoding)
+        if file_path.stat().st_mtime_ns != stat.st_mtime_ns:
+            return created  # 压缩期间源文件被修改，新副本已失效，留给下次清理
+        for old in directory.iterdir():
+            if old.is_file() and old.name not in keep:
+                old.unlink(missing_ok=True)
+        return created
+    finally:
+        with _pending_lock:
+            _pending.discard(key)
+
+def remove_variants(work_dir: Path, file_path: Path) -> None:
+    """删除文件的所有压缩副本"""
+    shutil.rmtree(sidecar_dir(work_dir, file_path), ignore_errors=True)
+
+def gc_variants(work_dir: Path) -> int:
+    """删除源文件已不存在的压缩副本，返回删除的文件数"""
+    root = work_dir / COMPRESSED_DIR_NAME
+    if not root.exists():
+        return 0
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        directory = Path(dirpath)
+        if directory == root:
+            continue  # 根目录下只有密钥
+        if filenames:
+            source = work_dir / directory.relative_to(root)
+            if not source.is_file():
+                for name in filenames:
+                    (directory / name).unlink(missing_ok=True)
+                    removed += 1
+        try:
+            directory.rmdir()  # 只删除空目录
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,188 @@
+from __future__ import annotations
+import bisect
+import os
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+SORT_FIELDS = ("created_at", "modified_at", "size")
+
+
+class FileMeta(NamedTuple):
+    size: int
+    ctime: float
+    mtime: float
+    ino: int
+    mtime_ns: int
+
+
+class DirEntry:
+    __slots__ = ("mtime_ns", "files", "dirs")
+
+    def __init__(self, mtime_ns: int, files: Dict[str, FileMeta], dirs: List[str]):
+        self.mtime_ns = mtime_ns
+        self.files = files  # 文件名 -> 元数据
+        self.dirs = dirs  # 子目录名
+
+
+class FileIndex:
+    """
+    UPLOAD 目录的文件元数据索引（进程内存）：
+    - 按目录缓存文件的 size/ctime/mtime，刷新时只 stat 目录，
+      目录 mtime 变化（文件增删、重命名、原子替换）时才重新扫描该目录
+    - 以点开头的目录（.tmp、.blobs 等内部目录）不计入索引
+    - 为每种排序方式缓存一份有序列表，索引变化后才重建
+
+    原地修改文件内容不会改变目录 mtime，需调用 invalidate 或等待该目录下有其他变化；
+    目录重新扫描时会重新 stat 其中的文件。
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.dirs: Dict[str, DirEntry] = {}
+        self.version = 0
+        self._sorted: Dict[str, Tuple[int, List[Tuple[float, str]]]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        with self._lock:
+            seen: Set[str] = set()
+            changed = self._refresh_dir("", seen)
+            for rel in list(self.dirs):
+                if rel not in seen:
+                    del self.dirs[rel]
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def _refresh_dir(self, rel: str, seen: Set[str]) -> bool:
+        path = self.root / rel if rel else self.root
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        seen.add(rel)
+        entry = self.dirs.get(rel)
+        changed = False
+        if entry is None or entry.mtime_ns != mtime_ns:
+            entry = self._scan(path, mtime_ns, entry.files if entry else {})
+            self.dirs[rel] = entry
+            changed = True
+        for name in entry.dirs:
+            changed = self._refresh_dir(f"{rel}/{name}" if rel else name, seen) or changed
+        return changed
+
+    @staticmethod
+    def _scan(path: Path, mtime_ns: int, known: Dict[str, FileMeta]) -> DirEntry:
+        """
+        扫描目录并 stat 其中每个文件；inode、大小和 mtime 都未变的文件沿用已有元数据。
+        只比较 inode 不够：删除后新建的文件可能复用 inode，原地修改也不会改变 inode
+        """
+        files: Dict[str, FileMeta] = {}
+        dirs: List[str] = []
+        with os.scandir(path) as it:
+            for item in it:
+                try:
+                    if item.is_dir(follow_symlinks=False):
+                        if not item.name.startswith("."):
+                            dirs.append(item.name)
+                    elif item.is_file():
+                        stat = item.stat()
+                        old = known.get(item.name)
+                        if (
+                            old is not None and old.ino == stat.st_ino
+                            and old.size == stat.st_size and old.mtime_ns == stat.st_mtime_ns
+                        ):
+                            files[item.name] = old
+                        else:
+                            files[item.name] = FileMeta(
+                                stat.st_size, stat.st_ctime, stat.st_mtime, stat.st_ino, stat.st_mtime_ns
+                            )
+                except FileNotFoundError:
+                    continue
+        return DirEntry(mtime_ns, files, dirs)
+
+    def invalidate(self, directory: Path) -> None:
+        """强制下次刷新时重新扫描 directory"""
+        try:
+            rel = directory.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return
+        with self._lock:
+            entry = self.dirs.get("" if rel == "." else rel)
+            if entry is not None:
+                entry.mtime_ns = -1
+
+    def get(self, rel_path: str) -> Optional[FileMeta]:
+        parent, _, name = rel_path.rpartition("/")
+        entry = self.dirs.get(parent)
+        return entry.files.get(name) if entry else None
+
+    def _iter_files(self) -> Iterator[Tuple[str, FileMeta]]:
+        for rel, entry in list(self.dirs.items()):
+            prefix = f"{rel}/" if rel else ""
+            for name, meta in list(entry.files.items()):
+                yield prefix + name, meta
+
+    def sorted_keys(self, sort_by: str) -> List[Tuple[float, str]]:
+        """按 sort_by 倒序（值相同按路径）排列的 (排序键, 相对路径) 列表"""
+        cached = self._sorted.get(sort_by)
+        if cached and cached[0] == self.version:
+            return cached[1]
+        field = {"created_at": 1, "modified_at": 2, "size": 0}[sort_by]
+        keys = sorted((-meta[field], rel) for rel, meta in self._iter_files())
+        self._sorted[sort_by] = (self.version, keys)
+        return keys
+
+    def list(
+        self,
+        sort_by: str = "created_at",
+        after: Optional[Tuple[float, str]] = None,
+        limit: Optional[int] = None,
+        prefix: Optional[str] = None,
+        suffix: Optional[str] = None,
+        recursive: bool = False
+    ) -> Tuple[List[Tuple[str, FileMeta]], Optional[Tuple[float, str]]]:
+        """
+        分页列出文件
+
+        Args:
+            after: 上一页最后一条的排序键（游标）
+            prefix: 文件名（非递归）或相对路径（递归）前缀
+            suffix: 文件后缀，不含点；与 Path.suffix 比较（不区分大小写），
+                只匹配最后一个后缀，点开头的文件（如 .bashrc）没有后缀
+
+        Returns:
+            (本页文件, 下一页游标)，没有下一页时游标为None
+        """
+        keys = self.sorted_keys(sort_by)
+        start = bisect.bisect_right(keys, after) if after else 0
+        suffix = f".{suffix.lower()}" if suffix else None
+        items: List[Tuple[str, FileMeta]] = []
+        last: Optional[Tuple[float, str]] = None
+        for i in range(start, len(keys)):
+            rel = keys[i][1]
+            if not recursive and "/" in rel:
+                continue
+            if prefix and not rel.startswith(prefix):
+                continue
+            if suffix and PurePosixPath(rel).suffix.lower() != suffix:
+                continue
+            if limit is not None and len(items) >= limit:
+                return items, last
+            meta = self.get(rel)
+            if meta is not None:
+                items.append((rel, meta))
+                last = keys[i]
+        return items, None
+
+
+_indexes: Dict[Path, FileIndex] = {}
+
+def get_file_index(root: Path) -> FileIndex:
+    """获取 root 目录的索引（每个进程每个目录一份），并按目录 mtime 增量刷新"""
+    index = _indexes.get(root)
+    if index is None:
+        index = _indexes.setdefault(root, FileIndex(root))
+    index.refresh()
+    return index
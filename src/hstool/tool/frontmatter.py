@@ -1,6 +1,53 @@
+import os
+import re
+import tempfile
 import frontmatter  # type: ignore
+import yaml
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict
+
+
+FM_BOUNDARY = re.compile(r"^-{3,}\s*$", re.MULTILINE)  # 与 python-frontmatter 的 YAML 分隔符一致
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # 有 libyaml 时使用 C 实现
+
+
+def load_yaml(text: str) -> Any:
+    return yaml.load(text, Loader=YamlLoader)
+
+def read_frontmatter_text(file_path: str | Path) -> Optional[str]:
+    """
+    逐行读取到结束分隔符为止，返回 YAML Frontmatter 的原文，正文不会被读入
+
+    没有 Frontmatter（或缺少结束分隔符）时返回 None。
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        line = f.readline()
+        while line and not line.strip():
+            line = f.readline()
+        if not FM_BOUNDARY.match(line.lstrip()):
+            return None
+        lines: List[str] = []
+        for line in f:
+            if FM_BOUNDARY.match(line):
+                return "".join(lines)
+            lines.append(line)
+    return None
+
+def read_frontmatter(file_path: str | Path) -> Dict[str, Any]:
+    """
+    只解析 Frontmatter 的元数据，结果与 frontmatter.load(file_path).metadata 相同
+
+    YAML 以外的格式（JSON/TOML）交给 frontmatter.load 处理。
+    """
+    fm = read_frontmatter_text(file_path)
+    if fm is None:
+        with open(file_path, "r", encoding="utf-8") as f:
+            head = f.read(64).lstrip()
+        if head.startswith(("{", "+++")):
+            return dict(frontmatter.load(str(file_path)).metadata)
+        return {}
+    metadata = load_yaml(fm)
+    return metadata if isinstance(metadata, dict) else {}
 
 
 def add_frontmatter(
@@ -37,9 +84,7 @@ def get_frontmatter(md_file_path: str) -> Dict[str, object]:
     if not file_path.exists():
         raise FileNotFoundError(f"错误：文件 {md_file_path} 不存在")
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        post = frontmatter.load(f)
-    return dict(post.metadata)  # 返回元数据字典
+    return read_frontmatter(file_path)
 
 def update_frontmatter(
     md_file_path: str,
@@ -48,21 +93,154 @@ def update_frontmatter(
     """更新 Frontmatter 中的部分元数据（不覆盖现有其他字段）"""
     return add_frontmatter(md_file_path, new_metadata, overwrite=False)
 
-def rename_frontmatter(file_path: str| Path, **kwargs: object):
-    """重命名 Frontmatter 中的字段"""
+def rename_frontmatter(file_path: str| Path, **kwargs: object) -> bool:
+    """重命名 Frontmatter 中的字段（字段不存在时不写文件），返回文件是否被修改"""
     if not Path(file_path).exists():
         raise FileNotFoundError(f"错误：文件 {file_path} 不存在")
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        post = frontmatter.load(f)
-        
-    with open(file_path, 'w', encoding='utf-8') as f:
-        new_metadata = {}
-        for key in post.metadata:
-            if key in kwargs:
-                new_metadata[kwargs[key]] = post.metadata[key]
-            else:
-                new_metadata[key] = post.metadata[key]
-        post.metadata = new_metadata
-        f.write(frontmatter.dumps(post))
-        f.write(post.content)
+    ops: List[EditOp] = [("rename", key, str(value)) for key, value in kwargs.items()]
+    return bool(edit_frontmatter_file(file_path, ops))
+
+
+EditOp = Tuple[str, str, Any]  # ("rename", 旧字段, 新字段) / ("set", 字段, 值) / ("delete", 字段, None)
+
+
+def split_frontmatter(text: str) -> Optional[Tuple[str, str, str]]:
+    """
+    将文本拆分为 (开始分隔符之前的空白, Frontmatter 文本, 从结束分隔符开始的原文)，
+    没有 Frontmatter 时返回 None
+
+    与 frontmatter.load 一致，开始分隔符之前可以有空白；空白原样返回，重写文件时不会丢失。
+    """
+    body = text.lstrip()
+    leading = text[:len(text) - len(body)]
+    start = FM_BOUNDARY.match(body)
+    if start is None:
+        return None
+    end = FM_BOUNDARY.search(body, start.end())
+    if end is None:
+        return None
+    return leading, body[start.end():end.start()], body[end.start():]
+
+def apply_edits(metadata: Dict[str, Any], ops: List[EditOp]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    按顺序对元数据执行修改，字段顺序保持不变（重命名保留原位置，新字段追加在末尾）
+
+    返回:
+        (新的元数据, 变化描述列表)，没有变化时列表为空
+    """
+    result = dict(metadata)
+    changes: List[str] = []
+    for op, key, value in ops:
+        if op == "rename":
+            if key not in result or key == value:
+                continue
+            if value in result:
+                raise ValueError(f"字段 {value} 已存在，无法将 {key} 重命名为 {value}")
+            result = {(value if k == key else k): v for k, v in result.items()}
+            changes.append(f"{key} -> {value}")
+        elif op == "set":
+            if key in result and result[key] == value:
+                continue
+            changes.append(f"{key}: {result[key]!r} -> {value!r}" if key in result else f"+{key}: {value!r}")
+            result[key] = value
+        elif op == "delete":
+            if key not in result:
+                continue
+            changes.append(f"-{key}: {result.pop(key)!r}")
+        else:
+            raise ValueError(f"未知的修改类型 {op}")
+    return result, changes
+
+def edit_frontmatter_file(
+    file_path: str | Path,
+    ops: List[EditOp],
+    tags: Optional[List[str]] = None,
+    dry_run: bool = False
+) -> List[str]:
+    """
+    修改单个文件的 Frontmatter
+
+    参数:
+        ops: 依次执行的修改
+        tags: 只修改包含其中任一标签的文件
+        dry_run: 只计算变化，不写文件
+
+    返回:
+        变化描述列表，为空表示文件未被选中或没有变化（文件不会被重写）
+
+    只重新生成 Frontmatter 部分，正文原样保留；写入先写同目录的临时文件再原子替换。
+    """
+    path = Path(file_path)
+    fm = read_frontmatter_text(path)
+    metadata = (load_yaml(fm) if fm is not None else None) or {}
+    if not isinstance(metadata, dict):
+        raise ValueError("Frontmatter 不是键值对")
+    if tags:
+        post_tags = metadata.get("tags") or []
+        if not set(tags) & set([post_tags] if isinstance(post_tags, str) else post_tags):
+            return []
+    new_metadata, changes = apply_edits(metadata, ops)
+    if not changes or dry_run:
+        return changes
+    # 确实需要修改时才读取全文，正文原样保留
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    parts = split_frontmatter(text)
+    leading, body = (parts[0], parts[2]) if parts is not None else ("", "---\n" + text)
+    header = yaml.safe_dump(new_metadata, allow_unicode=True, sort_keys=False, default_flow_style=False)
+    if parts is not None and "\r\n" in parts[1]:
+        header = header.replace("\n", "\r\n")  # 保持原文件的换行符
+        atomic_write_text(path, f"{leading}---\r\n{header}{body}")
+    else:
+        atomic_write_text(path, f"{leading}---\n{header}{body}")
+    return changes
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """写入同目录的临时文件后原子替换，中途失败不会留下写了一半的文件"""
+    mode = path.stat().st_mode if path.exists() else None
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class EditResult(TypedDict):
+    path: str
+    changes: List[str]
+    error: Optional[str]
+
+
+def _edit_task(args: Tuple[str, List[EditOp], Optional[List[str]], bool]) -> EditResult:
+    path, ops, tags, dry_run = args
+    try:
+        return {"path": path, "changes": edit_frontmatter_file(path, ops, tags, dry_run), "error": None}
+    except Exception as e:
+        return {"path": path, "changes": [], "error": f"{type(e).__name__}: {e}"}
+
+def bulk_edit_frontmatter(
+    files: Iterable[str | Path],
+    ops: List[EditOp],
+    tags: Optional[List[str]] = None,
+    dry_run: bool = False,
+    jobs: int = 1
+) -> Iterator[EditResult]:
+    """
+    批量修改 Frontmatter，jobs > 1 时用进程池并行处理
+
+    每个文件的结果按完成顺序产出（包括未变化的文件），单个文件出错不影响其他文件。
+    """
+    tasks = [(str(path), ops, tags, dry_run) for path in files]
+    if jobs <= 1 or len(tasks) < 2:
+        yield from map(_edit_task, tasks)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_edit_task, tasks, chunksize=max(1, min(256, len(tasks) // (jobs * 4))))
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, TypedDict
+from sqlalchemy import select
+from sqlalchemy.orm.session import Session as SQLASession
+from ..sql.blog import SyncManifest, SyncState
+from ..sql.db import Session
+from .blog import SyncStats, apply_blog_changes
+from .importer import BulkImporter
+
+
+class GitSyncResult(TypedDict):
+    stats: SyncStats
+    since: Optional[str]  # 上次同步的提交，None 表示完整对账
+    head: str
+    changed_files: int
+
+
+def git(cwd: Path, *args: str) -> bytes:
+    try:
+        proc = subprocess.run(["git", *args], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("未找到 git 命令")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"git {' '.join(args)} 失败: {e.stderr.decode(errors='replace').strip()}")
+    return proc.stdout
+
+def state_key(root: Path) -> str:
+    return f"git:{root.as_posix()}"
+
+def commit_exists(cwd: Path, commit: str) -> bool:
+    try:
+        git(cwd, "cat-file", "-e", f"{commit}^{{commit}}")
+        return True
+    except RuntimeError:
+        return False
+
+def diff_changes(root: Path, toplevel: Path, since: str, head: str) -> Dict[str, str]:
+    """
+    git diff --name-status 转换为 sync_blog_changes 的变化：
+    重命名拆为删除旧路径、新增新路径，复制只新增新路径
+    """
+    out = git(root, "diff", "--name-status", "-z", "-M", "--no-ext-diff", since, head, "--", ".")
+    fields = out.decode("utf-8", errors="surrogateescape").split("\0")
+    changes: Dict[str, str] = {}
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in ("R", "C"):
+            old, new = fields[i + 1], fields[i + 2]
+            i += 3
+            if status == "R":
+                changes[(toplevel / old).as_posix()] = "deleted"
+            changes[(toplevel / new).as_posix()] = "modified"
+        else:
+            path = fields[i + 1]
+            i += 2
+            changes[(toplevel / path).as_posix()] = "deleted" if status == "D" else "modified"
+    return changes
+
+def reconcile_changes(session: SQLASession, root: Path) -> Dict[str, str]:
+    """
+    完整对账：git 跟踪的所有文章文件视为修改（stat 未变的会被跳过），
+    清单中已不被跟踪的文件视为删除
+    """
+    out = git(root, "ls-files", "-z", "--", ".")  # 输出相对于 root 的路径
+    tracked = {
+        (root / rel).as_posix()
+        for rel in out.decode("utf-8", errors="surrogateescape").split("\0") if rel
+    }
+    prefix = root.as_posix() + "/"
+    manifest: List[str] = list(session.scalars(
+        select(SyncManifest.path).where(SyncManifest.path.startswith(prefix, autoescape=True))
+    ))
+    changes = {path: "modified" for path in tracked}
+    changes.update({path: "deleted" for path in manifest if path not in tracked})
+    return changes
+
+def git_sync_blog(path: str | Path, full: bool = False) -> GitSyncResult:
+    """
+    按 git 提交增量同步博客目录
+
+    记录每个目录最后同步的提交，之后只把 git diff 上次提交..HEAD 中的新增、修改、删除和重命名
+    交给 apply_blog_changes。首次同步、full=True 或上次提交已不在历史中（如 rebase）时做完整对账。
+    所有变化与新的同步提交在同一个事务中提交，失败时数据库保持不变；
+    有文件解析失败时其余变化照常提交，但同步提交不前进。
+
+    文件内容读取自工作区，未提交的修改也会一并导入，但不会影响下次 diff 的起点。
+    """
+    root = Path(path).resolve()
+    toplevel = Path(git(root, "rev-parse", "--show-toplevel").decode().strip()).resolve()
+    head = git(root, "rev-parse", "HEAD").decode().strip()
+    stats: SyncStats = {"added": 0, "updated": 0, "skipped": 0, "deleted": 0, "errors": []}
+
+    session = next(Session())
+    try:
+        key = state_key(root)
+        state = session.query(SyncState).filter(SyncState.key == key).first()
+        since = state.value if state and not full else None
+        if since is not None and not commit_exists(root, since):
+            since = None
+        if since == head:
+            return {"stats": stats, "since": since, "head": head, "changed_files": 0}
+        if since is None:
+            changes = reconcile_changes(session, root)
+        else:
+            changes = diff_changes(root, toplevel, since, head)
+
+        # 批大小覆盖全部变化，保证只在最后提交一次
+        importer = BulkImporter(session, batch_size=len(changes) + 1)
+        apply_blog_changes(session, importer, root, changes, stats)
+        # 有文件解析失败时不推进同步点，下次同步会重试（其余文件因清单未变而跳过）
+        if not stats["errors"]:
+            if state is None:
+                state = SyncState(key=key, value=head)
+                session.add(state)
+            state.value = head
+        importer.flush()
+        return {"stats": stats, "since": since, "head": head, "changed_files": len(changes)}
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
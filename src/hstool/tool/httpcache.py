@@ -0,0 +1,93 @@
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+from .common import file_sha256
+
+
+class DigestCache:
+    """
+    文件内容哈希缓存：(st_dev, st_ino) -> (size, mtime_ns, sha256)
+
+    文件被替换或修改后 inode/size/mtime 会变化，缓存自动失效；
+    去重存储中共享内容的文件名是同一个 inode，只需计算一次。
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple[int, int], Tuple[int, int, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, stat: os.stat_result) -> Optional[str]:
+        key = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, stat: os.stat_result, digest: str) -> None:
+        key = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            self._entries[key] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def digest(self, path: Path, stat: os.stat_result) -> str:
+        """返回文件的 SHA-256，未缓存时计算（阻塞操作）"""
+        digest = self.get(stat)
+        if digest is None:
+            digest = file_sha256(path)
+            self.put(stat, digest)
+        return digest
+
+
+digest_cache = DigestCache()
+
+
+def remember_digest(path: Path, digest: str) -> None:
+    """上传完成时记录已知的哈希，之后生成强 ETag 无需重新计算"""
+    try:
+        digest_cache.put(path.stat(), digest)
+    except FileNotFoundError:
+        pass
+
+def weak_etag(stat: os.stat_result) -> str:
+    """根据 mtime 和大小生成弱 ETag"""
+    return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def file_etag(path: Path, stat: os.stat_result, strong: bool = False) -> str:
+    """strong=True 时用内容哈希生成强 ETag（阻塞操作），否则用 stat 生成弱 ETag"""
+    if strong:
+        return f'"{digest_cache.digest(path, stat)}"'
+    return weak_etag(stat)
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 使用弱比较：忽略 W/ 前缀"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+def is_not_modified(headers: Mapping[str, str], etag: str, mtime: float) -> bool:
+    """
+    判断条件请求是否可以返回 304：
+    - 有 If-None-Match 时只看 ETag
+    - 否则比较 If-Modified-Since 与文件修改时间（精确到秒）
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
@@ -0,0 +1,185 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Set, cast
+from sqlalchemy import CursorResult, Result, Table, insert, update, delete, select, func
+from sqlalchemy.orm.session import Session as SQLASession
+from ..sql.blog import Blog, Tag, tag_blog
+from .category import CategoryCache, normalize_path
+
+BLOG_FIELDS = ("slug", "title", "create", "update", "content")
+UPSERT_DIALECTS = ("sqlite", "postgresql")
+MAX_BIND_PARAMS = 999  # SQLite 3.32 之前单条语句的参数上限（SQLITE_MAX_VARIABLE_NUMBER）
+
+
+def dialect_insert(session: SQLASession, table: Table) -> Any:
+    """返回支持 ON CONFLICT 的方言 insert 语句，不支持的数据库返回None"""
+    name = session.get_bind().dialect.name
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+        return postgresql_insert(table)
+    return None
+
+
+class BulkImporter:
+    """
+    批量导入引擎：
+    - 初始化时一次性加载已有的 slug、标签和分类
+    - 文章按 batch_size 分批写入，SQLite/PostgreSQL 使用 INSERT ... ON CONFLICT
+    - 每批只提交一次
+
+    结果与逐篇调用 merge_blog_by_slug 的导入方式一致。
+    """
+
+    def __init__(self, session: SQLASession, batch_size: int = 500):
+        self.session = session
+        self.batch_size = max(1, batch_size)
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.removed: Set[str] = set()
+        self.upsert = session.get_bind().dialect.name in UPSERT_DIALECTS
+        blogs: Result[int, str] = session.execute(select(Blog.id, Blog.slug))
+        self.slugs: Dict[str, int] = {slug: id for id, slug in blogs}
+        tags: Result[int, str] = session.execute(select(Tag.id, Tag.name))
+        self.tags: Dict[str, int] = {name: id for id, name in tags}
+        self.categories = CategoryCache.for_session(session)
+
+    def add(self, post: Dict[str, Any]) -> bool:
+        """
+        加入一篇解析后的文章（parse_markdown_file 的结果），满批时自动写入
+
+        Returns:
+            该 slug 是否为新文章
+        """
+        slug = post["slug"]
+        is_new = slug not in self.slugs and slug not in self.pending
+        # 同一批内 slug 重复时后者覆盖前者，与逐篇导入的结果一致
+        self.pending[slug] = post
+        self.removed.discard(slug)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return is_new
+
+    def remove(self, slugs: Iterable[str]) -> int:
+        """
+        标记删除文章（与本批次的写入一起提交），之后再 add 同一 slug 会取消删除
+
+        Returns:
+            数据库中存在、将被删除的文章数
+        """
+        count = 0
+        for slug in slugs:
+            self.pending.pop(slug, None)
+            if slug in self.slugs and slug not in self.removed:
+                self.removed.add(slug)
+                count += 1
+        return count
+
+    def flush(self) -> None:
+        """写入当前批次并提交"""
+        if self.removed:
+            self._delete_blogs(self.removed)
+            self.removed.clear()
+        if self.pending:
+            posts = list(self.pending.values())
+            self.pending.clear()
+            self._ensure_tags(posts)
+            category_ids = self.categories.resolve_many(
+                self.session, [post.get("category") for post in posts]
+            )
+            rows = [
+                self._blog_row(post, category_ids.get(normalize_path(post.get("category"))))
+                for post in posts
+            ]
+            if self.upsert:
+                self._upsert_blogs(rows)
+            else:
+                self._merge_blogs(rows)
+            self._replace_tag_links(posts)
+        self.session.commit()
+
+    def _delete_blogs(self, slugs: Iterable[str]) -> None:
+        """删除文章及其标签关联（SQLite 默认不启用外键，不能依赖级联删除）"""
+        blog_ids = [self.slugs.pop(slug) for slug in slugs if slug in self.slugs]
+        if blog_ids:
+            self.session.execute(delete(tag_blog).where(tag_blog.c.blog_id.in_(blog_ids)))
+            self.session.execute(delete(Blog.__table__).where(Blog.__table__.c.id.in_(blog_ids)))
+
+    def _ensure_tags(self, posts: List[Dict[str, Any]]) -> None:
+        """一次性插入本批次中尚不存在的标签"""
+        missing: List[str] = []
+        for post in posts:
+            for name in post.get("tags") or []:
+                if name not in self.tags and name not in missing:
+                    missing.append(name)
+        if missing:
+            result: Result[int, str] = self.session.execute(
+                insert(Tag).returning(Tag.id, Tag.name),
+                [{"name": name} for name in missing]
+            )
+            for id, name in result:
+                self.tags[name] = id
+
+    def _blog_row(self, post: Dict[str, Any], category_id: Optional[int]) -> Dict[str, Any]:
+        row = {k: post.get(k) for k in BLOG_FIELDS}
+        if category_id is None and post["slug"] not in self.slugs:
+            category_id = 1  # 新文章默认未分类
+        # 已有文章且未提供分类时为None，保留原分类
+        row["category_id"] = category_id
+        return row
+
+    def _upsert_blogs(self, rows: List[Dict[str, Any]]) -> None:
+        """多行 INSERT ... ON CONFLICT，按参数上限分多条语句执行"""
+        size = max(1, MAX_BIND_PARAMS // len(rows[0]))
+        for start in range(0, len(rows), size):
+            self._upsert_blog_chunk(rows[start:start + size])
+
+    def _upsert_blog_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        table = Blog.__table__
+        stmt = dialect_insert(self.session, table).values(rows)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.slug],
+            set_={
+                "title": excluded["title"],
+                "create": excluded["create"],
+                "update": excluded["update"],
+                "content": excluded["content"],
+                "category_id": func.coalesce(excluded["category_id"], table.c.category_id),
+            }
+        ).returning(table.c.id, table.c.slug)
+        for id, slug in self.session.execute(stmt):
+            self.slugs[slug] = id
+
+    def _merge_blogs(self, rows: List[Dict[str, Any]]) -> None:
+        """不支持 ON CONFLICT 的数据库逐行写入（仍按批提交）"""
+        table = Blog.__table__
+        for row in rows:
+            blog_id = self.slugs.get(row["slug"])
+            if blog_id is None:
+                inserted = cast(CursorResult[Any], self.session.execute(insert(table).values(row)))
+                primary_key = inserted.inserted_primary_key
+                assert primary_key is not None
+                self.slugs[row["slug"]] = primary_key[0]
+            else:
+                if row["category_id"] is None:
+                    row.pop("category_id")
+                self.session.execute(update(table).where(table.c.id == blog_id).values(row))
+
+    def _replace_tag_links(self, posts: List[Dict[str, Any]]) -> None:
+        """整体替换本批文章的标签关联"""
+        blog_ids = [self.slugs[post["slug"]] for post in posts]
+        self.session.execute(delete(tag_blog).where(tag_blog.c.blog_id.in_(blog_ids)))
+        links = {
+            (self.slugs[post["slug"]], self.tags[name])
+            for post in posts
+            for name in post.get("tags") or []
+        }
+        if not links:
+            return
+        values = [{"blog_id": blog_id, "tag_id": tag_id} for blog_id, tag_id in links]
+        stmt = dialect_insert(self.session, tag_blog) if self.upsert else None
+        if stmt is not None:
+            self.session.execute(stmt.on_conflict_do_nothing(), values)
+        else:
+            self.session.execute(insert(tag_blog), values)
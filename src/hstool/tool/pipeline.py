@@ -0,0 +1,66 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional, TypedDict
+
+
+class ParseTask(TypedDict):
+    path: str  # 源文件绝对路径
+    slug: str
+    mtime: float
+    size: int
+    hash: Optional[str]  # 清单中记录的哈希，None 表示新文件
+
+
+class ParseResult(ParseTask):
+    digest: Optional[str]  # 文件当前的哈希
+    post: Optional[Dict[str, Any]]  # 解析结果，内容未变化或出错时为None
+    error: Optional[str]
+
+
+def parse_task(task: ParseTask) -> ParseResult:
+    """
+    解析单个博客文件（在工作进程中执行）：
+    - 先计算内容哈希，与清单一致则不再解析
+    - 异常不会抛出，而是记录在 error 字段
+    """
+    from .blog import parse_markdown_file
+    from .common import file_sha256
+    result: ParseResult = {**task, "digest": None, "post": None, "error": None}
+    try:
+        result["digest"] = file_sha256(task["path"])
+        if result["digest"] != task["hash"]:
+            result["post"] = parse_markdown_file(task["path"], task["slug"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def parse_posts(
+    tasks: Iterable[ParseTask],
+    jobs: int = 1,
+    queue_size: int | None = None
+) -> Iterator[ParseResult]:
+    """
+    并行解析博客文件，按提交顺序产出结果
+
+    Args:
+        tasks: 待解析的文件
+        jobs: 工作进程数，小于等于1时在当前进程中串行解析
+        queue_size: 已提交但未被消费的最大任务数（默认 jobs*4），
+            写入端处理较慢时解析端会等待，避免结果堆积在内存中
+    """
+    if jobs <= 1:
+        for task in tasks:
+            yield parse_task(task)
+        return
+
+    queue_size = max(queue_size or jobs * 4, jobs)
+    inflight: Deque[Future[ParseResult]] = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for task in tasks:
+            inflight.append(pool.submit(parse_task, task))
+            if len(inflight) >= queue_size:
+                yield inflight.popleft().result()
+        while inflight:
+            yield inflight.popleft().result()
@@ -0,0 +1,310 @@
+"""
+博客目录的本地文章索引
+
+把每篇文章（<root>/<slug>/<name>.md）的 Frontmatter 字段保存在本地 SQLite 文件中
+（默认 .hstool/posts.db，与数据库配置无关），按文件的 mtime/size 增量刷新，
+只重新读取有变化的文件，并且只解析 Frontmatter 头部。
+标签单独成表并建索引，按标签、分类、日期范围的查询都走索引。
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypedDict
+from zoneinfo import ZoneInfo
+from ..config import config
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,  -- 相对于 root 的路径
+    slug TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT,
+    category TEXT,  -- 多级分类以 / 连接
+    "create" TEXT,  -- 本地时间 YYYY-MM-DD HH:MM:SS
+    "update" TEXT,
+    tags TEXT,  -- JSON 数组
+    PRIMARY KEY (root, path)
+);
+CREATE INDEX IF NOT EXISTS ix_posts_create ON posts (root, "create");
+CREATE INDEX IF NOT EXISTS ix_posts_update ON posts (root, "update");
+CREATE INDEX IF NOT EXISTS ix_posts_category ON posts (root, category);
+CREATE TABLE IF NOT EXISTS post_tags (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (root, tag, path)
+);
+"""
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FIELDS = ("create", "update")
+SORT_FIELDS = ("create", "update", "title", "slug")
+RELATIVE_DATE = re.compile(r"^(\d+)([dwmy])$")  # 30d / 2w / 1m / 1y
+RELATIVE_DAYS = {"d": 1, "w": 7, "m": 30, "y": 365}
+
+
+class PostEntry(TypedDict):
+    path: str
+    slug: str
+    title: Optional[str]
+    category: str
+    create: Optional[str]
+    update: Optional[str]
+    tags: List[str]
+
+
+class RefreshStats(TypedDict):
+    added: int
+    updated: int
+    deleted: int
+    unchanged: int
+    errors: List[Tuple[str, str]]  # (文件路径, 错误信息)
+
+
+class PostQuery(TypedDict, total=False):
+    tags: List[str]  # 包含全部标签
+    category: str  # 分类及其子分类
+    since: datetime
+    until: datetime  # 不含
+    by: str  # 日期范围使用的字段：create / update
+    title: str  # 标题包含（不区分大小写）
+    sort: str
+    reverse: bool  # 升序
+    limit: int
+
+
+def index_path() -> Path:
+    return Path(config.BLOG_INDEX)
+
+def open_index(path: str | Path | None = None) -> sqlite3.Connection:
+    """打开索引，不存在时创建；结构版本不一致时重建"""
+    path = Path(path) if path else index_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        conn.executescript(f"DROP TABLE IF EXISTS posts; DROP TABLE IF EXISTS post_tags; PRAGMA user_version={SCHEMA_VERSION};")
+    conn.executescript(SCHEMA)
+    return conn
+
+def format_date(value: Any) -> Optional[str]:
+    """Frontmatter 中的日期统一为本地时间字符串，便于按字符串比较"""
+    from .common import parse_date
+    if value is None:
+        return None
+    try:
+        parsed = parse_date(value if not isinstance(value, (int, float)) else str(value))
+    except TypeError:
+        return None
+    if parsed is None:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(ZoneInfo(config.ZONE)).replace(tzinfo=None)
+    return parsed.strftime(DATE_FORMAT)
+
+def read_post_entry(root: Path, rel: str) -> PostEntry:
+    from .category import normalize_path
+    from .frontmatter import read_frontmatter
+    metadata = read_frontmatter(root / rel)
+    tags = metadata.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return {
+        "path": rel,
+        "slug": rel.split("/", 1)[0],
+        "title": str(metadata["title"]) if metadata.get("title") is not None else None,
+        "category": "/".join(normalize_path(metadata.get("category"))),
+        "create": format_date(metadata.get("create")),
+        "update": format_date(metadata.get("update")),
+        "tags": sorted({str(tag) for tag in tags}),
+    }
+
+def _read_task(args: Tuple[Path, str]) -> Tuple[str, Optional[PostEntry], Optional[str]]:
+    root, rel = args
+    try:
+        return rel, read_post_entry(root, rel), None
+    except Exception as e:
+        return rel, None, f"{type(e).__name__}: {e}"
+
+def scan_post_files(root: Path) -> Iterable[Tuple[str, int, int]]:
+    """产出 (相对路径, mtime_ns, size)，目录结构与 init 相同，忽略以点开头的目录和文件"""
+    with os.scandir(root) as posts:
+        for post in posts:
+            if post.name.startswith(".") or not post.is_dir():
+                continue
+            try:
+                with os.scandir(post.path) as files:
+                    for file in files:
+                        if not file.name.endswith(".md") or file.name.startswith("."):
+                            continue
+                        try:
+                            stat = file.stat()
+                        except FileNotFoundError:
+                            continue
+                        yield f"{post.name}/{file.name}", stat.st_mtime_ns, stat.st_size
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+def refresh_index(conn: sqlite3.Connection, root: str | Path, jobs: int = 1) -> RefreshStats:
+    """
+    增量刷新 root 的索引：mtime 和 size 都未变化的文件跳过，
+    其余文件只读取 Frontmatter 头部，已删除的文件移出索引，全部变化在一个事务中提交
+    """
+    root = Path(root).resolve()
+    key = root.as_posix()
+    stats: RefreshStats = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0, "errors": []}
+    known = {
+        row[0]: (row[1], row[2])
+        for row in conn.execute("SELECT path, mtime_ns, size FROM posts WHERE root = ?", (key,))
+    }
+    seen: Dict[str, Tuple[int, int]] = {}
+    for rel, mtime_ns, size in scan_post_files(root):
+        seen[rel] = (mtime_ns, size)
+    todo = [rel for rel, state in seen.items() if known.get(rel) != state]
+    removed = [rel for rel in known if rel not in seen]
+    stats["unchanged"] = len(seen) - len(todo)
+
+    tasks = [(root, rel) for rel in todo]
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_read_task, tasks, chunksize=max(1, min(256, len(tasks) // (jobs * 4)))))
+    else:
+        results = [_read_task(task) for task in tasks]
+
+    with conn:
+        conn.executemany("DELETE FROM posts WHERE root = ? AND path = ?", [(key, rel) for rel in removed])
+        conn.executemany("DELETE FROM post_tags WHERE root = ? AND path = ?", [(key, rel) for rel in removed + todo])
+        stats["deleted"] = len(removed)
+        rows: List[Tuple[Any, ...]] = []
+        tag_rows: List[Tuple[str, str, str]] = []
+        for rel, entry, error in results:
+            if entry is None:
+                # 解析失败的文件不记录 mtime，下次刷新重试
+                stats["errors"].append((str(root / rel), error or ""))
+                conn.execute("DELETE FROM posts WHERE root = ? AND path = ?", (key, rel))
+                continue
+            mtime_ns, size = seen[rel]
+            rows.append((
+                key, rel, entry["slug"], mtime_ns, size, entry["title"], entry["category"],
+                entry["create"], entry["update"], json.dumps(entry["tags"], ensure_ascii=False)
+            ))
+            tag_rows.extend((key, rel, tag) for tag in entry["tags"])
+            stats["updated" if rel in known else "added"] += 1
+        conn.executemany(
+            'INSERT OR REPLACE INTO posts (root, path, slug, mtime_ns, size, title, category, "create", "update", tags) '
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.executemany("INSERT OR IGNORE INTO post_tags (root, path, tag) VALUES (?, ?, ?)", tag_rows)
+    return stats
+
+def parse_query_date(value: str, end: bool = False) -> datetime:
+    """
+    解析日期参数：parse_date 支持的格式，或 30d/2w/1m/1y 表示距今的时间；
+    作为结束日期且只有日期时包含当天
+    """
+    from .common import parse_date
+    value = value.strip()
+    match = RELATIVE_DATE.match(value)
+    if match:
+        now = datetime.now(ZoneInfo(config.ZONE)).replace(tzinfo=None)
+        return now - timedelta(days=int(match.group(1)) * RELATIVE_DAYS[match.group(2)])
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"无法解析日期 {value}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(ZoneInfo(config.ZONE)).replace(tzinfo=None)
+    if end and ":" not in value:
+        parsed += timedelta(days=1)
+    return parsed
+
+def parse_query_terms(terms: Iterable[str]) -> PostQuery:
+    """
+    将 key:value 形式的查询词转换为 PostQuery：
+    tag:（可重复）category: since: until: by: title: sort: limit:，
+    不带 key 的词作为标题关键字
+    """
+    query: PostQuery = {}
+    words: List[str] = []
+    for term in terms:
+        key, sep, value = term.partition(":")
+        if not sep or key not in ("tag", "category", "since", "until", "by", "title", "sort", "limit"):
+            words.append(term)
+            continue
+        if key == "tag":
+            query.setdefault("tags", []).append(value)
+        elif key == "since":
+            query["since"] = parse_query_date(value)
+        elif key == "until":
+            query["until"] = parse_query_date(value, end=True)
+        elif key == "limit":
+            query["limit"] = int(value)
+        elif key == "by" and value not in DATE_FIELDS:
+            raise ValueError(f"by 只能是 {'/'.join(DATE_FIELDS)}")
+        elif key == "sort" and value.lstrip("-") not in SORT_FIELDS:
+            raise ValueError(f"sort 只能是 {'/'.join(SORT_FIELDS)}")
+        elif key == "sort":
+            query["sort"] = value.lstrip("-")
+            query["reverse"] = not value.startswith("-")
+        else:
+            query[key] = value  # type: ignore[literal-required]
+    if words:
+        query["title"] = " ".join(([query["title"]] if "title" in query else []) + words)
+    return query
+
+def query_posts(conn: sqlite3.Connection, root: str | Path, query: PostQuery) -> List[Dict[str, Any]]:
+    """
+    按条件查询索引，默认按日期字段倒序
+
+    标签条件要求文章同时带有全部标签，分类匹配该分类及其子分类。
+    by 和 sort 会拼接到 SQL 中，不在 DATE_FIELDS / SORT_FIELDS 中时抛出 ValueError。
+    """
+    key = Path(root).resolve().as_posix()
+    by = query.get("by", "update")
+    sort = query.get("sort", by)
+    if by not in DATE_FIELDS:
+        raise ValueError(f"by 只能是 {'/'.join(DATE_FIELDS)}")
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"sort 只能是 {'/'.join(SORT_FIELDS)}")
+    where = ["p.root = ?"]
+    params: List[Any] = [key]
+    for tag in query.get("tags", []):
+        where.append("EXISTS (SELECT 1 FROM post_tags t WHERE t.root = p.root AND t.tag = ? AND t.path = p.path)")
+        params.append(tag)
+    if query.get("category"):
+        category = query["category"].strip("/")
+        # 子分类以 "分类/" 开头，转换为范围条件以使用索引（"0" 是 "/" 的下一个字符）
+        where.append("(p.category = ? OR (p.category >= ? AND p.category < ?))")
+        params += [category, category + "/", category + "0"]
+    if "since" in query:
+        where.append(f'p."{by}" >= ?')
+        params.append(query["since"].strftime(DATE_FORMAT))
+    if "until" in query:
+        where.append(f'p."{by}" < ?')
+        params.append(query["until"].strftime(DATE_FORMAT))
+    if query.get("title"):
+        where.append("p.title LIKE ? ESCAPE '\\'")
+        escaped = query["title"].replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params.append(f"%{escaped}%")
+    order = "ASC" if query.get("reverse") else "DESC"
+    sql = (
+        f'SELECT p.path, p.slug, p.title, p.category, p."create", p."update", p.tags FROM posts p '
+        f'WHERE {" AND ".join(where)} ORDER BY p."{sort}" {order}, p.path'
+    )
+    if query.get("limit"):
+        sql += " LIMIT ?"
+        params.append(query["limit"])
+    return [
+        {**dict(row), "tags": json.loads(row["tags"] or "[]")}
+        for row in conn.execute(sql, params)
+    ]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from .common import file_sha256
+from .blobstore import place_file
+from .upload import UploadError, upload_tmp_dir
+
+SESSION_DIR_NAME = "sessions"
+SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def sessions_dir(work_dir: Path) -> Path:
+    path = upload_tmp_dir(work_dir) / SESSION_DIR_NAME
+    path.mkdir(exist_ok=True)
+    return path
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """合并重叠或相邻的 [start, end) 区间"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class UploadSession:
+    """
+    可续传的分块上传会话，全部状态保存在磁盘上（UPLOAD/.tmp/sessions/<id>/）：
+    - meta.json: 文件名、总大小、期望的 SHA-256 等创建参数
+    - data: 预分配大小的数据文件，分块按偏移量直接写入
+    - ranges/<start>-<end>: 每个写完的分块一个标记文件
+
+    分块之间互不依赖，可以乱序、并行上传（包括多个进程）；
+    中断的分块没有标记文件，客户端重传即可。
+    """
+
+    def __init__(self, work_dir: Path, session_id: str):
+        if not SESSION_ID.match(session_id):
+            raise UploadError(404, f"上传会话 '{session_id}' 不存在")
+        self.work_dir = work_dir
+        self.id = session_id
+        self.path = sessions_dir(work_dir) / session_id
+        self.data_path = self.path / "data"
+        self.ranges_path = self.path / "ranges"
+
+    @classmethod
+    def create(
+        cls,
+        work_dir: Path,
+        filename: str,
+        size: int,
+        sha256: Optional[str] = None,
+        overwrite: bool = False
+    ) -> UploadSession:
+        session = cls(work_dir, uuid.uuid4().hex)
+        session.ranges_path.mkdir(parents=True)
+        with open(session.data_path, "wb") as f:
+            f.truncate(size)  # 稀疏文件，不实际占用空间
+        meta = {
+            "filename": filename,
+            "size": size,
+            "sha256": sha256.lower() if sha256 else None,
+            "overwrite": overwrite,
+            "created_at": time.time(),
+        }
+        (session.path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        return session
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise UploadError(404, f"上传会话 '{self.id}' 不存在")
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        """已完整接收的字节区间（已合并）"""
+        ranges = []
+        for marker in self.ranges_path.iterdir():
+            start, end = marker.name.split("-")
+            ranges.append((int(start), int(end)))
+        return merge_ranges(ranges)
+
+    def offset(self) -> int:
+        """从0开始连续接收的字节数，即顺序续传时下一个分块的偏移量"""
+        ranges = self.ranges()
+        return ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+    def status(self) -> Dict[str, Any]:
+        meta = self.meta
+        return {
+            "id": self.id,
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "offset": self.offset(),
+            "ranges": self.ranges(),
+            "expires_at": self.path.stat().st_mtime + _ttl(),
+        }
+
+    async def write_chunk(self, offset: int, stream: AsyncIterator[bytes]) -> int:
+        """
+        将请求体写入 offset 处，写完后记录该区间
+
+        Returns:
+            写入的字节数
+        """
+        size = self.meta["size"]
+        if offset < 0 or offset > size:
+            raise UploadError(416, f"偏移量 {offset} 超出文件大小 {size}")
+        fd = await run_in_threadpool(os.open, self.data_path, os.O_WRONLY)
+        position = offset
+        try:
+            buffer: List[bytes] = []
+            buffered = 0
+            async for data in stream:
+                if position + buffered + len(data) > size:
+                    raise UploadError(416, f"分块超出文件大小 {size}")
+                buffer.append(data)
+                buffered += len(data)
+                if buffered >= 1024 * 1024:
+                    await run_in_threadpool(os.pwrite, fd, b"".join(buffer), position)
+                    position += buffered
+                    buffer, buffered = [], 0
+            if buffer:
+                await run_in_threadpool(os.pwrite, fd, b"".join(buffer), position)
+                position += buffered
+        finally:
+            await run_in_threadpool(os.close, fd)
+        if position > offset:
+            (self.ranges_path / f"{offset}-{position}").touch()
+        os.utime(self.path)  # 刷新会话的过期时间
+        return position - offset
+
+    def finalize(self, target: Path, sha256: Optional[str] = None) -> str:
+        """
+        校验完整性并原子移动到目标位置（阻塞操作，需在线程池中调用）
+
+        Args:
+            target: 目标文件路径
+            sha256: 客户端提供的哈希，未提供时使用创建会话时的哈希
+
+        Returns:
+            文件的 SHA-256
+        """
+        meta = self.meta
+        expected = (sha256 or meta["sha256"] or "").lower()
+        if not expected:
+            raise UploadError(400, "完成上传时必须提供文件的 sha256")
+        if self.ranges() != [(0, meta["size"])] and meta["size"] > 0:
+            raise UploadError(409, f"文件尚未上传完整，已连续接收 {self.offset()} / {meta['size']} 字节")
+        digest = file_sha256(self.data_path)
+        if digest != expected:
+            raise UploadError(422, f"文件校验失败：期望 {expected}，实际 {digest}")
+        try:
+            place_file(self.work_dir, self.data_path, target, digest, meta["overwrite"])
+        except FileExistsError:
+            raise UploadError(400, f"文件 '{target.name}' 已存在，若需覆盖请设置 overwrite=True")
+        self.delete()
+        return digest
+
+    def delete(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _ttl() -> int:
+    from ..config import config
+    return config.UPLOAD_SESSION_TTL
+
+def expire_sessions(work_dir: Path, ttl: Optional[int] = None) -> int:
+    """删除超过 ttl 秒没有活动的上传会话，返回删除的数量"""
+    ttl = _ttl() if ttl is None else ttl
+    deadline = time.time() - ttl
+    expired = 0
+    for path in sessions_dir(work_dir).iterdir():
+        try:
+            if path.stat().st_mtime < deadline:
+                shutil.rmtree(path, ignore_errors=True)
+                expired += 1
+        except FileNotFoundError:
+            continue
+    return expired
@@ -0,0 +1,273 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict, cast
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import Result, select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.session import Session as SQLASession
+from urllib3.util.retry import Retry
+from ..sql.blog import Blog, Category, PushManifest
+from .category import normalize_path
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+CONFLICT_STATUS = (400, 409)  # 创建时 slug 唯一约束冲突（Strapi 返回 400 ValidationError）
+
+
+class PushStats(TypedDict):
+    created: int
+    updated: int
+    skipped: int  # 内容哈希与上次推送一致
+    errors: List[Tuple[str, str]]  # (slug, 错误信息)
+
+
+def _iso(value: Any) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def post_payload(
+    slug: str,
+    title: str,
+    content: str,
+    create: Any,
+    update: Any,
+    tags: Iterable[str],
+    category: Iterable[str]
+) -> Dict[str, Any]:
+    """推送到 Strapi 的文章数据（字段需与 Strapi 中的内容类型一致，tags 为 JSON 字段）"""
+    return {
+        "slug": slug,
+        "title": title,
+        "content": content,
+        "create": _iso(create),
+        "update": _iso(update),
+        "tags": list(tags),
+        "category": "/".join(category),
+    }
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def iter_db_posts(session: SQLASession, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """从 blog 表读取文章，分批加载，标签一次性预加载"""
+    rows: Result[int, str, Optional[int]] = session.execute(select(Category.id, Category.name, Category.parent_id))
+    categories = {id: (name, parent_id) for id, name, parent_id in rows}
+    paths: Dict[int, List[str]] = {}
+
+    def category_path(category_id: Optional[int]) -> List[str]:
+        if category_id is None or category_id not in categories:
+            return []
+        if category_id not in paths:
+            name, parent_id = categories[category_id]
+            paths[category_id] = category_path(parent_id) + [name]
+        return paths[category_id]
+
+    stmt = (
+        select(Blog).options(selectinload(Blog.tags)).order_by(Blog.id)
+        .execution_options(yield_per=batch_size)
+    )
+    blog: Any  # 模型使用 Column 声明，类型检查器无法识别实例属性的类型
+    for blog in session.scalars(stmt):
+        yield post_payload(
+            blog.slug, blog.title, blog.content, blog.create, blog.update,
+            [tag.name for tag in blog.tags], category_path(blog.category_id)
+        )
+
+def iter_file_posts(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """从博客目录（<slug>/<slug>.md）读取文章"""
+    from .blog import parse_markdown_file
+    for blog in sorted(os.listdir(path)):
+        blog_dir = Path(path, blog)
+        if not blog_dir.is_dir():
+            continue
+        for file in sorted(blog_dir.glob("*.md")):
+            post = parse_markdown_file(file, blog)
+            yield post_payload(
+                post["slug"], post["title"], post["content"], post["create"], post["update"],
+                post["tags"] or [], normalize_path(post["category"])
+            )
+
+
+class StrapiClient:
+    """
+    Strapi REST 客户端（兼容 v4/v5）：
+    - 共享一个 requests.Session，连接池大小与并发数一致，连接保持复用
+    - 连接失败、429 和 5xx 按指数退避重试，遵守 Retry-After；
+      POST 不是幂等的，不自动重试，失败或冲突后按 slug 查找确认，避免重复创建
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        collection: str,
+        token: str = "",
+        concurrency: int = 8,
+        retries: int = 5,
+        timeout: float = 30
+    ):
+        self.url = f"{base_url.rstrip('/')}/api/{collection}"
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({"GET", "PUT"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Dict[str, Any]:
+        response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        if response.status_code >= 400:
+            raise requests.HTTPError(
+                f"{method} {url} 返回 {response.status_code}: {response.text[:200]}", response=response
+            )
+        return response.json() if response.content else {}
+
+    @staticmethod
+    def _remote_id(item: Dict[str, Any]) -> str:
+        return str(item.get("documentId") or item["id"])
+
+    def find_ids(self, slugs: List[str]) -> Dict[str, str]:
+        """一次请求按 slug 批量查找已有记录，返回 slug -> 远端ID"""
+        params: List[Tuple[str, Any]] = [(f"filters[slug][$in][{i}]", slug) for i, slug in enumerate(slugs)]
+        params += [("fields[0]", "slug"), ("pagination[pageSize]", len(slugs)), ("pagination[page]", 1)]
+        data = self._request("GET", self.url, params=params).get("data") or []
+        ids = {}
+        for item in data:
+            slug = item.get("slug") or (item.get("attributes") or {}).get("slug")  # v5 / v4
+            if slug:
+                ids[slug] = self._remote_id(item)
+        return ids
+
+    def find_id(self, slug: str) -> Optional[str]:
+        return self.find_ids([slug]).get(slug)
+
+    def create(self, payload: Dict[str, Any]) -> str:
+        """
+        创建记录。请求失败时服务器可能已经创建成功（如响应超时、网关返回 5xx），
+        此时按 slug 查找一次，找到则返回已创建的记录
+        """
+        try:
+            return self._remote_id(self._request("POST", self.url, json={"data": payload})["data"])
+        except requests.RequestException as e:
+            response = getattr(e, "response", None)
+            if response is not None and response.status_code not in RETRY_STATUS:
+                raise
+            remote_id = self.find_id(payload["slug"])
+            if remote_id is None:
+                raise
+            return remote_id
+
+    def update(self, remote_id: str, payload: Dict[str, Any]) -> str:
+        return self._remote_id(self._request("PUT", f"{self.url}/{remote_id}", json={"data": payload})["data"])
+
+    def upsert(self, remote_id: Optional[str], payload: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        有远端ID时更新，否则创建；远端记录已被删除（404）时重新创建。
+
+        remote_id 应来自批量查找（find_ids），创建前不再逐条查询；
+        只有创建因 slug 冲突失败（批量查找之后已被其他进程创建）时才按 slug 查找并改为更新
+
+        Returns:
+            (远端ID, 是否新建)
+        """
+        if remote_id is not None:
+            try:
+                return self.update(remote_id, payload), False
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 404:
+                    raise
+        try:
+            return self.create(payload), True
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in CONFLICT_STATUS:
+                raise
+            found = self.find_id(payload["slug"])
+            if found is None or found == remote_id:
+                raise
+            return self.update(found, payload), False
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def push_posts(
+    session: SQLASession,
+    client: StrapiClient,
+    posts: Iterable[Dict[str, Any]],
+    concurrency: int = 8,
+    batch_size: int = 100,
+    force: bool = False,
+    dry_run: bool = False
+) -> PushStats:
+    """
+    将文章推送到 Strapi
+
+    - 内容哈希与上次推送一致的文章跳过（force=True 时全部推送）
+    - 每批先用一次查询找出远端已有记录，再以 concurrency 个线程并发创建/更新
+    - 每批结束后提交推送记录，中断后重新运行只会推送剩余的文章
+    """
+    stats: PushStats = {"created": 0, "updated": 0, "skipped": 0, "errors": []}
+    target = client.url
+    manifest: Dict[str, Any] = {
+        cast(str, m.slug): m for m in session.query(PushManifest).filter(PushManifest.target == target)
+    }
+    posts = iter(posts)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while batch := list(islice(posts, batch_size)):
+            todo: List[Tuple[Dict[str, Any], str]] = []
+            for payload in batch:
+                digest = payload_hash(payload)
+                entry = manifest.get(payload["slug"])
+                if entry is not None and entry.hash == digest and not force:
+                    stats["skipped"] += 1
+                else:
+                    todo.append((payload, digest))
+            if not todo:
+                continue
+            if dry_run:
+                for payload, _ in todo:
+                    stats["updated" if payload["slug"] in manifest else "created"] += 1
+                continue
+
+            unknown = [p["slug"] for p, _ in todo if manifest.get(p["slug"]) is None or not manifest[p["slug"]].remote_id]
+            try:
+                found = client.find_ids(unknown) if unknown else {}
+            except requests.RequestException as e:
+                stats["errors"].extend((p["slug"], str(e)) for p, _ in todo)
+                continue
+            futures = {}
+            for payload, digest in todo:
+                slug = payload["slug"]
+                entry = manifest.get(slug)
+                remote_id = entry.remote_id if entry is not None and entry.remote_id else found.get(slug)
+                futures[pool.submit(client.upsert, remote_id, payload)] = (slug, digest)
+            for future in as_completed(futures):
+                slug, digest = futures[future]
+                try:
+                    remote_id, created = future.result()
+                except (requests.RequestException, KeyError, ValueError) as e:
+                    stats["errors"].append((slug, str(e)))
+                    continue
+                entry = manifest.get(slug)
+                if entry is None:
+                    entry = manifest[slug] = PushManifest(target=target, slug=slug, hash=digest, remote_id=remote_id)
+                    session.add(entry)
+                else:
+                    entry.hash, entry.remote_id = digest, remote_id
+                stats["created" if created else "updated"] += 1
+            session.commit()
+    return stats
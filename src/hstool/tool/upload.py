@@ -0,0 +1,181 @@
+from __future__ import annotations
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+TMP_DIR_NAME = ".tmp"  # UPLOAD 下存放未完成上传的目录，与目标文件同一文件系统
+
+
+class UploadError(Exception):
+    """上传失败，status_code 为建议返回的 HTTP 状态码"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def upload_tmp_dir(work_dir: Path) -> Path:
+    tmp_dir = work_dir / TMP_DIR_NAME
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    return tmp_dir
+
+
+class StreamingFileWriter:
+    """
+    流式写入上传文件：
+    - 数据先写入 UPLOAD/.tmp 下的临时文件，同时计算 SHA-256
+    - 磁盘写入在线程池中执行，不阻塞事件循环
+    - 超过 max_size 立即中止；完成后原子重命名到目标位置，半成品永远不可见
+    """
+
+    def __init__(self, work_dir: Path, max_size: int = 0, buffer_size: int = 1024 * 1024):
+        self.max_size = max_size  # 0 表示不限制
+        self.buffer_size = buffer_size
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.work_dir = work_dir
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        fd, tmp_path = tempfile.mkstemp(dir=upload_tmp_dir(work_dir), suffix=".part")
+        self.tmp_path = Path(tmp_path)
+        self._file = os.fdopen(fd, "wb")
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.max_size and self.size > self.max_size:
+            raise UploadError(413, f"文件超过大小限制 {self.max_size} 字节")
+        self._buffer.append(data)
+        self._buffered += len(data)
+        # 攒够一块再切换到线程，减少线程切换次数
+        if self._buffered >= self.buffer_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._buffer:
+            chunks, self._buffer, self._buffered = self._buffer, [], 0
+            await run_in_threadpool(self._write_chunks, chunks)
+
+    def _write_chunks(self, chunks: List[bytes]) -> None:
+        for chunk in chunks:
+            self._file.write(chunk)
+            self.sha256.update(chunk)
+
+    async def commit(self, target: Path, overwrite: bool = False) -> str:
+        """写完剩余数据并原子重命名到 target，返回 SHA-256"""
+        await self.flush()
+        await run_in_threadpool(self._close_and_sync)
+        from .blobstore import place_file
+        digest = self.sha256.hexdigest()
+        try:
+            await run_in_threadpool(place_file, self.work_dir, self.tmp_path, target, digest, overwrite)
+        except FileExistsError:
+            raise UploadError(400, f"文件 '{target.name}' 已存在，若需覆盖请设置 overwrite=True")
+        finally:
+            self.tmp_path.unlink(missing_ok=True)
+        return digest
+
+    def _close_and_sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        # mkstemp 创建的文件仅属主可读写，恢复为普通文件的权限
+        os.chmod(self.tmp_path, 0o644)
+
+    def abort(self) -> None:
+        """丢弃临时文件"""
+        self._file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+def atomic_move(src: Path, dst: Path, overwrite: bool = False) -> None:
+    """
+    原子地将 src 移动到 dst
+    - overwrite=True 时直接 os.replace
+    - 否则用硬链接保证目标已存在时失败（FileExistsError），不支持硬链接的文件系统退化为先检查再替换
+    """
+    if overwrite:
+        os.replace(src, dst)
+        return
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        raise
+    except OSError:
+        if dst.exists():
+            raise FileExistsError(dst)
+        os.replace(src, dst)
+    else:
+        src.unlink()
+
+
+async def iter_multipart_file(
+    content_type: str,
+    stream: AsyncIterator[bytes],
+    field_name: str = "file"
+) -> AsyncIterator[Tuple[str, Optional[str], bytes]]:
+    """
+    流式解析 multipart/form-data 请求体，逐块产出指定字段的文件数据
+
+    Yields:
+        (事件, 文件名, 数据)：事件为 "start"（文件名可用）、"data" 或 "end"
+    """
+    mime, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if mime != b"multipart/form-data" or not boundary:
+        raise UploadError(400, "请求必须为 multipart/form-data")
+
+    events: List[Tuple[str, Optional[str], bytes]] = []
+    state: Dict[str, Any] = {"header_field": b"", "header_value": b"", "headers": {}, "active": False}
+
+    def on_part_begin() -> None:
+        state["headers"] = {}
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["header_value"] += data[start:end]
+
+    def on_header_end() -> None:
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = state["header_value"] = b""
+
+    def on_headers_finished() -> None:
+        _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode()
+        filename = options.get(b"filename")
+        state["active"] = name == field_name and filename is not None
+        if state["active"] and filename is not None:
+            events.append(("start", filename.decode(), b""))
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if state["active"]:
+            events.append(("data", None, data[start:end]))
+
+    def on_part_end() -> None:
+        if state["active"]:
+            events.append(("end", None, b""))
+            state["active"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    async for chunk in stream:
+        parser.write(chunk)
+        for event in events:
+            yield event
+        events.clear()
+    parser.finalize()
+    for event in events:
+        yield event
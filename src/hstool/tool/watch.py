@@ -0,0 +1,252 @@
+"""
+监视博客目录（<root>/<slug>/<slug>.md）的变化：
+
+Linux 下通过 ctypes 直接使用 inotify，只监视根目录和各文章目录，
+事件本身携带文件名，无需扫描目录；其他平台或 inotify 不可用时退化为轮询。
+产出的变化类型与 sync_blog_changes 的参数一致：modified / deleted / deleted_dir，
+根目录下的事件队列溢出时产出 rescan，需要调用方完整扫描一次。
+"""
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Generator, List, Optional, Tuple
+
+Change = Tuple[str, str]  # (变化类型, 绝对路径)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+POST_MASK = IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_post_file(name: str) -> bool:
+    """只关心 .md 文件，忽略编辑器的隐藏/临时文件"""
+    return name.endswith(".md") and not name.startswith(".")
+
+def list_post_files(directory: Path) -> List[Path]:
+    try:
+        return [p for p in directory.iterdir() if is_post_file(p.name) and p.is_file()]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+class InotifyWatcher:
+    """基于 inotify 的监视器，初始化失败时抛出 OSError"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify 不可用")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.dirs: Dict[int, Path] = {}
+        self._add_watch(root, ROOT_MASK)
+        for entry in os.scandir(root):
+            if entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."):
+                self._add_watch(Path(entry.path), POST_MASK)
+
+    def _add_watch(self, path: Path, mask: int) -> int:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return -1  # 目录刚被删除
+            raise OSError(err, f"无法监视 {path}（可能需要调大 fs.inotify.max_user_watches）")
+        self.dirs[wd] = path
+        return wd
+
+    def _remove_watch(self, path: Path) -> None:
+        for wd, watched in list(self.dirs.items()):
+            if watched == path:
+                self.libc.inotify_rm_watch(self.fd, wd)
+                self.dirs.pop(wd, None)
+
+    def read(self, timeout: Optional[float]) -> List[Change]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes: List[Change] = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += length
+            changes.extend(self._handle(wd, mask, name))
+        return changes
+
+    def _handle(self, wd: int, mask: int, name: str) -> List[Change]:
+        if mask & IN_Q_OVERFLOW:
+            return [("rescan", str(self.root))]
+        if mask & IN_IGNORED:
+            self.dirs.pop(wd, None)
+            return []
+        directory = self.dirs.get(wd)
+        if directory is None or not name:
+            return []
+        path = directory / name
+        if directory == self.root:
+            if not mask & IN_ISDIR or name.startswith("."):
+                return []
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                # 先监视再列出，监视建立前写入的文件由列出补上
+                self._add_watch(path, POST_MASK)
+                return [("modified", str(p)) for p in list_post_files(path)]
+            # 移出的目录仍被监视，需要手动移除
+            self._remove_watch(path)
+            return [("deleted_dir", str(path))]
+        if mask & IN_ISDIR or not is_post_file(name):
+            return []
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            return [("deleted", str(path))]
+        return [("modified", str(path))]
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    轮询监视器：每次轮询 stat 根目录、文章目录和已知的 .md 文件，
+    只有目录 mtime 变化时才重新列出该目录
+    """
+
+    def __init__(self, root: Path, interval: float = 1.0):
+        self.root = root
+        self.interval = interval
+        self.root_mtime = -1
+        self.dirs: Dict[Path, Tuple[int, Dict[str, Tuple[int, int]]]] = {}
+        self._poll()  # 建立初始状态，首次轮询的结果不是变化
+
+    @staticmethod
+    def _scan_dir(directory: Path) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for path in list_post_files(directory):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files[path.name] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _poll(self) -> List[Change]:
+        changes: List[Change] = []
+        root_mtime = self.root.stat().st_mtime_ns
+        if root_mtime != self.root_mtime:
+            self.root_mtime = root_mtime
+            current = {
+                Path(entry.path) for entry in os.scandir(self.root)
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+            }
+            for directory in set(self.dirs) - current:
+                del self.dirs[directory]
+                changes.append(("deleted_dir", str(directory)))
+            for directory in current - set(self.dirs):
+                try:
+                    mtime = directory.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                files = self._scan_dir(directory)
+                self.dirs[directory] = (mtime, files)
+                changes.extend(("modified", str(directory / name)) for name in files)
+        for directory, (mtime, files) in list(self.dirs.items()):
+            try:
+                dir_mtime = directory.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue  # 下次根目录变化时处理
+            if dir_mtime != mtime:
+                current_files = self._scan_dir(directory)
+            else:
+                current_files = {}
+                for name in files:
+                    try:
+                        stat = (directory / name).stat()
+                    except FileNotFoundError:
+                        continue
+                    current_files[name] = (stat.st_mtime_ns, stat.st_size)
+            for name in files.keys() - current_files.keys():
+                changes.append(("deleted", str(directory / name)))
+            for name, state in current_files.items():
+                if files.get(name) != state:
+                    changes.append(("modified", str(directory / name)))
+            self.dirs[directory] = (dir_mtime, current_files)
+        return changes
+
+    def read(self, timeout: Optional[float]) -> List[Change]:
+        deadline = time.monotonic() + (timeout if timeout is not None else float("inf"))
+        while True:
+            changes = self._poll()
+            if changes:
+                return changes
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(root: Path, polling: bool = False, interval: float = 1.0):
+    """优先使用 inotify，不可用时退化为轮询"""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+def watch_changes(
+    root: str | Path,
+    debounce: float = 0.5,
+    polling: bool = False,
+    interval: float = 1.0
+) -> Generator[Dict[str, str], None, None]:
+    """
+    持续产出防抖后的变化批次：路径 -> 变化类型
+
+    收到变化后等待 debounce 秒内不再有新变化才产出，编辑器保存时的一连串事件合并为一次；
+    同一路径以最后一次变化为准。
+    """
+    watcher = create_watcher(Path(root).resolve(), polling=polling, interval=interval)
+    try:
+        pending: Dict[str, str] = {}
+        while True:
+            changes = watcher.read(debounce if pending else None)
+            if not changes:
+                if pending:
+                    yield pending
+                    pending = {}
+                continue
+            for kind, path in changes:
+                if kind == "deleted_dir":
+                    # 目录已移除，其中文件的待处理变化一并由删除目录覆盖
+                    prefix = path + os.sep
+                    pending = {p: k for p, k in pending.items() if not p.startswith(prefix)}
+                pending[path] = kind
+    finally:
+        watcher.close()
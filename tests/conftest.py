@@ -0,0 +1,64 @@
+from __future__ import annotations
+import shutil
+from pathlib import Path
+from typing import Iterator
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from hstool.config import config
+
+FIXTURE_POSTS = Path(__file__).parent / "fixtures" / "posts"  # 示例博客目录 <slug>/<slug>.md
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "upload"
+    path.mkdir()
+    monkeypatch.setattr(config, "UPLOAD", path)
+    monkeypatch.setattr(config, "UPLOAD_DEDUP", False)
+    monkeypatch.setattr(config, "DOWNLOAD_COMPRESS", False)
+    return path
+
+
+@pytest.fixture
+def files_client(upload_dir: Path) -> Iterator[TestClient]:
+    from hstool.api.files import router
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Engine]:
+    """指向临时 SQLite 文件的全局引擎，已创建全部表"""
+    from hstool.sql import db
+    monkeypatch.setattr(config, "SQL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(db, "_engine", None)
+    new_engine = db.get_engine()
+    db.Base.metadata.create_all(new_engine)
+    yield new_engine
+    new_engine.dispose()
+
+
+@pytest.fixture
+def blogs_client(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    """挂载博客接口的客户端，异步引擎与 engine 指向同一个数据库"""
+    from hstool.api.blogs import router
+    from hstool.sql import async_db
+    monkeypatch.setattr(async_db, "_async_engine", None)
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+        if async_db._async_engine is not None and client.portal is not None:
+            client.portal.call(async_db._async_engine.dispose)
+
+
+@pytest.fixture
+def blog_dir(tmp_path: Path) -> Path:
+    """示例文章的临时副本，可随意修改"""
+    path = tmp_path / "blogs"
+    shutil.copytree(FIXTURE_POSTS, path)
+    return path
@@ -0,0 +1,115 @@
+from __future__ import annotations
+import asyncio
+from typing import AsyncIterator, List, cast
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession as SQLAAsyncSession
+from sqlalchemy.orm import Session
+from hstool.config import config
+from hstool.sql import async_db
+from hstool.sql.blog import Blog, Tag
+from hstool.tool.async_blog import find_multilevel_category, get_blog_by_slug, merge_blog_by_slug
+
+POSTS = 20
+
+
+@pytest.fixture
+def posts(engine: Engine) -> Engine:
+    with Session(engine) as session:
+        tag = Tag(name="python")
+        session.add_all([
+            Blog(title=f"文章 {i}", slug=f"post-{i}", content=f"正文 {i}", tags=[tag]) for i in range(POSTS)
+        ])
+        session.commit()
+    return engine
+
+
+def test_async_url():
+    assert async_db.async_url("sqlite:///data/hstool.db") == "sqlite+aiosqlite:///data/hstool.db"
+    assert async_db.async_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    with pytest.raises(ValueError):
+        async_db.async_url("mysql://u:p@host/db")
+
+
+def test_concurrent_reads(posts: Engine):
+    async def main(engine: AsyncEngine) -> List[Blog | None]:
+        async def read(slug: str) -> Blog | None:
+            async with async_db.AsyncSessionLocal(bind=engine) as session:
+                return await get_blog_by_slug(session, slug)
+
+        try:
+            return await asyncio.gather(*(read(f"post-{i}") for i in range(POSTS)), read("missing"))
+        finally:
+            await engine.dispose()
+
+    blogs = asyncio.run(main(async_db.create_db_async_engine(config)))
+    assert blogs[-1] is None
+    for i, blog in enumerate(blogs[:-1]):
+        # 标签已预加载，会话关闭后仍可访问
+        assert blog is not None and (blog.title, [tag.name for tag in blog.tags]) == (f"文章 {i}", ["python"])
+
+
+def test_session_per_request(posts: Engine, monkeypatch: pytest.MonkeyPatch):
+    from hstool.api.blogs import router
+    monkeypatch.setattr(async_db, "_async_engine", None)
+    sessions: List[SQLAAsyncSession] = []
+
+    async def recording_session() -> AsyncIterator[SQLAAsyncSession]:
+        async for session in async_db.AsyncSession():
+            sessions.append(session)
+            yield session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[async_db.AsyncSession] = recording_session
+
+    async def main() -> List[httpx.Response]:
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(client.get(f"/blogs/post-{i}") for i in range(POSTS)))
+        finally:
+            await async_db.get_async_engine().dispose()
+
+    responses = asyncio.run(main())
+    assert [r.json()["slug"] for r in responses] == [f"post-{i}" for i in range(POSTS)]
+    # 每个请求各用一个会话，请求结束后会话已关闭
+    assert len({id(session) for session in sessions}) == POSTS
+    assert not any(session.in_transaction() for session in sessions)
+
+
+def test_writes_and_reads_during_write(posts: Engine):
+    async def main(engine: AsyncEngine) -> None:
+        try:
+            async with engine.connect() as conn:
+                mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+                assert str(mode).upper() == config.SQLITE_JOURNAL_MODE.upper()
+            async with async_db.AsyncSessionLocal(bind=engine) as session:
+                category = await find_multilevel_category(session, ["技术", "后端"])
+                assert category is not None
+                await session.commit()
+                blog = await merge_blog_by_slug(session, {"slug": "post-0", "title": "新标题", "category_id": category.id})
+                assert blog.title == "新标题"
+                created = await merge_blog_by_slug(session, {"slug": "new", "title": "新文章", "content": ""})
+                assert created.id is not None
+
+            # 写事务未提交时，其他会话并发读取到的是已提交的数据
+            async with async_db.AsyncSessionLocal(bind=engine) as writer:
+                await writer.execute(text("UPDATE blog SET title = '未提交' WHERE slug = 'post-1'"))
+
+                async def read(slug: str) -> str:
+                    async with async_db.AsyncSessionLocal(bind=engine) as session:
+                        blog = await get_blog_by_slug(session, slug)
+                        assert blog is not None
+                        return cast(str, blog.title)
+
+                titles = await asyncio.gather(read("post-0"), read("post-1"), read("new"))
+                assert titles == ["新标题", "文章 1", "新文章"]
+                await writer.rollback()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main(async_db.create_db_async_engine(config)))
@@ -0,0 +1,28 @@
+from __future__ import annotations
+import hashlib
+from pathlib import Path
+from hstool.tool.blobstore import blob_path, blob_stats, dedup_existing
+
+
+def test_dedup_existing_walks_subdirectories(tmp_path: Path):
+    files = {"a.txt": b"same", "sub/b.txt": b"same", "sub/deep/c.txt": b"other"}
+    internal = {".tmp/x.part": b"partial", ".compressed/a.txt/1-2.gz": b"gz"}
+    for rel, content in {**files, **internal}.items():
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_bytes(content)
+    (tmp_path / "link.txt").symlink_to(tmp_path / "a.txt")
+
+    assert dedup_existing(tmp_path) == 3
+    for rel, content in files.items():
+        path = tmp_path / rel
+        assert path.read_bytes() == content
+        assert path.samefile(blob_path(tmp_path, hashlib.sha256(content).hexdigest()))
+    # 内部目录中的文件和符号链接保持原样
+    for rel, content in internal.items():
+        assert (tmp_path / rel).stat().st_nlink == 1
+        assert not blob_path(tmp_path, hashlib.sha256(content).hexdigest()).exists()
+    assert (tmp_path / "link.txt").is_symlink()
+
+    stats = blob_stats(tmp_path)
+    assert (stats["blobs"], stats["references"], stats["saved_bytes"]) == (2, 3, len(b"same"))
+    assert dedup_existing(tmp_path) == 0
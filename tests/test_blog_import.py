@@ -0,0 +1,185 @@
+from __future__ import annotations
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, cast
+from sqlalchemy import Engine, Result, create_engine, event, select
+from sqlalchemy.orm import Session
+from hstool.sql.blog import Blog, Category, Tag, SyncManifest
+from hstool.sql.db import Base
+from hstool.tool.blog import import_blog_file, init_blog
+from hstool.tool.category import CACHE_KEY, CategoryCache
+from hstool.tool.importer import MAX_BIND_PARAMS, BulkImporter
+
+POSTS = 6  # tests/fixtures/posts 中的文章数
+
+
+def test_init_blog_counts(engine: Engine, blog_dir: Path):
+    stats = init_blog(blog_dir)
+    assert (stats["added"], stats["updated"], stats["skipped"], stats["errors"]) == (POSTS, 0, 0, [])
+
+    # 未变化的文件只比较 stat
+    stats = init_blog(blog_dir)
+    assert (stats["added"], stats["updated"], stats["skipped"]) == (0, 0, POSTS)
+
+    # 只 touch：哈希一致，计为跳过并刷新清单
+    hello = blog_dir / "hello" / "hello.md"
+    mtime = hello.stat().st_mtime + 10
+    os.utime(hello, (mtime, mtime))
+    stats = init_blog(blog_dir)
+    assert (stats["added"], stats["updated"], stats["skipped"]) == (0, 0, POSTS)
+    with Session(engine) as session:
+        entry = session.scalars(select(SyncManifest).where(SyncManifest.slug == "hello")).one()
+        assert entry.mtime == mtime
+
+    # 内容变化才更新
+    life = blog_dir / "life" / "life.md"
+    life.write_text(life.read_text(encoding="utf-8").replace("周末随笔", "周末随笔（修订）"), encoding="utf-8")
+    stats = init_blog(blog_dir)
+    assert (stats["added"], stats["updated"], stats["skipped"]) == (0, 1, POSTS - 1)
+    with Session(engine) as session:
+        assert session.scalars(select(Blog.title).where(Blog.slug == "life")).one() == "周末随笔（修订）"
+        assert session.query(Blog).count() == POSTS
+
+
+def snapshot(engine: Engine) -> Dict[str, Any]:
+    """数据库内容（不含自增ID），没有日期的文章使用导入时间，不比较日期"""
+    with Session(engine) as session:
+        rows: Result[int, str, Optional[int]] = session.execute(
+            select(Category.id, Category.name, Category.parent_id)
+        )
+        categories = {id: (name, parent_id) for id, name, parent_id in rows}
+
+        def category_path(id: Optional[int]) -> Tuple[str, ...]:
+            path: List[str] = []
+            while id is not None:
+                name, id = categories[id]
+                path.insert(0, name)
+            return tuple(path)
+
+        blogs = {
+            blog.slug: (
+                blog.title,
+                None if blog.slug == "plain" else (blog.create, blog.update),
+                blog.content,
+                category_path(cast(Optional[int], blog.category_id)),
+                sorted(tag.name for tag in blog.tags),
+            )
+            for blog in session.scalars(select(Blog))
+        }
+        return {
+            "blogs": blogs,
+            "tags": sorted(session.scalars(select(Tag.name))),
+            "categories": sorted(category_path(id) for id in categories),
+        }
+
+
+def legacy_import(engine: Engine, blog_dir: Path) -> None:
+    with Session(engine) as session:
+        for slug_dir in sorted(blog_dir.iterdir()):
+            import_blog_file(session, slug_dir / f"{slug_dir.name}.md", slug_dir.name)
+            session.commit()
+
+
+def test_bulk_import_matches_legacy(engine: Engine, blog_dir: Path, tmp_path: Path):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(legacy)
+    try:
+        init_blog(blog_dir, batch_size=2)
+        legacy_import(legacy, blog_dir)
+        expected = snapshot(legacy)
+        assert snapshot(engine) == expected
+        assert expected["blogs"]["hello"][3:] == (("技术", "后端", "Python"), ["python", "web"])
+        assert expected["blogs"]["plain"][0] == "Untitled"
+
+        # 再次导入：标签整体替换、分类改变
+        hello = blog_dir / "hello" / "hello.md"
+        text = hello.read_text(encoding="utf-8")
+        hello.write_text(text.replace("[python, web]", "[python, 新标签]").replace("后端, Python", "前端"), encoding="utf-8")
+        init_blog(blog_dir, batch_size=2)
+        legacy_import(legacy, blog_dir)
+        expected = snapshot(legacy)
+        assert snapshot(engine) == expected
+        assert expected["blogs"]["hello"][3:] == (("技术", "前端"), ["python", "新标签"])
+    finally:
+        legacy.dispose()
+
+
+def test_upsert_stays_under_bind_limit(engine: Engine):
+    params: List[int] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_params(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if statement.startswith("INSERT INTO blog") and not executemany:
+            params.append(len(parameters))
+
+    start = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        importer = BulkImporter(session, batch_size=1000)
+        for i in range(400):
+            importer.add({
+                "slug": f"post-{i}", "title": f"文章 {i}", "content": "正文",
+                "create": start + timedelta(days=i), "update": start + timedelta(days=i),
+                "category": ["技术", "后端"], "tags": None,
+            })
+        importer.flush()
+        assert session.query(Blog).count() == 400
+    assert len(params) > 1
+    assert max(params) <= MAX_BIND_PARAMS
+
+
+def test_parallel_parse_errors_are_collected(engine: Engine, blog_dir: Path):
+    broken = blog_dir / "broken" / "broken.md"
+    broken.parent.mkdir()
+    broken.write_text("---\ntitle: [未闭合\n---\n正文\n", encoding="utf-8")
+    stats = init_blog(blog_dir, batch_size=2, jobs=2, queue_size=2)
+    assert (stats["added"], stats["updated"]) == (POSTS, 0)
+    assert [path for path, _ in stats["errors"]] == [broken.resolve().as_posix()]
+    with Session(engine) as session:
+        assert session.query(Blog).count() == POSTS
+
+    # 出错的文件不写入清单，修复后下次导入
+    broken.write_text("---\ntitle: 已修复\n---\n正文\n", encoding="utf-8")
+    stats = init_blog(blog_dir, jobs=2)
+    assert (stats["added"], stats["skipped"], stats["errors"]) == (1, POSTS, [])
+
+
+def test_category_cache_creates_paths_once(engine: Engine):
+    statements: List[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if "category" in statement:
+            statements.append(statement.split()[0])
+
+    paths = [["技术", "后端", "Python"], ["技术", "后端"], ["技术", "前端"], "生活"]
+    with Session(engine) as session:
+        cache = CategoryCache.for_session(session)
+        ids = cache.resolve_many(session, paths)
+        # 加载 + 未命中时重新加载，之后每层一条 INSERT
+        assert statements == ["SELECT", "SELECT", "INSERT", "INSERT", "INSERT"]
+        assert len(set(ids.values())) == 4 and None not in ids.values()
+        session.commit()
+
+        statements.clear()
+        assert cache.resolve_many(session, paths) == ids
+        assert CategoryCache.for_session(session) is cache
+        assert statements == []
+        assert session.query(Category).count() == 1 + 5  # 默认分类 + 技术/后端/Python/前端/生活
+        python = session.get(Category, ids[("技术", "后端", "Python")])
+        assert python is not None and python.parent_id == ids[("技术", "后端")]
+
+
+def test_category_cache_dropped_on_rollback(engine: Engine):
+    with Session(engine) as session:
+        cache = CategoryCache.for_session(session)
+        assert cache.resolve(session, ["技术", "后端"]) is not None
+        session.rollback()
+        assert CACHE_KEY not in session.info
+
+        # 重新加载后不会返回已回滚的ID
+        cache = CategoryCache.for_session(session)
+        assert cache.resolve(session, ["技术", "后端"], create=False) is None
+        assert cache.resolve(session, "Unclassified", create=False) == 1
+        session.rollback()
+        assert CACHE_KEY not in session.info
@@ -0,0 +1,34 @@
+from __future__ import annotations
+from typing import List
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from hstool.sql.blog import Blog
+from hstool.tool.category import CategoryCache
+
+
+def add_posts(engine: Engine) -> None:
+    with Session(engine) as session:
+        ids = CategoryCache().resolve_many(session, [("技术",), ("技术", "后端", "Python"), ("技术", "前端"), ("生活",)])
+        session.add_all([
+            Blog(title="技术", slug="tech", content="", category_id=ids[("技术",)]),
+            Blog(title="Python", slug="python", content="", category_id=ids[("技术", "后端", "Python")]),
+            Blog(title="前端", slug="frontend", content="", category_id=ids[("技术", "前端")]),
+            Blog(title="生活", slug="life", content="", category_id=ids[("生活",)]),
+        ])
+        session.commit()
+
+
+def slugs(client: TestClient, **params: str) -> List[str]:
+    response = client.get("/blogs/", params=params)
+    assert response.status_code == 200
+    return sorted(item["slug"] for item in response.json()["items"])
+
+
+def test_category_filter_includes_descendants(engine: Engine, blogs_client: TestClient):
+    add_posts(engine)
+    assert slugs(blogs_client, category="技术") == ["frontend", "python", "tech"]
+    assert slugs(blogs_client, category="技术/后端") == ["python"]
+    assert slugs(blogs_client, category="技术/后端/Python") == ["python"]
+    assert slugs(blogs_client, category="生活") == ["life"]
+    assert slugs(blogs_client, category="不存在") == []
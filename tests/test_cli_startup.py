@@ -0,0 +1,67 @@
+from __future__ import annotations
+import importlib
+import json
+import subprocess
+import sys
+
+# 启动时不应导入的重量级依赖，它们只在具体命令执行时才导入
+HEAVY_MODULES = ["fastapi", "sqlalchemy", "pydantic", "yaml", "requests", "uvicorn"]
+# 导入 hstool.cli.cli 的累计耗时上限：scripts/bench_startup.py 的预算 60ms，留出 3 倍 CI 余量
+STARTUP_BUDGET_MS = 180
+
+
+def imported_after(code: str) -> set:
+    """在新进程中执行 code，返回其导入的全部模块名"""
+    proc = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport json, sys; print(json.dumps(sorted(sys.modules)))"],
+        capture_output=True, text=True, check=True
+    )
+    return set(json.loads(proc.stdout.splitlines()[-1]))
+
+
+def import_time_ms(module: str) -> float:
+    """在新进程中用 -X importtime 导入 module，返回其累计耗时（毫秒）"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    for line in proc.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise AssertionError(f"-X importtime 的输出中没有 {module}")
+
+
+def test_cli_import_within_budget():
+    # 取多次中的最小值，排除 CI 机器上偶发的抖动
+    best = min(import_time_ms("hstool.cli.cli") for _ in range(3))
+    assert best < STARTUP_BUDGET_MS, f"import hstool.cli.cli 耗时 {best:.1f}ms，超过预算 {STARTUP_BUDGET_MS}ms"
+
+
+def test_cli_import_is_light():
+    modules = imported_after("import hstool.cli.cli")
+    assert [name for name in HEAVY_MODULES if name in modules] == []
+
+
+def test_cli_help_is_light():
+    modules = imported_after(
+        "from hstool.cli.cli import cli\n"
+        "try:\n    cli.main(['--help'], standalone_mode=False)\nexcept SystemExit:\n    pass"
+    )
+    assert [name for name in HEAVY_MODULES if name in modules] == []
+
+
+def test_lazy_command_manifest_matches_commands():
+    from hstool.cli import cli as cli_module
+    for name, (module_name, help_text) in cli_module.LAZY_COMMANDS.items():
+        cmd = getattr(importlib.import_module(module_name), name, None)
+        assert cmd is not None, f"{module_name} 中没有命令 {name}"
+        assert cmd.get_short_help_str(45) == help_text, name
+
+
+def test_every_listed_command_resolves():
+    import click
+    from hstool.cli.cli import cli
+    ctx = click.Context(cli)
+    for name in cli.list_commands(ctx):
+        assert cli.get_command(ctx, name) is not None, name
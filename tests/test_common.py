@@ -0,0 +1,83 @@
+from __future__ import annotations
+import itertools
+import time as timer
+from datetime import date, datetime, time
+from typing import Any, List, Optional
+from zoneinfo import ZoneInfo
+import pytest
+from hstool.config import config
+from hstool.tool.common import DATE_FORMATS, parse_date, parse_dates
+
+
+def legacy_parse_date(date_input: Any) -> Optional[datetime]:
+    """原来的实现：按顺序逐个尝试 strptime"""
+    if isinstance(date_input, datetime):
+        return date_input
+    if isinstance(date_input, date):
+        return datetime.combine(date_input, time.min)
+    if isinstance(date_input, time):
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_input, fmt).replace(tzinfo=ZoneInfo(config.ZONE))
+        except ValueError:
+            continue
+    return None
+
+
+def date_corpus() -> List[Any]:
+    """每种格式 × 日/月有无歧义、是否补零，再加上各种非法或边界输入"""
+    samples = [
+        datetime(2024, 1, 2, 3, 4, 5), datetime(2024, 12, 25, 23, 59, 59),
+        datetime(1999, 2, 28, 0, 0, 0), datetime(2024, 2, 29, 12, 30, 0), datetime(2024, 11, 9, 9, 9, 9),
+    ]
+    corpus: List[Any] = []
+    for fmt, value in itertools.product(DATE_FORMATS, samples):
+        text = value.strftime(fmt)
+        corpus += [text, text.replace("-0", "-").replace("/0", "/"), text.upper(), f" {text}", f"{text} "]
+    corpus += [
+        "2024-02-30", "2023-02-29", "2024-13-01", "2024-01-05 24:00", "2024-01-05 23:59:60",
+        "2024-01-05  10:00", "2024-01-05T10:00", "2024-01- 5", "13-13-2024", "Sept 9 2024",
+        "", "garbage", "2024", "٢٠٢٤-٠١-٠٥", "2024-01-05 10:00:00.5", "2024-01-05+08:00",
+        datetime(2024, 1, 5, 10, 0), date(2024, 1, 5), time(10, 0),
+    ]
+    return corpus
+
+
+def test_parse_date_matches_legacy():
+    corpus = date_corpus()
+    # 正序、逆序各跑一遍，覆盖“上次成功的格式组”的不同状态
+    for value in corpus + corpus[::-1]:
+        assert repr(parse_date(value)) == repr(legacy_parse_date(value)), value
+    assert repr(parse_dates(corpus)) == repr([legacy_parse_date(value) for value in corpus])
+
+
+def test_parse_date_ambiguous_day_month():
+    # 两种解读都合法时与原实现一样优先按 日-月-年
+    parse_date("12-25-2024")  # 让 %m-%d-%Y 成为上次成功的格式
+    assert parse_date("01-02-2024") == datetime(2024, 2, 1, tzinfo=ZoneInfo(config.ZONE))
+
+
+def test_parse_date_type_error():
+    with pytest.raises(TypeError):
+        parse_date(5)  # type: ignore[arg-type]
+
+
+def test_parse_date_faster_than_legacy():
+    corpus = [value for value in date_corpus() if isinstance(value, str)] * 2
+
+    def measure(func: Any) -> float:
+        # 先预热一次（缓存、惰性初始化），再取多次中的最小值，排除调度和 GC 的干扰
+        for value in corpus:
+            func(value)
+        best = float("inf")
+        for _ in range(5):
+            start = timer.perf_counter()
+            for value in corpus:
+                func(value)
+            best = min(best, timer.perf_counter() - start)
+        return best
+
+    # 本机实测约快 15 倍，只要求 3 倍，留出足够余量，不会因机器负载而偶发失败；
+    # 精确的耗时对比见 scripts/bench_parse_date.py
+    assert measure(parse_date) * 3 < measure(legacy_parse_date)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import List
+from hstool.tool.fileindex import FileIndex
+
+
+def test_rescan_picks_up_in_place_edit(tmp_path: Path):
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"old")
+    index = FileIndex(tmp_path)
+    index.refresh()
+    meta = index.get("a.txt")
+    assert meta is not None and meta.size == 3
+
+    # 原地修改：inode 不变，目录 mtime 也不变
+    with open(path, "r+b") as f:
+        f.write(b"new content")
+    os.utime(path, ns=(meta.mtime_ns + 10**9, meta.mtime_ns + 10**9))
+    index.refresh()
+    assert index.get("a.txt") == meta
+    index.invalidate(tmp_path)
+    index.refresh()
+    new = index.get("a.txt")
+    assert new is not None and (new.ino, new.size) == (meta.ino, 11)
+    assert new.mtime_ns == meta.mtime_ns + 10**9
+    assert [rel for rel, _ in index.list(sort_by="size")[0]] == ["a.txt"]
+
+
+def test_rescan_picks_up_same_size_rewrite(tmp_path: Path):
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"one")
+    index = FileIndex(tmp_path)
+    index.refresh()
+    meta = index.get("a.txt")
+    assert meta is not None
+    path.write_bytes(b"two")
+    os.utime(path, ns=(meta.mtime_ns + 10**9, meta.mtime_ns + 10**9))
+    # 目录有其他变化时重新扫描
+    (tmp_path / "b.txt").write_bytes(b"")
+    os.utime(tmp_path, ns=(meta.mtime_ns + 2 * 10**9, meta.mtime_ns + 2 * 10**9))
+    index.refresh()
+    new = index.get("a.txt")
+    assert new is not None and new.mtime_ns == meta.mtime_ns + 10**9
+    assert index.get("b.txt") is not None
+
+
+def test_list_suffix_matches_last_suffix_only(tmp_path: Path):
+    for name in ("a.txt", "B.TXT", "c.tar.gz", ".txt", "dtxt", "e.txt.bak"):
+        (tmp_path / name).write_bytes(b"x")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "f.txt").write_bytes(b"x")
+    index = FileIndex(tmp_path)
+    index.refresh()
+
+    def names(suffix: str, recursive: bool = False) -> List[str]:
+        return sorted(rel for rel, _ in index.list(suffix=suffix, recursive=recursive)[0])
+
+    assert names("txt") == ["B.TXT", "a.txt"]
+    assert names("TXT", recursive=True) == ["B.TXT", "a.txt", "sub/f.txt"]
+    assert names("gz") == ["c.tar.gz"]
+    assert names("tar.gz") == []
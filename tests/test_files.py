@@ -0,0 +1,303 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import io
+import os
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from typing import AsyncIterator, List
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from hstool.config import config
+
+
+def upload(client: TestClient, name: str, content: bytes, overwrite: bool = False):
+    return client.post(
+        "/files/upload",
+        params={"overwrite": overwrite},
+        files={"file": (name, content, "application/octet-stream")},
+    )
+
+
+@pytest.mark.parametrize("name", [".blobs/ab/abc", ".tmp/x.part", ".compressed/a.txt/1-2.gz", "../escape.txt"])
+def test_upload_rejects_internal_paths(files_client: TestClient, upload_dir: Path, name: str):
+    response = upload(files_client, name, b"EVIL", overwrite=True)
+    assert response.status_code == 403
+    assert not (upload_dir / name).exists()
+
+
+def test_dedup_blob_cannot_be_poisoned(files_client: TestClient, upload_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    from hstool.tool.blobstore import blob_path
+    monkeypatch.setattr(config, "UPLOAD_DEDUP", True)
+    real = b"the real content"
+    digest = hashlib.sha256(real).hexdigest()
+
+    rel = blob_path(upload_dir, digest).relative_to(upload_dir).as_posix()
+    assert upload(files_client, rel, b"EVIL", overwrite=True).status_code == 403
+
+    # 即使内容存储中已有被篡改的文件，也不会链接到它
+    blob = blob_path(upload_dir, digest)
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(b"EVIL")
+    response = upload(files_client, "real.txt", real)
+    assert response.status_code == 200
+    assert response.json()["sha256"] == digest
+    assert (upload_dir / "real.txt").read_bytes() == real
+    assert blob.read_bytes() == real
+    assert (upload_dir / "real.txt").samefile(blob)
+    assert files_client.get("/files/real.txt").content == real
+
+
+def test_listing_hides_internal_dirs(files_client: TestClient, upload_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "UPLOAD_DEDUP", True)
+    assert upload(files_client, "a.txt", b"hello").status_code == 200
+    names = [item["name"] for item in files_client.get("/files/", params={"recursive": True}).json()]
+    assert names == ["a.txt"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "MQ==",  # 1
+    "bnVsbA==",  # null
+    "W1tdLCAiYSJd",  # [[], "a"]
+    "WzEsICJhIiwgMl0=",  # [1, "a", 2]
+    "bm90IGpzb24=",  # 非 JSON
+    "!!!",
+])
+def test_listing_rejects_invalid_cursor(files_client: TestClient, upload_dir: Path, cursor: str):
+    (upload_dir / "a.txt").write_text("x")
+    assert files_client.get("/files/", params={"cursor": cursor}).status_code == 400
+
+
+def test_listing_paginates_with_cursor(files_client: TestClient, upload_dir: Path):
+    for i in range(5):
+        (upload_dir / f"{i}.txt").write_text("x" * (i + 1))
+    names: List[str] = []
+    params = {"sort_by": "size", "limit": 2}
+    while True:
+        response = files_client.get("/files/", params=params)
+        assert response.status_code == 200
+        names += [item["name"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert names == [f"{i}.txt" for i in reversed(range(5))]  # 按大小倒序
+
+
+def test_compressed_variant_cannot_be_poisoned(files_client: TestClient, upload_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    from hstool.tool.compress import sidecar_path
+    monkeypatch.setattr(config, "DOWNLOAD_COMPRESS", True)
+    text = b"hello world\n" * 1000
+    assert upload(files_client, "a.txt", text).status_code == 200
+    stat = (upload_dir / "a.txt").stat()
+    version = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    assert upload(files_client, f".compressed/a.txt/{version}.gz", b"POISONED", overwrite=True).status_code == 403
+
+    # 按公开的版本号猜出的文件名不会被使用
+    guessed = upload_dir / ".compressed" / "a.txt" / f"{version}.gz"
+    guessed.write_bytes(b"POISONED")
+    response = files_client.get("/files/a.txt", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == text
+
+    # 真正的副本被替换为符号链接时也不会使用
+    sidecar = sidecar_path(upload_dir, upload_dir / "a.txt", stat, "gzip")
+    sidecar.unlink()
+    sidecar.symlink_to(guessed)
+    response = files_client.get("/files/a.txt", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == text
+
+
+def test_no_gain_marker_is_per_encoding(upload_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    from hstool.tool import compress
+    path = upload_dir / "a.txt"
+    path.write_bytes(b"x" * 10000)
+
+    def fake_compress(src: Path, dst: Path, encoding: str, tmp_dir: Path) -> int:
+        data = b"z" * (100 if encoding == "zstd" else 9999)  # gzip 没有变小
+        dst.write_bytes(data)
+        return len(data)
+
+    monkeypatch.setattr(compress, "available_encodings", lambda: ["zstd", "gzip"])
+    monkeypatch.setattr(compress, "_compress_to", fake_compress)
+    assert compress.compress_variants(upload_dir, path) == ["zstd"]
+    stat = path.stat()
+    encoding, variant, missing = compress.find_variant(upload_dir, path, stat, "gzip, zstd")
+    assert (encoding, missing) == ("zstd", False)
+    assert variant == compress.sidecar_path(upload_dir, path, stat, "zstd")
+    assert compress.find_variant(upload_dir, path, stat, "gzip") == (None, None, False)
+    assert compress.compress_variants(upload_dir, path) == []
+
+
+def files_app() -> FastAPI:
+    from hstool.api.files import router
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+@pytest.mark.parametrize("value", ["abc", "-1", "1.5", ""])
+def test_upload_rejects_invalid_content_length(upload_dir: Path, value: str):
+    async def main() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=files_app()), base_url="http://test") as client:
+            return await client.post(
+                "/files/upload", content=b"x",
+                headers={"content-length": value, "content-type": "multipart/form-data; boundary=x"},
+            )
+
+    assert asyncio.run(main()).status_code == 400
+
+
+def test_concurrent_uploads(upload_dir: Path):
+    contents = [os.urandom(300 * 1024) for _ in range(8)]
+
+    async def main() -> List[httpx.Response]:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=files_app()), base_url="http://test") as client:
+            uploads = [
+                client.post("/files/upload", files={"file": (f"f{i}.bin", content)}) for i, content in enumerate(contents)
+            ]
+            # 同名文件并发上传，不覆盖时只有一个成功
+            uploads += [client.post("/files/upload", files={"file": ("same.bin", content)}) for content in contents]
+            return await asyncio.gather(*uploads)
+
+    responses = asyncio.run(main())
+    for i, (response, content) in enumerate(zip(responses, contents)):
+        assert response.status_code == 200
+        assert response.json()["sha256"] == hashlib.sha256(content).hexdigest()
+        assert (upload_dir / f"f{i}.bin").read_bytes() == content
+    same = responses[len(contents):]
+    assert sorted(r.status_code for r in same) == [200] + [400] * (len(contents) - 1)
+    winner = next(r for r in same if r.status_code == 200).json()["sha256"]
+    assert hashlib.sha256((upload_dir / "same.bin").read_bytes()).hexdigest() == winner
+    assert list((upload_dir / ".tmp").iterdir()) == []
+
+
+def test_large_upload_streams_with_bounded_memory(upload_dir: Path):
+    chunk, chunks = os.urandom(64 * 1024), 512  # 32MB
+    boundary = "hstool-test-boundary"
+
+    async def body() -> AsyncIterator[bytes]:
+        yield (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.bin\"\r\n"
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        for _ in range(chunks):
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    async def main() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=files_app()), base_url="http://test") as client:
+            return await client.post(
+                "/files/upload", content=body(),
+                headers={"content-type": f"multipart/form-data; boundary={boundary}"},
+            )
+
+    tracemalloc.start()
+    try:
+        response = asyncio.run(main())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert response.status_code == 200
+    expected = hashlib.sha256()
+    for _ in range(chunks):
+        expected.update(chunk)
+    assert response.json()["sha256"] == expected.hexdigest()
+    assert (upload_dir / "big.bin").stat().st_size == len(chunk) * chunks
+    # 写入缓冲 1MB，峰值内存远小于文件大小
+    assert peak < 8 * 1024 * 1024
+
+
+def test_listing_responsive_during_large_upload(upload_dir: Path):
+    chunk, chunks = os.urandom(1024 * 1024), 256  # 256MB
+    boundary = "hstool-test-boundary"
+    (upload_dir / "existing.txt").write_text("x")
+    started = asyncio.Event()
+    sent = 0
+
+    async def body() -> AsyncIterator[bytes]:
+        nonlocal sent
+        yield (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.bin\"\r\n"
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        for sent in range(chunks):
+            if sent == 8:
+                started.set()
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    async def main() -> tuple[httpx.Response, List[float]]:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=files_app()), base_url="http://test") as client:
+            upload = asyncio.create_task(client.post(
+                "/files/upload", content=body(),
+                headers={"content-type": f"multipart/form-data; boundary={boundary}"},
+            ))
+            await started.wait()
+            # 请求体仍在发送时不断请求文件列表
+            latencies = []
+            while sent < chunks - 1:
+                start = time.perf_counter()
+                response = await client.get("/files/")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                assert [item["name"] for item in response.json()] == ["existing.txt"]
+            return await upload, latencies
+
+    response, latencies = asyncio.run(main())
+    assert response.status_code == 200
+    assert (upload_dir / "big.bin").stat().st_size == len(chunk) * chunks
+    # 写入磁盘不阻塞事件循环：上传期间列表请求持续得到响应（上限留足 CI 余量），
+    # 阻塞式写入时列表请求要等请求体全部接收后才能执行
+    assert len(latencies) >= 10
+    assert max(latencies) < 0.25, latencies
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("a.txt", "a.txt"), ("./sub//b.txt", "sub/b.txt"), ("sub/../a.txt", "a.txt"), ("/abs/c.txt", "abs/c.txt"),
+    ("..", None), ("../x", None), ("a/../../x", None), ("a\\..\\..\\x", None), (".", None),
+])
+def test_normalize_arcname(name: str, expected: str | None):
+    from hstool.tool.archive import normalize_arcname
+    if expected is None:
+        with pytest.raises(ValueError):
+            normalize_arcname(name)
+    else:
+        assert normalize_arcname(name) == expected
+
+
+def test_archive_entries_stay_inside_work_dir(files_client: TestClient, upload_dir: Path, tmp_path: Path):
+    from hstool.tool.archive import check_entries
+    (upload_dir / "sub").mkdir()
+    (upload_dir / "a.txt").write_bytes(b"a")
+    (upload_dir / "sub" / "b.txt").write_bytes(b"b")
+    (tmp_path / "secret.txt").write_bytes(b"secret")
+    (upload_dir / "link.txt").symlink_to(tmp_path / "secret.txt")
+
+    response = files_client.get("/files/archive/zip", params={"name": ["sub/../a.txt", "./sub/b.txt"]})
+    assert response.status_code == 200
+    assert sorted(zipfile.ZipFile(io.BytesIO(response.content)).namelist()) == ["a.txt", "sub/b.txt"]
+
+    assert files_client.get("/files/archive/zip", params={"name": "link.txt"}).status_code == 403
+    assert files_client.get("/files/archive/tar", params={"prefix": "link"}).status_code == 403
+    assert files_client.get("/files/archive/tar", params={"name": ".tmp/x"}).status_code == 403
+    # 解析后仍在 UPLOAD 内、但归档内名称会穿越的路径
+    name = f"sub/../../{upload_dir.name}/a.txt"
+    assert files_client.get("/files/archive/tar", params={"name": name}).status_code == 400
+
+    # 请求校验之后文件被替换为指向外部或内部目录的符号链接，打包时仍会拒绝
+    with pytest.raises(ValueError):
+        list(check_entries([(upload_dir / "link.txt", "link.txt")], upload_dir))
+    (upload_dir / ".blobs").mkdir()
+    (upload_dir / ".blobs" / "x").write_bytes(b"x")
+    (upload_dir / "blob.txt").symlink_to(upload_dir / ".blobs" / "x")
+    with pytest.raises(ValueError):
+        list(check_entries([(upload_dir / "blob.txt", "blob.txt")], upload_dir, {".blobs"}))
+    assert list(check_entries([(upload_dir / "a.txt", "./a.txt")], upload_dir, {".blobs"})) == [
+        (upload_dir / "a.txt", "a.txt")
+    ]
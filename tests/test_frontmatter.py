@@ -0,0 +1,125 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Any, List
+import frontmatter  # type: ignore
+import pytest
+from hstool.tool import frontmatter as fm
+from hstool.tool.frontmatter import (
+    EditOp, bulk_edit_frontmatter, edit_frontmatter_file, read_frontmatter, read_frontmatter_text, split_frontmatter
+)
+from conftest import FIXTURE_POSTS
+
+
+def post_files(blog_dir: Path) -> List[Path]:
+    return sorted(blog_dir.glob("*/*.md"))
+
+
+@pytest.mark.parametrize("path", sorted(FIXTURE_POSTS.glob("*/*.md")), ids=lambda p: p.parent.name)
+def test_read_frontmatter_matches_frontmatter_load(path: Path):
+    assert read_frontmatter(path) == frontmatter.load(str(path)).metadata
+
+
+@pytest.mark.parametrize("text", [
+    "---\r\ntitle: crlf\r\ntags: [a]\r\n---\r\n正文\r\n",
+    "---\n---\n空的 Frontmatter\n",
+    "---\ntitle: 没有结束分隔符\n正文\n",
+    "---\n- 不是\n- 键值对\n---\n正文\n",
+    "-----\ntitle: 更长的分隔符\n-----  \n正文\n",
+    "  \n\t\n---\ntitle: 空白行\n---\n",
+    '{"title": "JSON"}\n\n正文\n',
+    '+++\ntitle = "TOML"\n+++\n正文\n',
+    "",
+])
+def test_read_frontmatter_edge_cases(tmp_path: Path, text: str):
+    path = tmp_path / "post.md"
+    path.write_bytes(text.encode("utf-8"))
+    assert read_frontmatter(path) == frontmatter.load(str(path)).metadata
+
+
+def test_read_frontmatter_stops_at_closing_delimiter(tmp_path: Path):
+    path = tmp_path / "post.md"
+    path.write_text("---\ntitle: a\n---\n" + "正文\n" * 1000 + "---\ntitle: b\n---\n", encoding="utf-8")
+    assert read_frontmatter_text(path) == "title: a\n"
+    assert read_frontmatter(path) == {"title": "a"}
+
+
+def test_split_frontmatter_keeps_leading_blank_lines():
+    text = "\n\n---\ntitle: a\n---\n正文\n"
+    assert split_frontmatter(text) == ("\n\n", "\ntitle: a\n", "---\n正文\n")
+    assert split_frontmatter("正文\n---\n") is None
+    assert split_frontmatter("---\ntitle: a\n") is None
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_bulk_edit_skips_unchanged_files(blog_dir: Path, jobs: int):
+    files = post_files(blog_dir)
+    before = {path: (path.read_bytes(), path.stat().st_mtime_ns) for path in files}
+    ops: List[EditOp] = [("rename", "category", "categories")]
+    results = {Path(r["path"]): r for r in bulk_edit_frontmatter(files, ops, jobs=jobs)}
+    assert all(r["error"] is None for r in results.values())
+    changed = {path.parent.name for path, r in results.items() if r["changes"]}
+    assert changed == {"hello", "life", "frontend", "leading-blank"}
+    for path in files:
+        if path.parent.name in changed:
+            metadata = frontmatter.load(str(path)).metadata
+            assert "category" not in metadata and "categories" in metadata
+            # 开头的空白和正文原样保留
+            old_parts = split_frontmatter(before[path][0].decode("utf-8"))
+            new_parts = split_frontmatter(path.read_text(encoding="utf-8"))
+            assert old_parts is not None and new_parts is not None
+            assert (new_parts[0], new_parts[2]) == (old_parts[0], old_parts[2])
+        else:
+            # 没有变化的文件不会被重写
+            assert (path.read_bytes(), path.stat().st_mtime_ns) == before[path]
+    assert list(blog_dir.glob("*/.*.tmp")) == []
+
+
+def test_edit_preserves_leading_blank_lines_and_body(blog_dir: Path):
+    path = blog_dir / "leading-blank" / "leading-blank.md"
+    assert edit_frontmatter_file(path, [("set", "title", "新标题")]) == ["title: '开头有空行' -> '新标题'"]
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("\n\n---\ntitle: 新标题\n")
+    assert text.endswith("---\nFrontmatter 前面有两个空行。\n")
+
+
+def test_edit_preserves_crlf(tmp_path: Path):
+    path = tmp_path / "crlf.md"
+    path.write_bytes(b"---\r\ntitle: a\r\n---\r\nline 1\r\nline 2\r\n")
+    edit_frontmatter_file(path, [("set", "draft", True)])
+    assert path.read_bytes() == b"---\r\ntitle: a\r\ndraft: true\r\n---\r\nline 1\r\nline 2\r\n"
+
+
+def test_bulk_edit_errors_leave_files_intact(blog_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    conflict = blog_dir / "conflict" / "conflict.md"
+    conflict.parent.mkdir()
+    conflict.write_text("---\ntags: [a]\n标签: [b]\n---\n正文\n", encoding="utf-8")
+    files = post_files(blog_dir)
+    before = {path: path.read_bytes() for path in files}
+    replace = os.replace
+
+    def failing_replace(src: Any, dst: Any) -> None:
+        if Path(dst).parent.name == "hello":
+            raise OSError("磁盘已满")
+        replace(src, dst)
+
+    monkeypatch.setattr(fm.os, "replace", failing_replace)
+    ops: List[EditOp] = [("rename", "tags", "标签")]
+    results = {Path(r["path"]).parent.name: r for r in bulk_edit_frontmatter(files, ops)}
+    assert results["hello"]["error"] == "OSError: 磁盘已满"
+    assert (results["conflict"]["error"] or "").startswith("ValueError")
+    assert results["life"]["error"] is None and results["life"]["changes"] == ["tags -> 标签"]
+    # 出错的文件内容不变，也没有残留的临时文件
+    for path in (blog_dir / "hello" / "hello.md", conflict):
+        assert path.read_bytes() == before[path]
+    assert list(blog_dir.glob("*/.*.tmp")) == []
+
+
+def test_bulk_edit_dry_run_and_tag_filter(blog_dir: Path):
+    files = post_files(blog_dir)
+    before = {path: path.read_bytes() for path in files}
+    ops: List[EditOp] = [("set", "draft", False)]
+    results = {Path(r["path"]).parent.name: r["changes"] for r in bulk_edit_frontmatter(files, ops, tags=["随笔"], dry_run=True)}
+    assert {name for name, changes in results.items() if changes} == {"life"}
+    assert results["life"] == ["+draft: False"]
+    assert {path: path.read_bytes() for path in files} == before
@@ -0,0 +1,80 @@
+from __future__ import annotations
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Set
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+from hstool.sql.blog import Blog, SyncManifest
+from hstool.tool.gitsync import git_sync_blog
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="需要 git 命令")
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", "-c", "commit.gpgsign=false", *args],
+        cwd=repo, check=True, capture_output=True
+    )
+
+
+def commit_all(repo: Path, message: str) -> None:
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message)
+
+
+def slugs(engine: Engine) -> Set[str]:
+    with Session(engine) as session:
+        return set(session.scalars(select(Blog.slug)))
+
+
+@pytest.fixture
+def repo(blog_dir: Path) -> Path:
+    git(blog_dir, "init", "-q")
+    commit_all(blog_dir, "init")
+    return blog_dir
+
+
+def test_git_sync_applies_commit_delta(engine: Engine, repo: Path):
+    result = git_sync_blog(repo)
+    assert result["since"] is None  # 首次同步做完整对账
+    assert result["stats"]["added"] == 6
+    initial = slugs(engine)
+
+    hello = repo / "hello" / "hello.md"
+    hello.write_text(hello.read_text(encoding="utf-8").replace("Hello Python", "Hello Git"), encoding="utf-8")
+    (repo / "new").mkdir()
+    (repo / "new" / "new.md").write_text("---\ntitle: 新文章\n---\n正文\n", encoding="utf-8")
+    git(repo, "rm", "-q", "life/life.md")
+    (repo / "renamed").mkdir()
+    git(repo, "mv", "frontend/frontend.md", "renamed/renamed.md")
+    commit_all(repo, "change")
+
+    result = git_sync_blog(repo)
+    assert result["since"] is not None and result["changed_files"] == 5
+    stats = result["stats"]
+    assert (stats["added"], stats["updated"], stats["deleted"], stats["errors"]) == (2, 1, 2, [])
+    assert slugs(engine) == initial - {"life", "frontend"} | {"new", "renamed"}
+    with Session(engine) as session:
+        assert session.scalars(select(Blog.title).where(Blog.slug == "hello")).one() == "Hello Git"
+        assert set(session.scalars(select(SyncManifest.slug))) == slugs(engine)
+
+    # 没有新提交时不做任何事
+    result = git_sync_blog(repo)
+    assert result["changed_files"] == 0 and result["since"] == result["head"]
+
+
+def test_git_sync_after_amend_and_full_reconcile(engine: Engine, repo: Path):
+    git_sync_blog(repo)
+    git(repo, "rm", "-q", "plain/plain.md")
+    git(repo, "commit", "-q", "--amend", "-m", "rewritten")
+    result = git_sync_blog(repo)
+    assert (result["stats"]["deleted"], result["stats"]["errors"]) == (1, [])
+    assert "plain" not in slugs(engine)
+
+    # 完整对账：git 跟踪的文件都未变化，全部跳过
+    result = git_sync_blog(repo, full=True)
+    assert result["since"] is None
+    stats = result["stats"]
+    assert (stats["added"], stats["updated"], stats["deleted"], stats["skipped"]) == (0, 0, 0, 5)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import hashlib
+import os
+from email.utils import formatdate
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from hstool.config import config
+from hstool.tool.httpcache import DigestCache, etag_matches
+
+
+@pytest.fixture
+def file_path(upload_dir: Path) -> Path:
+    path = upload_dir / "a.txt"
+    path.write_bytes(b"0123456789")
+    os.utime(path, (1_700_000_000, 1_700_000_000))
+    return path
+
+
+def test_if_none_match(files_client: TestClient, file_path: Path):
+    response = files_client.get("/files/a.txt")
+    assert response.status_code == 200 and response.content == b"0123456789"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == config.DOWNLOAD_CACHE_CONTROL
+
+    for header in (etag, etag.removeprefix("W/"), f'"other", {etag}', "*"):
+        response = files_client.get("/files/a.txt", headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    assert files_client.get("/files/a.txt", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since(files_client: TestClient, file_path: Path):
+    last_modified = files_client.get("/files/a.txt").headers["last-modified"]
+    assert last_modified == formatdate(1_700_000_000, usegmt=True)
+    assert files_client.get("/files/a.txt", headers={"If-Modified-Since": last_modified}).status_code == 304
+    earlier = formatdate(1_700_000_000 - 60, usegmt=True)
+    assert files_client.get("/files/a.txt", headers={"If-Modified-Since": earlier}).status_code == 200
+    assert files_client.get("/files/a.txt", headers={"If-Modified-Since": "not a date"}).status_code == 200
+    # If-None-Match 优先于 If-Modified-Since
+    headers = {"If-None-Match": '"other"', "If-Modified-Since": last_modified}
+    assert files_client.get("/files/a.txt", headers=headers).status_code == 200
+
+
+def test_weak_etag_changes_after_rewrite(files_client: TestClient, file_path: Path):
+    etag = files_client.get("/files/a.txt").headers["etag"]
+    # 大小相同，只有 mtime 不同
+    file_path.write_bytes(b"9876543210")
+    os.utime(file_path, (1_700_000_001, 1_700_000_001))
+    response = files_client.get("/files/a.txt", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.content == b"9876543210"
+    assert response.headers["etag"] != etag
+
+
+def test_strong_etag(files_client: TestClient, file_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "DOWNLOAD_STRONG_ETAG", True)
+    etag = files_client.get("/files/a.txt").headers["etag"]
+    assert etag == f'"{hashlib.sha256(b"0123456789").hexdigest()}"'
+    assert files_client.get("/files/a.txt", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_range_request(files_client: TestClient, file_path: Path):
+    response = files_client.get("/files/a.txt", headers={"Range": "bytes=2-5"})
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+    last_modified = response.headers["last-modified"]
+    # If-Range 与当前文件不一致时返回整个文件
+    response = files_client.get("/files/a.txt", headers={"Range": "bytes=2-5", "If-Range": '"other"'})
+    assert response.status_code == 200 and response.content == b"0123456789"
+    response = files_client.get("/files/a.txt", headers={"Range": "bytes=-3", "If-Range": last_modified})
+    assert response.status_code == 206 and response.content == b"789"
+
+
+def test_if_range_requires_strong_etag(files_client: TestClient, file_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # If-Range 只做强比较，弱 ETag 永远不匹配
+    weak = files_client.get("/files/a.txt").headers["etag"]
+    assert files_client.get("/files/a.txt", headers={"Range": "bytes=0-1", "If-Range": weak}).status_code == 200
+    monkeypatch.setattr(config, "DOWNLOAD_STRONG_ETAG", True)
+    strong = files_client.get("/files/a.txt").headers["etag"]
+    response = files_client.get("/files/a.txt", headers={"Range": "bytes=0-1", "If-Range": strong})
+    assert response.status_code == 206 and response.content == b"01"
+
+
+def test_etag_matches():
+    assert etag_matches('W/"a", "b"', '"b"')
+    assert etag_matches('"a"', 'W/"a"')
+    assert not etag_matches('"a"', '"ab"')
+
+
+def test_digest_cache_invalidated_on_change(tmp_path: Path):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"one")
+    cache = DigestCache()
+    assert cache.digest(path, path.stat()) == hashlib.sha256(b"one").hexdigest()
+    path.write_bytes(b"three")
+    assert cache.get(path.stat()) is None
+    assert cache.digest(path, path.stat()) == hashlib.sha256(b"three").hexdigest()
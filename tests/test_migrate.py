@@ -0,0 +1,66 @@
+from __future__ import annotations
+from sqlalchemy import Connection, Engine, text
+from hstool.sql.blog import Blog, Category, Tag
+from hstool.sql.migrate import migrate_blog_schema
+
+NEW_INDEXES = [
+    "uq_tag_name", "uq_category_parent_name", "uq_category_root_name",
+    "ix_blog_create", "ix_blog_update", "ix_blog_category_id",
+]
+
+
+def make_legacy(engine: Engine) -> None:
+    """去掉新增的索引，模拟 init-sql 创建的旧数据库"""
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+
+def tag_plan(conn: Connection) -> str:
+    rows = conn.execute(text("EXPLAIN QUERY PLAN SELECT id FROM tag WHERE name = :name"), {"name": "python"})
+    return " ".join(row.detail for row in rows)
+
+
+def test_tag_lookup_uses_index_after_migration(engine: Engine):
+    make_legacy(engine)
+    with engine.connect() as conn:
+        assert tag_plan(conn) == "SCAN tag"
+    report = migrate_blog_schema(engine)
+    assert sorted(report["created_indexes"]) == sorted(NEW_INDEXES)
+    with engine.connect() as conn:
+        assert tag_plan(conn) == "SEARCH tag USING COVERING INDEX uq_tag_name (name=?)"
+    assert migrate_blog_schema(engine)["created_indexes"] == []
+
+
+def test_duplicates_are_merged(engine: Engine):
+    make_legacy(engine)
+    tag, category, blog = Tag.__table__, Category.__table__, Blog.__table__
+    with engine.begin() as conn:
+        conn.execute(tag.insert(), [{"id": 1, "name": "python"}, {"id": 2, "name": "python"}, {"id": 3, "name": "go"}])
+        conn.execute(category.insert(), [
+            {"id": 2, "name": "技术", "parent_id": None},
+            {"id": 3, "name": "技术", "parent_id": None},
+            {"id": 4, "name": "后端", "parent_id": 2},
+            {"id": 5, "name": "后端", "parent_id": 3},
+            {"id": 6, "name": "Python", "parent_id": 5},
+        ])
+        conn.execute(blog.insert(), [
+            {"id": 1, "slug": "a", "title": "a", "content": "", "category_id": 4},
+            {"id": 2, "slug": "b", "title": "b", "content": "", "category_id": 5},
+            {"id": 3, "slug": "c", "title": "c", "content": "", "category_id": 6},
+        ])
+        conn.execute(text("INSERT INTO tag_blog (blog_id, tag_id) VALUES (1, 1), (1, 2), (2, 2), (2, 3)"))
+
+    report = migrate_blog_schema(engine)
+    assert (report["merged_tags"], report["merged_categories"]) == (1, 2)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, name FROM tag ORDER BY id")).all() == [(1, "python"), (3, "go")]
+        links = conn.execute(text("SELECT blog_id, tag_id FROM tag_blog ORDER BY blog_id, tag_id")).all()
+        assert links == [(1, 1), (2, 1), (2, 3)]
+        assert conn.execute(text("SELECT id, name, parent_id FROM category ORDER BY id")).all() == [
+            (1, "Unclassified", None), (2, "技术", None), (4, "后端", 2), (6, "Python", 4),
+        ]
+        assert conn.execute(text("SELECT slug, category_id FROM blog ORDER BY id")).all() == [
+            ("a", 4), ("b", 4), ("c", 6),
+        ]
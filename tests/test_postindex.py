@@ -0,0 +1,83 @@
+from __future__ import annotations
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List
+import pytest
+from hstool.tool.postindex import PostQuery, open_index, parse_query_terms, query_posts, refresh_index
+
+
+@pytest.fixture
+def conn(tmp_path: Path) -> Iterator[sqlite3.Connection]:
+    conn = open_index(tmp_path / ".hstool" / "posts.db")
+    yield conn
+    conn.close()
+
+
+def slugs(conn: sqlite3.Connection, root: Path, query: PostQuery) -> List[str]:
+    return [row["slug"] for row in query_posts(conn, root, query)]
+
+
+def test_refresh_is_incremental(conn: sqlite3.Connection, blog_dir: Path):
+    stats = refresh_index(conn, blog_dir)
+    assert (stats["added"], stats["updated"], stats["deleted"], stats["unchanged"], stats["errors"]) == (6, 0, 0, 0, [])
+    assert refresh_index(conn, blog_dir)["unchanged"] == 6
+
+    hello = blog_dir / "hello" / "hello.md"
+    hello.write_text(hello.read_text(encoding="utf-8").replace("[python, web]", "[python, git]"), encoding="utf-8")
+    (blog_dir / "life" / "life.md").unlink()
+    broken = blog_dir / "broken" / "broken.md"
+    broken.parent.mkdir()
+    broken.write_text("---\ntitle: [未闭合\n---\n", encoding="utf-8")
+    stats = refresh_index(conn, blog_dir, jobs=2)
+    assert (stats["added"], stats["updated"], stats["deleted"], stats["unchanged"]) == (0, 1, 1, 4)
+    assert [path for path, _ in stats["errors"]] == [str(broken.resolve())]
+    assert slugs(conn, blog_dir, {"tags": ["git"]}) == ["hello"]
+    assert slugs(conn, blog_dir, {"tags": ["web"]}) == ["frontend"]
+
+    # 解析失败的文件不记录，修复后下次刷新加入索引
+    broken.write_text("---\ntitle: 已修复\n---\n", encoding="utf-8")
+    stats = refresh_index(conn, blog_dir)
+    assert (stats["added"], stats["unchanged"], stats["errors"]) == (1, 5, [])
+
+
+def test_query_filters(conn: sqlite3.Connection, blog_dir: Path):
+    refresh_index(conn, blog_dir)
+    # 默认按 update 倒序，没有日期的文章排在最后
+    assert slugs(conn, blog_dir, {}) == ["rule", "leading-blank", "frontend", "life", "hello", "plain"]
+    assert slugs(conn, blog_dir, {"tags": ["web"]}) == ["frontend", "life", "hello"]
+    assert slugs(conn, blog_dir, {"tags": ["web", "python"]}) == ["hello"]
+    assert slugs(conn, blog_dir, {"category": "技术"}) == ["leading-blank", "frontend", "hello"]
+    assert slugs(conn, blog_dir, {"category": "技术/后端/"}) == ["leading-blank", "hello"]
+    assert slugs(conn, blog_dir, {"category": "技术/后"}) == []
+    assert slugs(conn, blog_dir, {"since": datetime(2024, 3, 1), "until": datetime(2024, 4, 2), "by": "create"}) == [
+        "leading-blank", "frontend"
+    ]
+    assert slugs(conn, blog_dir, {"title": "PYTHON"}) == ["hello"]
+    assert slugs(conn, blog_dir, {"title": "%"}) == []
+    assert slugs(conn, blog_dir, {"sort": "slug", "reverse": True, "limit": 3}) == ["frontend", "hello", "leading-blank"]
+    row = query_posts(conn, blog_dir, {"tags": ["随笔"]})[0]
+    assert (row["create"], row["update"], row["category"], row["tags"]) == (
+        "2024-02-01 00:00:00", "2024-02-02 08:00:00", "生活", ["web", "随笔"]
+    )
+
+
+@pytest.mark.parametrize("query", [
+    {"by": "title"},
+    {"sort": "tags"},
+    {"sort": 'title" DESC; --'},
+])
+def test_query_rejects_unknown_fields(conn: sqlite3.Connection, blog_dir: Path, query: PostQuery):
+    with pytest.raises(ValueError):
+        query_posts(conn, blog_dir, query)
+
+
+def test_parse_query_terms():
+    query = parse_query_terms(["tag:web", "tag:python", "category:技术", "since:2024-03-01", "until:2024-03-31",
+                               "by:create", "sort:-title", "limit:5", "hello", "world"])
+    assert query == {
+        "tags": ["web", "python"], "category": "技术", "since": datetime(2024, 3, 1), "until": datetime(2024, 4, 1),
+        "by": "create", "sort": "title", "reverse": False, "limit": 5, "title": "hello world",
+    }
+    with pytest.raises(ValueError):
+        parse_query_terms(["by:title"])
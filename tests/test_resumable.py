@@ -0,0 +1,98 @@
+from __future__ import annotations
+import hashlib
+import os
+import time
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from hstool.config import config
+from hstool.tool.resumable import UploadSession, expire_sessions, sessions_dir
+
+DATA = os.urandom(300 * 1024)
+DIGEST = hashlib.sha256(DATA).hexdigest()
+
+
+def create(client: TestClient, **body: object) -> dict:
+    response = client.post("/files/uploads", json={"filename": "big.bin", "size": len(DATA), **body})
+    assert response.status_code == 200
+    return response.json()
+
+
+def patch(client: TestClient, session_id: str, start: int, end: int) -> dict:
+    response = client.patch(f"/files/uploads/{session_id}", params={"offset": start}, content=DATA[start:end])
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_out_of_order_chunks(files_client: TestClient, upload_dir: Path):
+    session = create(files_client, sha256=DIGEST)
+    assert (session["offset"], session["ranges"]) == (0, [])
+    third = len(DATA) // 3
+
+    assert patch(files_client, session["id"], third, 2 * third) == {"written": third, "offset": 0}
+    assert patch(files_client, session["id"], 2 * third, len(DATA))["offset"] == 0
+    status = files_client.get(f"/files/uploads/{session['id']}").json()
+    assert (status["offset"], status["ranges"]) == (0, [[third, len(DATA)]])
+
+    # 还没有收到开头的分块，不能完成
+    response = files_client.post(f"/files/uploads/{session['id']}/complete")
+    assert response.status_code == 409
+    assert not (upload_dir / "big.bin").exists()
+
+    assert patch(files_client, session["id"], 0, third)["offset"] == len(DATA)
+    status = files_client.get(f"/files/uploads/{session['id']}").json()
+    assert (status["offset"], status["ranges"]) == (len(DATA), [[0, len(DATA)]])
+
+    response = files_client.post(f"/files/uploads/{session['id']}/complete")
+    assert response.status_code == 200
+    assert response.json()["sha256"] == DIGEST
+    assert (upload_dir / "big.bin").read_bytes() == DATA
+    # 完成后会话已删除
+    assert files_client.get(f"/files/uploads/{session['id']}").status_code == 404
+
+
+def test_hash_mismatch(files_client: TestClient, upload_dir: Path):
+    session = create(files_client)
+    patch(files_client, session["id"], 0, len(DATA))
+    assert files_client.post(f"/files/uploads/{session['id']}/complete").status_code == 400  # 未提供哈希
+    response = files_client.post(f"/files/uploads/{session['id']}/complete", params={"sha256": "0" * 64})
+    assert response.status_code == 422
+    assert not (upload_dir / "big.bin").exists()
+    # 校验失败后会话仍在，可以用正确的哈希完成
+    response = files_client.post(f"/files/uploads/{session['id']}/complete", params={"sha256": DIGEST.upper()})
+    assert response.status_code == 200
+    assert (upload_dir / "big.bin").read_bytes() == DATA
+
+
+def test_chunk_beyond_size(files_client: TestClient):
+    session = create(files_client)
+    response = files_client.patch(f"/files/uploads/{session['id']}", params={"offset": len(DATA) - 10}, content=b"x" * 11)
+    assert response.status_code == 416
+    assert files_client.get(f"/files/uploads/{session['id']}").json()["ranges"] == []
+
+
+def test_abort(files_client: TestClient, upload_dir: Path):
+    session = create(files_client)
+    assert files_client.delete(f"/files/uploads/{session['id']}").status_code == 200
+    assert not (sessions_dir(upload_dir) / session["id"]).exists()
+    assert files_client.delete(f"/files/uploads/{session['id']}").status_code == 404
+
+
+@pytest.mark.parametrize("session_id", ["nope", "0" * 32, "A" * 32])
+def test_unknown_or_invalid_session_id(files_client: TestClient, session_id: str):
+    assert files_client.get(f"/files/uploads/{session_id}").status_code == 404
+    assert files_client.patch(f"/files/uploads/{session_id}", params={"offset": 0}, content=b"x").status_code == 404
+    assert files_client.post(f"/files/uploads/{session_id}/complete").status_code == 404
+    assert files_client.delete(f"/files/uploads/{session_id}").status_code == 404
+
+
+def test_expire_sessions(upload_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "UPLOAD_SESSION_TTL", 3600)
+    old = UploadSession.create(upload_dir, "old.bin", 10)
+    fresh = UploadSession.create(upload_dir, "fresh.bin", 10)
+    stale = time.time() - 7200
+    os.utime(old.path, (stale, stale))
+    assert expire_sessions(upload_dir) == 1
+    assert not old.path.exists()
+    assert fresh.path.exists()
+    assert expire_sessions(upload_dir, ttl=0) == 1
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from typing import Iterator
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from hstool.sql.blog import Blog
+from hstool.sql.search import search_blogs
+
+
+@pytest.fixture
+def session(engine: Engine) -> Iterator[Session]:
+    with Session(engine) as session:
+        session.add_all([
+            Blog(title="后端开发入门", slug="backend", content="从零开始学习后端开发，包括数据库和缓存。"),
+            Blog(title="Go 并发模式", slug="go", content="goroutine 与 channel 的常见用法。" * 10),
+            Blog(title="前端工程化", slug="frontend", content="打包工具与组件库的选型。"),
+            Blog(title="Markdown <b>速查</b>", slug="markdown", content="用 Markdown 写作，配合 make 处理 <script> 与 & 符号。"),
+        ])
+        session.commit()
+        yield session
+
+
+def test_search_two_char_cjk(session: Session):
+    results = search_blogs(session, "后端")
+    assert [row["slug"] for row in results] == ["backend"]
+    assert results[0]["title_highlight"] == "<mark>后端</mark>开发入门"
+    assert "<mark>后端</mark>开发" in results[0]["snippet"]
+
+
+def test_search_two_char_ascii(session: Session):
+    results = search_blogs(session, "GO")
+    assert [row["slug"] for row in results] == ["go"]
+    assert results[0]["title_highlight"] == "<mark>Go</mark> 并发模式"
+    assert results[0]["snippet"].endswith("…")
+
+
+def test_search_mixed_short_and_long_terms(session: Session):
+    assert [row["slug"] for row in search_blogs(session, "后端 数据库")] == ["backend"]
+    assert search_blogs(session, "前端 数据库") == []
+    assert [row["slug"] for row in search_blogs(session, "组件库")] == ["frontend"]
+
+
+def assert_safe_html(fragment: str) -> None:
+    """只包含成对的 <mark> 标签，其余内容均已转义"""
+    assert fragment.count("<mark>") == fragment.count("</mark>")
+    assert "<" not in fragment.replace("<mark>", "").replace("</mark>", "")
+    assert "<mark><mark>" not in fragment and "<mark></mark>" not in fragment
+
+
+def test_search_short_term_inside_fts_highlight(session: Session):
+    # "ma" 同时出现在 FTS5 已标记的 "Markdown" 和 <mark> 标签本身中
+    results = search_blogs(session, "markdown ma")
+    assert [row["slug"] for row in results] == ["markdown"]
+    hit = results[0]
+    assert hit["title_highlight"] == "<mark>Markdown</mark> &lt;b&gt;速查&lt;/b&gt;"
+    assert hit["snippet"].startswith("用 <mark>Markdown</mark> 写作，配合 <mark>ma</mark>ke 处理 &lt;script&gt;")
+    assert_safe_html(hit["title_highlight"])
+    assert_safe_html(hit["snippet"])
+
+
+def test_search_short_terms_escape_html(session: Session):
+    results = search_blogs(session, "ar")
+    assert [row["slug"] for row in results] == ["markdown"]
+    assert results[0]["title_highlight"] == "M<mark>ar</mark>kdown &lt;b&gt;速查&lt;/b&gt;"
+    assert "&lt;script&gt; 与 &amp; 符号" in results[0]["snippet"]
+    assert_safe_html(results[0]["snippet"])
@@ -0,0 +1,157 @@
+from __future__ import annotations
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+from urllib.parse import parse_qsl, urlsplit
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from hstool.tool.strapi import StrapiClient, post_payload, push_posts
+
+
+class FakeStrapi(ThreadingHTTPServer):
+    """最小的 Strapi v5 替身：按 slug 过滤查询、创建、按 documentId 更新，可注入失败"""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), FakeStrapiHandler)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.created = 0
+        self.requests: List[str] = []
+        self.fail_before: Dict[str, List[int]] = {}  # 方法 -> 依次返回的错误状态码（不处理请求）
+        self.fail_after: Dict[str, List[int]] = {}  # 方法 -> 处理请求后依次返回的错误状态码
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeStrapiHandler(BaseHTTPRequestHandler):
+    server: FakeStrapi
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status in (429, 503):
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self) -> None:
+        server = self.server
+        url = urlsplit(self.path)
+        method = self.command
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        with server.lock:
+            server.requests.append(method)
+            if server.fail_before.get(method):
+                return self._send(server.fail_before[method].pop(0), {"error": {}})
+            parts = url.path.strip("/").split("/")
+            if method == "GET":
+                slugs = {v for k, v in parse_qsl(url.query) if k.startswith("filters[slug][$in]")}
+                result: Any = {"data": [r for r in server.records.values() if r["slug"] in slugs]}
+                status = 200
+            elif method == "POST" and any(r["slug"] == body["data"]["slug"] for r in server.records.values()):
+                result, status = {"data": None, "error": {"status": 400, "name": "ValidationError"}}, 400
+            elif method == "POST":
+                server.created += 1
+                document_id = f"doc{server.created}"
+                server.records[document_id] = {**body["data"], "documentId": document_id}
+                result, status = {"data": server.records[document_id]}, 201
+            elif parts[-1] in server.records:
+                server.records[parts[-1]].update(body["data"])
+                result, status = {"data": server.records[parts[-1]]}, 200
+            else:
+                result, status = {"data": None, "error": {"status": 404}}, 404
+            if server.fail_after.get(method):
+                return self._send(server.fail_after[method].pop(0), {"error": {}})
+            self._send(status, result)
+
+    do_GET = do_POST = do_PUT = _handle
+
+
+@pytest.fixture
+def strapi() -> Iterator[FakeStrapi]:
+    server = FakeStrapi()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(strapi: FakeStrapi) -> Iterator[StrapiClient]:
+    client = StrapiClient(strapi.base_url, "posts", concurrency=4, retries=3, timeout=5)
+    yield client
+    client.close()
+
+
+def posts(count: int, content: str = "正文") -> List[Dict[str, Any]]:
+    return [post_payload(f"post-{i}", f"文章 {i}", content, None, None, ["a"], ["技术"]) for i in range(count)]
+
+
+def test_push_creates_skips_and_updates(engine: Engine, strapi: FakeStrapi, client: StrapiClient):
+    with Session(engine) as session:
+        assert push_posts(session, client, posts(5), batch_size=2) == {"created": 5, "updated": 0, "skipped": 0, "errors": []}
+        # 每批只查找一次，创建前不再逐条查询
+        assert strapi.requests.count("GET") == 3
+        assert push_posts(session, client, posts(5), batch_size=2)["skipped"] == 5
+        stats = push_posts(session, client, posts(5, "新正文"), batch_size=2)
+    assert (stats["created"], stats["updated"]) == (0, 5)
+    assert len(strapi.records) == 5
+    assert {r["content"] for r in strapi.records.values()} == {"新正文"}
+
+
+def test_get_and_put_are_retried(engine: Engine, strapi: FakeStrapi, client: StrapiClient):
+    strapi.fail_before["GET"] = [503, 429]
+    with Session(engine) as session:
+        assert push_posts(session, client, posts(1))["created"] == 1
+        strapi.fail_before["PUT"] = [502]
+        stats = push_posts(session, client, posts(1, "新正文"))
+    assert (stats["updated"], stats["errors"]) == (1, [])
+    assert len(strapi.records) == 1
+
+
+def test_failed_post_is_not_retried_or_duplicated(engine: Engine, strapi: FakeStrapi, client: StrapiClient):
+    # 服务器已创建记录，但响应是 502：不能重发 POST，而应查到已创建的记录
+    strapi.fail_after["POST"] = [502]
+    with Session(engine) as session:
+        stats = push_posts(session, client, posts(1))
+    assert (stats["created"], stats["errors"]) == (1, [])
+    assert strapi.requests.count("POST") == 1
+    assert len(strapi.records) == 1
+
+
+def test_failed_post_without_record_is_reported(engine: Engine, strapi: FakeStrapi, client: StrapiClient):
+    strapi.fail_before["POST"] = [503]
+    with Session(engine) as session:
+        stats = push_posts(session, client, posts(1))
+        assert stats["created"] == 0
+        assert [slug for slug, _ in stats["errors"]] == ["post-0"]
+        assert strapi.requests.count("POST") == 1
+        assert push_posts(session, client, posts(1))["created"] == 1
+    assert len(strapi.records) == 1
+
+
+def test_upsert_updates_on_create_conflict(strapi: FakeStrapi, client: StrapiClient):
+    # 批量查找之后被其他进程创建的记录：创建冲突后按 slug 查找并改为更新
+    payload = posts(1)[0]
+    remote_id = client.create(payload)
+    strapi.requests.clear()
+    assert client.upsert(None, {**payload, "title": "新标题"}) == (remote_id, False)
+    assert strapi.requests == ["POST", "GET", "PUT"]
+    assert strapi.records[remote_id]["title"] == "新标题"
+    # 记录被删除后直接重新创建
+    strapi.records.clear()
+    strapi.requests.clear()
+    new_id, created = client.upsert(remote_id, payload)
+    assert created and new_id != remote_id
+    assert strapi.requests == ["PUT", "POST"]
+    assert len(strapi.records) == 1
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from hstool.tool.watch import PollingWatcher, watch_changes
+
+
+def touch(path: Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+
+
+def test_polling_watcher_reports_changes(blog_dir: Path):
+    root = blog_dir.resolve()
+    watcher = PollingWatcher(root, interval=0.01)
+    assert watcher.read(0) == []
+
+    touch(root / "hello" / "hello.md", "---\ntitle: 修改后\n---\n")
+    (root / "life" / "life.md").unlink()
+    (root / "new").mkdir()
+    touch(root / "new" / "new.md", "---\ntitle: 新文章\n---\n")
+    touch(root / "new" / ".new.md.swp", "")  # 编辑器临时文件被忽略
+    shutil.rmtree(root / "plain")
+    (root / "rule").rename(root / "rule2")
+
+    changes = sorted(watcher.read(0))
+    assert changes == sorted([
+        ("modified", str(root / "hello" / "hello.md")),
+        ("deleted", str(root / "life" / "life.md")),
+        ("modified", str(root / "new" / "new.md")),
+        ("deleted_dir", str(root / "plain")),
+        ("deleted_dir", str(root / "rule")),
+        ("modified", str(root / "rule2" / "rule.md")),
+    ])
+    assert watcher.read(0) == []
+
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_watch_changes_debounces_bursts(blog_dir: Path, polling: bool):
+    root = blog_dir.resolve()
+    hello = root / "hello" / "hello.md"
+    batches: List[Dict[str, str]] = []
+
+    def edit() -> None:
+        # 编辑器保存时的一连串写入，间隔远小于防抖时间
+        for i in range(5):
+            touch(hello, f"---\ntitle: 第 {i} 次保存\n---\n")
+            time.sleep(0.02)
+        (root / "life" / "life.md").unlink()
+
+    changes = watch_changes(root, debounce=0.3, polling=polling, interval=0.01)
+    try:
+        # 生成器在第一次 next 时才开始监视，稍后再开始修改
+        writer = threading.Timer(0.2, edit)
+        writer.start()
+        batches.append(next(changes))
+        writer.join()
+    finally:
+        changes.close()
+    assert batches == [{str(hello): "modified", str(root / "life" / "life.md"): "deleted"}]